@@ -51,13 +51,21 @@ class ApiConfig(AppConfig):
     
     # ready(): eseguito quando Django inizializza l'app
     # Usato per registrare signal handlers o eseguire codice di setup
-    #
-    # def ready(self):
-    #     """Eseguito all'avvio dell'app"""
-    #     # Importa e registra signals
-    #     import api.signals
-    #     
-    #     # Oppure registra checks custom
+    def ready(self):
+        """Eseguito all'avvio dell'app"""
+        # Importa e registra signals (invalidazione cache del catalogo)
+        # ⚠️ L'import basta: i decorator @receiver collegano le funzioni
+        from . import signals  # noqa: F401
+        # PRAGMA di SQLite su ogni nuova connessione (api/connessioni.py)
+        from . import connessioni  # noqa: F401
+        # Contatore di @budget_query per le view async (api/budget.py)
+        from . import budget  # noqa: F401
+        # Con più processi la generazione delle cache deve essere condivisa
+        from .cache import verifica_cache_condivisa
+        verifica_cache_condivisa()
+    
+    # Altri esempi di cosa si può fare in ready():
+    #     # Registra checks custom
     #     from django.core.checks import register, Tags
     #     
     #     print(f"App {self.name} caricata!")
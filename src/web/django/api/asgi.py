@@ -0,0 +1,151 @@
+import asyncio
+import json
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.exception import convert_exception_to_response
+from django.utils.module_loading import import_string
+
+from .conf import impostazione
+from .eventi import DISCONNESSO, SCOLLEGATO, formato_sse, hub_eventi
+
+
+# --- HANDLER ASGI "SNELLO" PER LE VIEW ASYNC ---
+#
+# pww/asgi.py smista le richieste:
+#   /api/async/...  → ASGIHandlerCatalogo (questo file): middleware solo async
+#   tutto il resto  → handler ASGI standard di Django (MIDDLEWARE di settings.py)
+#
+# Stesse URL (ROOT_URLCONF), stessa gestione degli errori (404, 500):
+# cambia SOLO la catena dei middleware.
+
+PREFISSO_ASYNC = '/api/async/'
+PERCORSO_EVENTI = '/api/async/software/events/'
+
+
+class ASGIHandlerCatalogo(ASGIHandler):
+    """
+    ASGIHandler con i middleware di API_CATALOGO['ASYNC_MIDDLEWARE'] al posto
+    di settings.MIDDLEWARE.
+
+    ⚠️ Accetta SOLO middleware async (sync_capable=False): un middleware
+    sincrono rimetterebbe il salto di thread che questo handler vuole evitare,
+    quindi è un errore di configurazione, non un adattamento silenzioso.
+    """
+
+    def load_middleware(self, is_async=False):
+        # Liste usate da _get_response_async(): i nostri middleware non hanno
+        # process_view / process_template_response / process_exception
+        self._view_middleware = []
+        self._template_response_middleware = []
+        self._exception_middleware = []
+
+        handler = convert_exception_to_response(self._get_response_async)
+        for percorso in reversed(impostazione('ASYNC_MIDDLEWARE')):
+            middleware = import_string(percorso)
+            if getattr(middleware, 'sync_capable', True) or not getattr(middleware, 'async_capable', False):
+                raise ImproperlyConfigured(
+                    f'{percorso}: ASYNC_MIDDLEWARE accetta solo middleware async '
+                    '(sync_capable = False, async_capable = True)'
+                )
+            handler = convert_exception_to_response(middleware(handler))
+
+        self._middleware_chain = handler
+
+
+# --- STREAM SSE DEGLI EVENTI (APP ASGI "NUDA") ---
+#
+# GET /api/async/software/events/ (vedi api/eventi.py) NON passa da Django:
+# pww/asgi.py lo manda direttamente a applicazione_eventi().
+#
+# ⚠️ Perché: ogni richiesta ASGI di Django ha un suo ThreadSensitiveContext, e
+# la prima chiamata sync_to_async() della richiesta (signal request_started,
+# le query dell'ORM async, ...) crea un THREAD che vive quanto la richiesta. Per una
+# risposta normale sono millisecondi; per uno stream SSE aperto per ore sono
+# 5.000 thread fermi con 5.000 client (misurato: ~260 MB).
+# Qui ogni client è solo una coroutine e una coda: niente ORM, niente thread.
+
+_INTESTAZIONI_SSE = [
+    (b'content-type', b'text/event-stream; charset=utf-8'),
+    (b'cache-control', b'no-cache'),
+    (b'x-accel-buffering', b'no'),  # nginx: niente buffer, eventi subito al client
+    (b'x-content-type-options', b'nosniff'),
+]
+
+
+async def _risposta_json(send, codice, dati):
+    await send({
+        'type': 'http.response.start', 'status': codice,
+        'headers': [(b'content-type', b'application/json')],
+    })
+    await send({'type': 'http.response.body', 'body': json.dumps(dati).encode()})
+
+
+async def _aspetta_disconnessione(receive, hub, iscritto):
+    """Quando il client chiude la connessione, sveglia chi legge la sua coda."""
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+    hub.chiudi(iscritto, DISCONNESSO)
+
+
+async def applicazione_eventi(scope, receive, send):
+    """
+    App ASGI di GET /api/async/software/events/: stream Server-Sent Events
+    delle modifiche al catalogo (create, update, delete).
+
+    Ogni evento: id: <token>  event: <azione>
+                 data: {"azione": "update", "ids": [5, 6], "token": 1234}
+    ("ids": null = operazione di massa con filtro, id non noti; "token" = da
+    passare a GET /api/software/changes/?since= dopo una disconnessione)
+
+    Senza eventi, ogni EVENTI_HEARTBEAT secondi un commento ": ping" tiene
+    viva la connessione nei proxy. Oltre EVENTI_ISCRITTI_MAX client per
+    processo: 503 (EventSource riprova da solo).
+    """
+    if scope['method'] != 'GET':
+        return await _risposta_json(send, 405, {'errore': 'Metodo non consentito: solo GET'})
+    hub = hub_eventi()
+    if hub.numero_iscritti() >= impostazione('EVENTI_ISCRITTI_MAX'):
+        return await _risposta_json(send, 503, {'errore': 'Troppi client connessi agli eventi, riprova più tardi'})
+
+    iscritto = hub.iscrivi()
+    disconnessione = asyncio.ensure_future(_aspetta_disconnessione(receive, hub, iscritto))
+    intervallo = impostazione('EVENTI_HEARTBEAT')
+
+    async def invia(testo, fine=False):
+        # ⚠️ send() aspetta finché il client legge (backpressure del server):
+        # un client fermo bloccherebbe la coroutine per sempre. Oltre
+        # 'intervallo' secondi → TimeoutError → connessione chiusa.
+        messaggio = {'type': 'http.response.body', 'body': testo.encode(), 'more_body': not fine}
+        await asyncio.wait_for(send(messaggio), timeout=intervallo)
+
+    try:
+        await send({'type': 'http.response.start', 'status': 200, 'headers': _INTESTAZIONI_SSE})
+        # retry: dopo una disconnessione EventSource riprova tra 5 secondi
+        await invia('retry: 5000\n\n')
+        while True:
+            # Evento già in coda → niente attesa (né task, né timer): con
+            # migliaia di client ogni pubblicazione costa ~10 µs per client
+            # invece di ~190 µs con asyncio.wait() su due task
+            try:
+                evento = iscritto.coda.get_nowait()
+            except asyncio.QueueEmpty:
+                try:
+                    evento = await asyncio.wait_for(iscritto.coda.get(), timeout=intervallo)
+                except asyncio.TimeoutError:
+                    await invia(': ping\n\n')  # heartbeat
+                    continue
+            if evento is DISCONNESSO:
+                return
+            if evento is SCOLLEGATO:
+                return await invia(formato_sse(
+                    {'errore': 'Client troppo lento: eventi persi. Recuperali con '
+                               'GET /api/software/changes/?since=<id dell\'ultimo evento ricevuto>'},
+                    'scollegato',
+                ), fine=True)
+            await invia(formato_sse(evento, evento['azione'], evento.get('token')))
+    except asyncio.TimeoutError:
+        pass  # client che non legge più: si chiude
+    finally:
+        disconnessione.cancel()
+        hub.disiscrivi(iscritto)
@@ -0,0 +1,143 @@
+import logging
+from contextlib import ExitStack
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from .conf import impostazione
+
+logger = logging.getLogger(__name__)
+
+
+# --- BUDGET DI QUERY PER VIEW ---
+#
+# Ogni view dichiara QUANTE query SQL le servono al massimo:
+#
+#   @api_view(['GET'])
+#   @budget_query(1)
+#   def software_gratuiti(request): ...
+#
+# Così una regressione tipo "una .exists() e una .count() in più" (3 round
+# trip invece di 1) non passa inosservata.
+#
+# Comportamento (API_CATALOGO['BUDGET_QUERY']):
+#   None       → nessun controllo, il decorator non costa nulla (default)
+#   'avviso'   → logger.warning() se la view supera il budget (utile in sviluppo)
+#   'errore'   → solleva BudgetQuerySuperato (usato nei test, vedi api/tests.py)
+#
+# ⚠️ Si contano solo le query eseguite DENTRO la view: le risposte in
+# streaming leggono il database dopo (mentre inviano i dati) e non sono
+# contate. BEGIN / COMMIT / SAVEPOINT non sono query "vere" e non contano.
+#
+# ⚠️ View async: le connessioni sono PER THREAD e l'ORM async esegue le query
+# nel thread di sync_to_async, che il decorator non controlla. Invece di
+# installare il contatore con due salti di thread in più per richiesta,
+# ogni connessione ha FIN DALLA CREAZIONE un execute_wrapper che conta solo
+# se la richiesta corrente ne ha attivato uno (ContextVar: sync_to_async la
+# copia nel thread delle query). Costo a budget spento: una ContextVar.get()
+# per query; in cambio conteggi separati anche con più richieste async insieme.
+#
+# ⚠️ Le operazioni di massa (api/views.py, sezione BULK) non hanno un budget
+# fisso: le loro query crescono con il numero di elementi (a blocchi di
+# BULK_BATCH_SIZE), quindi non sono decorate.
+
+_CONTROLLO_TRANSAZIONI = ('BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE')
+
+
+class BudgetQuerySuperato(Exception):
+    """Una view ha eseguito più query di quelle dichiarate con @budget_query."""
+
+
+class _Contatore:
+    """execute_wrapper di Django: viene chiamato per OGNI query eseguita."""
+
+    def __init__(self):
+        self.query = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if not sql.lstrip().upper().startswith(_CONTROLLO_TRANSAZIONI):
+            self.query.append(sql)
+        return execute(sql, params, many, context)
+
+
+# Contatore della richiesta async corrente (None = nessun conteggio)
+_contatore_async = ContextVar('api_budget_contatore', default=None)
+
+
+def _conta_se_attivo(execute, sql, params, many, context):
+    contatore = _contatore_async.get()
+    if contatore is None:
+        return execute(sql, params, many, context)
+    return contatore(execute, sql, params, many, context)
+
+
+@receiver(connection_created, dispatch_uid='api.budget.contatore_async')
+def _connessione_creata(sender, connection, **kwargs):
+    # In TESTA alla lista: execute_wrapper() (il conteggio delle view sync)
+    # aggiunge e toglie dalla CODA, e non deve mai togliere questo
+    if _conta_se_attivo not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _conta_se_attivo)
+
+
+def _verifica(nome, massimo, contatore, modalita):
+    eseguite = len(contatore.query)
+    if eseguite <= massimo:
+        return
+    messaggio = f'{nome}: {eseguite} query (budget: {massimo})\n' + '\n'.join(
+        f'  {numero}. {sql}' for numero, sql in enumerate(contatore.query, 1)
+    )
+    if modalita == 'errore':
+        raise BudgetQuerySuperato(messaggio)
+    logger.warning(messaggio)
+
+
+def _conta_query(contatore):
+    """Installa il contatore su TUTTE le connessioni configurate (DATABASES)."""
+    stack = ExitStack()
+    for alias in connections:
+        stack.enter_context(connections[alias].execute_wrapper(contatore))
+    return stack
+
+
+def budget_query(massimo):
+    """
+    Decorator: la view può eseguire al massimo 'massimo' query SQL.
+
+    Va messo SOTTO @api_view (conta anche ETag e cache, che però di solito
+    non toccano il database). Funziona anche con le view async (async def).
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def wrapper_async(request, *args, **kwargs):
+                modalita = impostazione('BUDGET_QUERY')
+                if modalita is None:
+                    return await view(request, *args, **kwargs)
+                contatore = _Contatore()
+                # Nessun salto di thread: conta _conta_se_attivo, già
+                # installato su ogni connessione (vedi sopra)
+                token = _contatore_async.set(contatore)
+                try:
+                    risposta = await view(request, *args, **kwargs)
+                finally:
+                    _contatore_async.reset(token)
+                _verifica(view.__name__, massimo, contatore, modalita)
+                return risposta
+            return wrapper_async
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            modalita = impostazione('BUDGET_QUERY')
+            if modalita is None:
+                return view(request, *args, **kwargs)
+            contatore = _Contatore()
+            with _conta_query(contatore):
+                risposta = view(request, *args, **kwargs)
+            _verifica(view.__name__, massimo, contatore, modalita)
+            return risposta
+        return wrapper
+    return decorator
@@ -0,0 +1,372 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers, quote_etag,
+)
+from rest_framework import status
+from rest_framework.response import Response
+
+from .conf import impostazione
+from .repliche import versione_lettura
+
+
+# --- CACHE DELLE RISPOSTE DEL CATALOGO ---
+#
+# Il catalogo si legge MOLTO più spesso di quanto si modifichi: è inutile
+# rifare la stessa query a ogni GET se nel frattempo nessuno ha scritto.
+#
+# Idea: "generazione" del catalogo = un contatore che aumenta a ogni scrittura
+#   chiave cache = (endpoint, parametri, generazione)
+#   - lettura: se la chiave c'è → risposta pronta, ZERO query
+#   - scrittura: generazione + 1 → tutte le chiavi vecchie diventano
+#     irraggiungibili (nessuna cancellazione esplicita!) e l'LRU le espelle
+#
+# ⚠️ La generazione sta nella cache di Django (CACHES in settings.py):
+# con una cache condivisa (es. Redis) una scrittura in un processo invalida
+# le risposte di TUTTI i processi. La LocMemCache di default vale per un
+# solo processo (va bene con runserver): con più worker, quelli che non hanno
+# fatto la scrittura continuerebbero a servire le risposte vecchie (e i 304
+# per l'ETag vecchio). Per questo con API_CATALOGO['PROCESSI'] > 1 l'app
+# NON parte se CACHE_ALIAS è una cache di processo (verifica_cache_condivisa).
+# ⚠️ PROCESSI lo dichiara chi configura il server: Django non sa quanti
+# worker avvierà gunicorn / uvicorn.
+#
+# ⚠️ Con le repliche (api/repliche.py) nella chiave c'è anche la versione
+# della replica letta: subito dopo una scrittura la generazione è già nuova
+# ma la replica non ancora, e la sua risposta vecchia non deve valere per la
+# generazione nuova.
+
+_CHIAVE_GENERAZIONE = 'api:catalogo:generazione'
+
+
+class CacheLRU:
+    """
+    Cache in memoria con numero massimo di voci ed espulsione LRU
+    (Least Recently Used: quando è piena esce la voce usata meno di recente).
+
+    Esempio:
+        cache = CacheLRU(max_voci=2)
+        cache.imposta('a', 1)
+        cache.imposta('b', 2)
+        cache.leggi('a')           # → 1 ('a' diventa la più recente)
+        cache.imposta('c', 3)      # espelle 'b'
+        cache.imposta('d', 4, ttl=30)  # scade dopo 30 secondi
+
+    ⚠️ Thread-safe: con un server multi-thread più richieste la usano insieme.
+    """
+
+    MANCANTE = object()  # distingue "non in cache" da un valore None salvato
+
+    def __init__(self, max_voci):
+        self.max_voci = max_voci
+        self._voci = OrderedDict()  # chiave → (valore, scadenza | None)
+        self._lock = threading.Lock()
+        self.hit = 0
+        self.miss = 0
+        self.evizioni = 0
+
+    def leggi(self, chiave):
+        """Restituisce il valore oppure CacheLRU.MANCANTE."""
+        with self._lock:
+            voce = self._voci.get(chiave)
+            if voce is not None and (voce[1] is None or voce[1] > time.monotonic()):
+                self._voci.move_to_end(chiave)  # ora è la più recente
+                self.hit += 1
+                return voce[0]
+            if voce is not None:
+                del self._voci[chiave]  # scaduta
+            self.miss += 1
+            return self.MANCANTE
+
+    def imposta(self, chiave, valore, ttl=None):
+        """Salva un valore (ttl in secondi, None = finché non viene espulso)."""
+        if self.max_voci <= 0:
+            return
+        scadenza = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._voci[chiave] = (valore, scadenza)
+            self._voci.move_to_end(chiave)
+            while len(self._voci) > self.max_voci:
+                self._voci.popitem(last=False)  # la meno recente
+                self.evizioni += 1
+
+    def elimina(self, chiave):
+        with self._lock:
+            self._voci.pop(chiave, None)
+
+    def svuota(self):
+        with self._lock:
+            self._voci.clear()
+
+    def statistiche(self):
+        with self._lock:
+            richieste = self.hit + self.miss
+            return {
+                'voci': len(self._voci),
+                'max_voci': self.max_voci,
+                'hit': self.hit,
+                'miss': self.miss,
+                'evizioni': self.evizioni,
+                'hit_ratio': round(self.hit / richieste, 4) if richieste else None,
+            }
+
+
+def _cache_django():
+    return caches[impostazione('CACHE_ALIAS')]
+
+
+# Backend che vivono dentro UN processo
+_CACHE_DI_PROCESSO = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def verifica_cache_condivisa():
+    """
+    ImproperlyConfigured se PROCESSI > 1 e la generazione sta in una cache di
+    processo. Chiamata all'avvio (ApiConfig.ready(), api/apps.py).
+    """
+    if impostazione('PROCESSI') <= 1:
+        return
+    alias = impostazione('CACHE_ALIAS')
+    backend = settings.CACHES.get(alias, {}).get('BACKEND')
+    if backend in _CACHE_DI_PROCESSO:
+        raise ImproperlyConfigured(
+            f"API_CATALOGO['PROCESSI'] = {impostazione('PROCESSI')} ma CACHES['{alias}'] è {backend}: "
+            f'ogni processo avrebbe la sua generazione del catalogo. Serve una cache condivisa (Redis, Memcached, ...)'
+        )
+
+
+def generazione_catalogo():
+    """Generazione corrente del catalogo (cambia a ogni scrittura)."""
+    cache = _cache_django()
+    generazione = cache.get(_CHIAVE_GENERAZIONE)
+    if generazione is None:
+        # Valore iniziale = orologio in nanosecondi: dopo un riavvio non si
+        # riparte da 0, quindi le generazioni "vecchie" non tornano mai valide
+        cache.add(_CHIAVE_GENERAZIONE, time.time_ns(), timeout=None)
+        generazione = cache.get(_CHIAVE_GENERAZIONE)
+    return generazione
+
+
+def incrementa_generazione():
+    """Da chiamare dopo OGNI scrittura sul catalogo (vedi api/signals.py)."""
+    cache = _cache_django()
+    try:
+        return cache.incr(_CHIAVE_GENERAZIONE)
+    except ValueError:
+        # Chiave assente (cache appena avviata o svuotata): la crea
+        return generazione_catalogo()
+
+
+# Una sola cache di risposte per processo (dimensione letta al primo uso)
+_risposte = None
+
+
+def cache_risposte():
+    global _risposte
+    if _risposte is None:
+        _risposte = CacheLRU(impostazione('CACHE_RISPOSTE_MAX_VOCI'))
+    return _risposte
+
+
+# Conteggi delle faccette (?facets=, vedi api/faccette.py): una voce per
+# filtro, valida fino alla prossima scrittura (la generazione è nella chiave)
+_faccette = None
+
+
+def cache_faccette():
+    global _faccette
+    if _faccette is None:
+        _faccette = CacheLRU(impostazione('CACHE_FACCETTE_MAX_VOCI'))
+    return _faccette
+
+
+# --- CACHE DEI DETTAGLI (GET /api/software/<id>/) ---
+#
+# Una voce per id: il dizionario serializzato del software, oppure None se
+# l'id NON esiste ("negative caching"). Così chi prova id inesistenti a
+# raffica (scraper) riceve il 404 senza una query ogni volta.
+#
+# - voci positive: restano finché un signal non le invalida (api/signals.py)
+# - voci negative: scadono dopo CACHE_DETTAGLI_TTL_NEGATIVO secondi
+#
+# ⚠️ I signal invalidano solo la cache del processo che ha scritto: con
+# PROCESSI > 1 una voce vale solo per la generazione in cui è stata salvata
+# (leggi_dettaglio), come le risposte delle liste.
+_dettagli = None
+
+
+def cache_dettagli():
+    global _dettagli
+    if _dettagli is None:
+        _dettagli = CacheLRU(impostazione('CACHE_DETTAGLI_MAX_VOCI'))
+    return _dettagli
+
+
+def salva_dettaglio(software_id, dati, generazione):
+    """
+    Salva il dettaglio di un software (dati=None → "non esiste").
+
+    generazione: valore di generazione_catalogo() letto PRIMA della query.
+    ⚠️ Se nel frattempo qualcuno ha scritto, i dati letti potrebbero essere
+    già vecchi (e l'invalidazione è già passata): meglio non salvarli.
+    """
+    if generazione != generazione_catalogo():
+        return
+    ttl = impostazione('CACHE_DETTAGLI_TTL_NEGATIVO') if dati is None else None
+    cache_dettagli().imposta(software_id, (generazione, dati), ttl=ttl)
+
+
+def leggi_dettaglio(software_id):
+    """
+    Dettaglio in cache: dizionario, None ("non esiste") oppure CacheLRU.MANCANTE.
+
+    Con PROCESSI > 1 legge anche la generazione (una chiamata alla cache di
+    Django): una voce di una generazione vecchia è MANCANTE.
+    """
+    voce = cache_dettagli().leggi(software_id)
+    if voce is CacheLRU.MANCANTE:
+        return voce
+    generazione, dati = voce
+    if impostazione('PROCESSI') > 1 and generazione != generazione_catalogo():
+        return CacheLRU.MANCANTE
+    return dati
+
+
+def invalida_dettagli(ids):
+    """Toglie dalla cache i dettagli di questi id (None = svuota tutto)."""
+    cache = cache_dettagli()
+    if ids is None:
+        cache.svuota()
+        return
+    for software_id in ids:
+        cache.elimina(software_id)
+
+
+def chiave_richiesta(nome, request, kwargs):
+    """
+    Chiave che identifica UNA rappresentazione di un endpoint:
+    (endpoint, argomenti URL, host, parametri GET ordinati, formato della risposta).
+
+    L'host serve perché i link "next"/"prev" della paginazione sono URL assoluti.
+    """
+    formato = getattr(getattr(request, 'accepted_renderer', None), 'format', None)
+    return (
+        nome,
+        tuple(sorted(kwargs.items())),
+        request.get_host(),
+        tuple(sorted((chiave, tuple(valori)) for chiave, valori in request.query_params.lists())),
+        formato,
+    )
+
+
+def cache_catalogo(nome):
+    """
+    Decorator: mette in cache le risposte di una view di lettura del catalogo.
+
+    Uso (SOTTO @api_view e @renderer_classes):
+        @api_view(['GET'])
+        @cache_catalogo('lista_software')
+        def lista_software(request): ...
+
+    - Si salvano solo le Response 200 e 404 (le risposte in streaming no)
+    - Header X-Cache: HIT / MISS per il debug
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            cache = cache_risposte()
+            chiave = (generazione_catalogo(), versione_lettura(), chiave_richiesta(nome, request, kwargs))
+
+            salvata = cache.leggi(chiave)
+            if salvata is not CacheLRU.MANCANTE:
+                codice, dati = salvata
+                risposta = Response(dati, status=codice)
+                risposta['X-Cache'] = 'HIT'
+                return risposta
+
+            risposta = view(request, *args, **kwargs)
+            if isinstance(risposta, Response) and risposta.status_code in (
+                status.HTTP_200_OK, status.HTTP_404_NOT_FOUND
+            ):
+                cache.imposta(chiave, (risposta.status_code, risposta.data))
+                risposta['X-Cache'] = 'MISS'
+            return risposta
+        return wrapper
+    return decorator
+
+
+# --- ETAG E RICHIESTE CONDIZIONALI (304 NOT MODIFIED) ---
+#
+# 1ª richiesta:  GET /api/software/           → 200 + ETag: "18f3a...-9c1d..."
+# 2ª richiesta:  GET /api/software/
+#                If-None-Match: "18f3a...-9c1d..."
+#                → 304 Not Modified, SENZA body: il client riusa la sua copia
+#
+# L'ETag NON è l'hash del body (bisognerebbe prima generarlo!): è calcolato
+# dalla generazione del catalogo + la chiave della richiesta. Così il 304
+# parte PRIMA di qualunque query o serializzazione.
+
+
+def etag_richiesta(nome, request, kwargs):
+    """ETag forte (tra virgolette) di una rappresentazione di un endpoint."""
+    impronta = hashlib.blake2b(
+        repr(chiave_richiesta(nome, request, kwargs)).encode(), digest_size=8
+    ).hexdigest()
+    generazione = f'{generazione_catalogo():x}'
+    versione = versione_lettura()
+    if versione is not None:
+        generazione += f'.{versione:x}'  # letta da una replica (api/repliche.py)
+    return quote_etag(f'{generazione}-{impronta}')
+
+
+def _intestazioni_cache(risposta, etag):
+    """ETag + Cache-Control + Vary: uguali sulla risposta 200 e sulla 304."""
+    risposta['ETag'] = etag
+    # Cache-Control: public, max-age=5, stale-while-revalidate=30
+    # stale-while-revalidate: il proxy può servire la copia scaduta mentre
+    # in background la riconvalida (con If-None-Match → di solito 304)
+    patch_cache_control(risposta, **impostazione('CACHE_CONTROL'))
+    # La stessa URL ha rappresentazioni diverse (JSON, NDJSON) a seconda di Accept
+    patch_vary_headers(risposta, ['Accept'])
+
+
+def etag_catalogo(nome):
+    """
+    Decorator: ETag + If-None-Match (304) + Cache-Control per le view di lettura.
+
+    Uso (SOTTO @api_view e @renderer_classes, SOPRA @cache_catalogo):
+        @api_view(['GET'])
+        @etag_catalogo('lista_software')
+        @cache_catalogo('lista_software')
+        def lista_software(request): ...
+
+    Simile a django.views.decorators.http.condition(), ma l'ETag viene
+    aggiunto solo alle risposte 200 (non a 400/404).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            etag = etag_richiesta(nome, request, kwargs)
+
+            # 304 (o 412 per If-Match) → la view NON viene eseguita
+            condizionale = get_conditional_response(request, etag=etag)
+            if condizionale is not None:
+                _intestazioni_cache(condizionale, etag)
+                return condizionale
+
+            risposta = view(request, *args, **kwargs)
+            if risposta.status_code == status.HTTP_200_OK:
+                _intestazioni_cache(risposta, etag)
+            return risposta
+        return wrapper
+    return decorator
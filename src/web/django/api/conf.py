@@ -0,0 +1,88 @@
+from django.conf import settings
+
+
+# --- IMPOSTAZIONI DELL'APP API ---
+# Tutte le opzioni configurabili dell'app stanno in UN SOLO dizionario di
+# settings.py, come fa Django REST Framework con REST_FRAMEWORK:
+#
+# API_CATALOGO = {
+#     'PAGINAZIONE_LIMIT_DEFAULT': 50,
+#     'PAGINAZIONE_LIMIT_MAX': 500,
+# }
+#
+# Le chiavi non specificate usano i valori di DEFAULTS qui sotto.
+# ⚠️ Le impostazioni vengono lette a ogni chiamata (non copiate all'import):
+# così override_settings() nei test funziona senza trucchi.
+
+DEFAULTS = {
+    # Paginazione a cursore (keyset) di GET /api/software/
+    'PAGINAZIONE_LIMIT_DEFAULT': 50,   # righe per pagina se ?limit= manca
+    'PAGINAZIONE_LIMIT_MAX': 500,      # massimo accettato per ?limit=
+
+    # Risposte in streaming (?stream=1 o Accept: application/x-ndjson)
+    'STREAMING_CHUNK': 2000,           # righe lette dal DB (e inviate) per blocco
+
+    # Serializzazione in lettura da values_list() (False = SoftwareSerializer classico)
+    'SERIALIZZATORE_VELOCE': True,
+
+    # Cache delle risposte di lettura (api/cache.py)
+    'CACHE_ALIAS': 'default',          # cache di Django (CACHES) che tiene la generazione
+    'PROCESSI': 1,                     # processi del server (es. worker di gunicorn): > 1 = cache condivisa obbligatoria
+    'CACHE_RISPOSTE_MAX_VOCI': 256,    # risposte tenute in memoria (0 = cache disattivata)
+
+    # Cache dei dettagli GET /api/software/<id>/ (api/cache.py)
+    'CACHE_DETTAGLI_MAX_VOCI': 10000,  # software tenuti in memoria (0 = disattivata)
+    'CACHE_DETTAGLI_TTL_NEGATIVO': 30,  # secondi di cache per gli id inesistenti
+
+    # Faccette (?facets=, api/faccette.py)
+    'CACHE_FACCETTE_MAX_VOCI': 256,    # filtri diversi con i conteggi in memoria (0 = disattivata)
+    'FACCETTE_PRODUTTORI_MAX': 10,     # produttori restituiti nella faccetta (i più frequenti)
+
+    # Operazioni di massa (POST /api/software/bulk/, ...)
+    'BULK_BATCH_SIZE': 1000,           # righe per singola query INSERT/UPDATE
+    'BULK_MAX_ELEMENTI': 10000,        # elementi accettati in una richiesta
+    'SEGNALI_ESTERNI': False,          # True = altre app ascoltano pre/post_save o pre/post_delete di Software
+
+    # Middleware delle view async /api/async/... (api/asgi.py): SOLO middleware async
+    'ASYNC_MIDDLEWARE': ['api.middleware.IntestazioniSicurezza'],
+
+    # Eventi in tempo reale GET /api/async/software/events/ (api/eventi.py)
+    'EVENTI_CODA_MAX': 100,            # eventi non letti per client, oltre → client scollegato
+    'EVENTI_HEARTBEAT': 15,            # secondi tra due ": ping" sulle connessioni senza eventi
+    'EVENTI_ISCRITTI_MAX': 10000,      # client connessi per processo, oltre → 503
+
+    # Esportazione GET /api/software/export/ (api/esportazione.py)
+    'ESPORTAZIONE_CARTELLA': None,      # snapshot su disco (None = cartella temporanea del sistema)
+    'ESPORTAZIONE_SNAPSHOT_MAX': 2,     # snapshot tenuti per formato (generazioni più recenti)
+
+    # PRAGMA eseguiti su ogni nuova connessione SQLite (api/connessioni.py; {} = nessuno)
+    'SQLITE_PRAGMA': {
+        'busy_timeout': 5000,          # ms di attesa su database occupato
+        'journal_mode': 'WAL',         # lettori e scrittore non si bloccano a vicenda
+        'synchronous': 'NORMAL',       # fsync al checkpoint, non a ogni COMMIT
+        'mmap_size': 268435456,        # 256 MB letti via memoria mappata
+        'cache_size': -65536,          # 64 MB di cache per connessione
+        'temp_store': 'MEMORY',        # ordinamenti temporanei in RAM
+    },
+
+    # Repliche di sola lettura (api/repliche.py; [] = tutto sul primario 'default')
+    'REPLICHE_LETTURA': [],            # alias di DATABASES per le GET del catalogo
+    'REPLICHE_FINESTRA': 10,           # secondi di letture dal primario dopo una scrittura
+    'REPLICHE_RITARDO_MAX': 60,        # secondi di ritardo oltre i quali la replica si salta (None = nessun limite)
+
+    # Budget di query per view (@budget_query, api/budget.py):
+    # None = nessun controllo, 'avviso' = log di warning, 'errore' = eccezione (test)
+    'BUDGET_QUERY': None,
+
+    # Header Cache-Control delle letture con ETag (argomenti di patch_cache_control)
+    'CACHE_CONTROL': {'public': True, 'max_age': 5, 'stale_while_revalidate': 30},
+}
+
+
+def impostazione(nome):
+    """
+    Restituisce il valore di un'impostazione dell'app.
+
+    Esempio: impostazione('PAGINAZIONE_LIMIT_MAX') → 500
+    """
+    return getattr(settings, 'API_CATALOGO', {}).get(nome, DEFAULTS[nome])
@@ -0,0 +1,89 @@
+import re
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from .conf import impostazione
+
+
+# --- PROFILO DI PRESTAZIONI DI SQLITE ---
+#
+# Con la configurazione di default di Django SQLite usa il "rollback journal":
+# mentre uno scrittore fa COMMIT nessuno può leggere, e sotto carico compaiono
+# gli errori "database is locked". Qui, a OGNI nuova connessione, si eseguono
+# i PRAGMA di API_CATALOGO['SQLITE_PRAGMA'] (api/conf.py):
+#
+#   busy_timeout  ms di attesa se il database è occupato, prima dell'errore
+#   journal_mode  WAL = i lettori leggono l'ultima versione confermata MENTRE
+#                 uno scrittore lavora (lettori e scrittore non si bloccano)
+#   synchronous   NORMAL = in WAL un fsync al checkpoint, non a ogni COMMIT:
+#                 un crash del SISTEMA può perdere le ultime transazioni, mai
+#                 corrompere il database
+#   mmap_size     byte del file letti via memoria mappata (niente copie read())
+#   cache_size    pagine in cache per connessione (negativo = KB)
+#   temp_store    MEMORY = tabelle temporanee (ORDER BY, GROUP BY) in RAM
+#
+# python manage.py bench_sqlite   → letture e scritture concorrenti sul catalogo,
+#                                   con e senza profilo
+#
+# ⚠️ Django 5.0 non ha OPTIONS['init_command'] per SQLite (arriva in 5.1):
+# per questo il signal connection_created, che vale per OGNI alias SQLite.
+# Con CONN_MAX_AGE = 0 (default) ogni richiesta apre una connessione: i PRAGMA
+# costano pochi microsecondi (journal_mode=WAL su un database già in WAL non
+# fa nulla).
+#
+# ⚠️ journal_mode=WAL resta scritto NEL FILE: accanto a db.sqlite3 compaiono
+# db.sqlite3-wal e db.sqlite3-shm (la cartella deve essere scrivibile, e il
+# database non deve stare su un disco di rete). Per tornare indietro:
+# 'journal_mode': 'DELETE'.
+
+# Ordine di esecuzione: busy_timeout PRIMA di journal_mode, così il passaggio
+# a WAL aspetta (invece di fallire) se un altro processo sta scrivendo
+PRAGMA_AMMESSI = ('busy_timeout', 'journal_mode', 'synchronous', 'mmap_size', 'cache_size', 'temp_store')
+
+# Valori ammessi: numeri (anche negativi) o parole (WAL, NORMAL, MEMORY, ...).
+# I PRAGMA non accettano parametri "?": il valore finisce nel testo SQL
+_VALORE_VALIDO = re.compile(r'-?\d+|[A-Za-z]+')
+
+
+def pragma_profilo(profilo=None):
+    """
+    Istruzioni SQL del profilo (default: impostazione SQLITE_PRAGMA), in ordine.
+
+    Esempio: pragma_profilo({'journal_mode': 'WAL'}) → ['PRAGMA journal_mode = WAL']
+    """
+    if profilo is None:
+        profilo = impostazione('SQLITE_PRAGMA') or {}
+    sconosciuti = set(profilo) - set(PRAGMA_AMMESSI)
+    if sconosciuti:
+        raise ImproperlyConfigured(
+            f'SQLITE_PRAGMA: PRAGMA non previsti {sorted(sconosciuti)} (ammessi: {", ".join(PRAGMA_AMMESSI)})'
+        )
+    istruzioni = []
+    for nome in PRAGMA_AMMESSI:
+        if nome not in profilo:
+            continue
+        valore = str(profilo[nome])
+        if not _VALORE_VALIDO.fullmatch(valore):
+            raise ImproperlyConfigured(f'SQLITE_PRAGMA: valore non valido per {nome}: {valore!r}')
+        istruzioni.append(f'PRAGMA {nome} = {valore}')
+    return istruzioni
+
+
+def applica_profilo(connessione, profilo=None):
+    """
+    Esegue i PRAGMA del profilo su una connessione sqlite3 (DB-API, non Django).
+
+    ⚠️ Direttamente sulla connessione di sqlite3 e non con un cursore di
+    Django: i PRAGMA sono preparazione della connessione, non query della
+    view (niente connection.queries, niente conteggio di @budget_query).
+    """
+    for istruzione in pragma_profilo(profilo):
+        connessione.execute(istruzione)
+
+
+@receiver(connection_created, dispatch_uid='api.connessioni.profilo_sqlite')
+def _connessione_creata(sender, connection, **kwargs):
+    if connection.vendor == 'sqlite':
+        applica_profilo(connection.connection)
@@ -0,0 +1,478 @@
+import csv
+import io
+import itertools
+import json
+import os
+import re
+import struct
+import sys
+import tempfile
+import zlib
+from array import array
+from datetime import date
+from decimal import Decimal
+
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import content_disposition_header
+from rest_framework import renderers, status
+
+from .cache import generazione_catalogo
+from .conf import impostazione
+from .models import Software
+
+
+# --- ESPORTAZIONE DEL CATALOGO (CSV / FORMATO A COLONNE) ---
+#
+# GET /api/software/export/                     → catalogo.csv
+# GET /api/software/export/?gzip=1              → catalogo.csv.gz
+# GET /api/software/export/?format=colonne      → catalogo.colonne (binario a colonne)
+# python manage.py esporta_software catalogo.csv.gz --gzip
+#
+# Per un dump completo GET /api/software/ passa da DRF: oggetti Python,
+# serializzazione in JSON, ~100 byte di chiavi ripetute per OGNI riga.
+# Qui le righe arrivano da values_list().iterator() a blocchi di
+# STREAMING_CHUNK e ogni blocco diventa subito byte: memoria costante
+# qualunque sia la dimensione della tabella.
+#
+# Download interrotto? Si riprende con una richiesta Range:
+#   GET /api/software/export/?gzip=1
+#   Range: bytes=52428800-
+#   If-Range: "esportazione-18f3a...-csv.gz"      (ETag della prima risposta)
+#   → 206 Partial Content, solo i byte mancanti
+#
+# ⚠️ Per rispondere a un Range servono byte IDENTICI a quelli già scaricati:
+# per questo il primo download di ogni generazione del catalogo (api/cache.py)
+# viene scritto anche su disco ("snapshot", nella cartella
+# ESPORTAZIONE_CARTELLA) mentre viene inviato. Le richieste successive con la
+# stessa generazione, Range compresi, leggono il file: zero query.
+# Se il catalogo cambia MENTRE lo snapshot si scrive, i byte possono mescolare
+# due generazioni: il file non viene tenuto (la prossima richiesta lo rifà).
+# Quando il catalogo cambia → generazione nuova → ETag e snapshot nuovi; si
+# tengono gli ultimi ESPORTAZIONE_SNAPSHOT_MAX per formato, così chi sta
+# riprendendo un download vecchio (If-Range con l'ETag vecchio) lo finisce.
+
+# --- FORMATO A COLONNE ---
+#
+# CSV = una riga dopo l'altra, tutto testo ("239.88", "2023-10-10", "true").
+# Il formato a colonne mette insieme i valori della STESSA colonna, in binario
+# a larghezza fissa dove possibile (idea di Parquet / Arrow, senza dipendenze):
+#
+#   intestazione: MAGICO + lunghezza (uint32) + schema JSON
+#                 {"versione": 1, "colonne": [{"nome": "id", "tipo": "intero"}, ...]}
+#   blocco:       numero di righe (uint32), poi ogni colonna per intero:
+#                   intero     int64 × righe
+#                   centesimi  int64 × righe   (prezzo 239.88 → 23988)
+#                   booleano   uint8 × righe
+#                   data       int32 × righe   (giorni dal 1970-01-01)
+#                   testo      int32 × (righe + 1) offset, poi i byte UTF-8
+#   fine:         un blocco da 0 righe
+#
+# Numeri little-endian. Nessuna colonna di Software ammette NULL: il formato
+# non li prevede. Chi legge una sola colonna salta le altre senza decodificarle
+# (leggi_colonne() qui sotto è il lettore di riferimento).
+
+MAGICO = b'PWWCOL1\n'
+
+COLONNE = (
+    ('id', 'intero'),
+    ('nome', 'testo'),
+    ('versione', 'testo'),
+    ('produttore', 'testo'),
+    ('prezzo', 'centesimi'),
+    ('gratuito', 'booleano'),
+    ('data_rilascio', 'data'),
+)
+
+_UINT32 = struct.Struct('<I')
+_EPOCA = date(1970, 1, 1).toordinal()
+_LITTLE_ENDIAN = sys.byteorder == 'little'
+
+# formato → (estensione, content type)
+FORMATI = {
+    'csv': ('csv', 'text/csv; charset=utf-8'),
+    'colonne': ('colonne', 'application/vnd.pww.colonne'),
+}
+
+
+class CSVRenderer(renderers.BaseRenderer):
+    """
+    'text/csv' (?format=csv o Accept: text/csv) per GET /api/software/export/.
+
+    ⚠️ Come NDJSONRenderer (api/streaming.py): i dati veri arrivano in
+    streaming dalla view, questo renderer serve solo per le risposte di
+    errore (es. 405), che restano JSON.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return b'' if data is None else json.dumps(data).encode()
+
+
+class ColonneRenderer(CSVRenderer):
+    """'application/vnd.pww.colonne' (?format=colonne): il formato a colonne."""
+    media_type = 'application/vnd.pww.colonne'
+    format = 'colonne'
+    charset = None
+
+
+# Il primo è il default (Accept: */*)
+RENDERER_ESPORTAZIONE = [CSVRenderer, ColonneRenderer]
+
+
+def _blocchi(righe, dimensione):
+    iteratore = iter(righe)
+    while blocco := list(itertools.islice(iteratore, dimensione)):
+        yield blocco
+
+
+def righe_esportazione(alias=None):
+    """
+    Tuple nell'ordine di COLONNE, lette a blocchi di STREAMING_CHUNK.
+
+    ORDER BY id: scorre la chiave primaria, niente ordinamento, e lo stesso
+    catalogo dà sempre gli stessi byte (serve ai Range).
+    """
+    queryset = Software.objects.using(alias) if alias else Software.objects
+    return (
+        queryset.order_by('id')
+        .values_list(*(nome for nome, _ in COLONNE))
+        .iterator(chunk_size=impostazione('STREAMING_CHUNK'))
+    )
+
+
+def genera_csv(righe):
+    """Tuple → blocchi di byte CSV (intestazione + una riga per software)."""
+    buffer = io.StringIO()
+    scrittore = csv.writer(buffer, lineterminator='\n')
+    scrittore.writerow([nome for nome, _ in COLONNE])
+    # L'intestazione SUBITO, come genera_colonne(): con il catalogo vuoto il
+    # ciclo non gira, e il CSV deve essere comunque la sola intestazione
+    yield buffer.getvalue().encode()
+    buffer.seek(0)
+    buffer.truncate()
+    for blocco in _blocchi(righe, impostazione('STREAMING_CHUNK')):
+        # Booleani come in JSON ('true'/'false'), non 'True'/'False' di Python
+        scrittore.writerows(
+            (id_, nome, versione, produttore, prezzo, 'true' if gratuito else 'false', rilascio.isoformat())
+            for id_, nome, versione, produttore, prezzo, gratuito, rilascio in blocco
+        )
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def _little_endian(valori):
+    """array → byte little-endian (su una CPU big-endian vanno girati)."""
+    if not _LITTLE_ENDIAN:
+        valori.byteswap()
+    return valori.tobytes()
+
+
+def _codifica_colonna(tipo, valori):
+    if tipo == 'intero':
+        return _little_endian(array('q', valori))
+    if tipo == 'centesimi':
+        return _little_endian(array('q', (int(valore.scaleb(2)) for valore in valori)))
+    if tipo == 'booleano':
+        return bytes(valori)
+    if tipo == 'data':
+        return _little_endian(array('i', (valore.toordinal() - _EPOCA for valore in valori)))
+    # testo: offset di fine di ogni valore (il primo è 0) + tutti i byte di seguito
+    codificati = [valore.encode() for valore in valori]
+    offset = array('i', [0])
+    for valore in codificati:
+        offset.append(offset[-1] + len(valore))
+    return _little_endian(offset) + b''.join(codificati)
+
+
+def genera_colonne(righe):
+    """Tuple → blocchi di byte del formato a colonne (vedi sopra)."""
+    schema = json.dumps({
+        'versione': 1,
+        'colonne': [{'nome': nome, 'tipo': tipo} for nome, tipo in COLONNE],
+    }).encode()
+    yield MAGICO + _UINT32.pack(len(schema)) + schema
+    for blocco in _blocchi(righe, impostazione('STREAMING_CHUNK')):
+        # zip(*blocco): da righe a colonne
+        colonne = zip(*blocco)
+        yield _UINT32.pack(len(blocco)) + b''.join(
+            _codifica_colonna(tipo, valori) for (_, tipo), valori in zip(COLONNE, colonne)
+        )
+    yield _UINT32.pack(0)
+
+
+def _leggi(flusso, numero):
+    dati = flusso.read(numero)
+    if len(dati) != numero:
+        raise ValueError('File a colonne troncato')
+    return dati
+
+
+def _da_little_endian(tipo, dati):
+    valori = array(tipo)
+    valori.frombytes(dati)
+    if not _LITTLE_ENDIAN:
+        valori.byteswap()
+    return valori
+
+
+def leggi_colonne(flusso):
+    """
+    Lettore di riferimento del formato a colonne: un dizionario
+    nome → lista di valori per ogni blocco.
+
+    Esempio:
+        with open('catalogo.colonne', 'rb') as f:
+            for blocco in leggi_colonne(f):
+                print(sum(blocco['prezzo']))   # Decimal
+    """
+    if _leggi(flusso, len(MAGICO)) != MAGICO:
+        raise ValueError('Non è un file a colonne del catalogo')
+    schema = json.loads(_leggi(flusso, _UINT32.unpack(_leggi(flusso, 4))[0]))
+    while righe := _UINT32.unpack(_leggi(flusso, 4))[0]:
+        blocco = {}
+        for colonna in schema['colonne']:
+            tipo = colonna['tipo']
+            if tipo == 'testo':
+                offset = _da_little_endian('i', _leggi(flusso, 4 * (righe + 1)))
+                testo = _leggi(flusso, offset[-1])
+                valori = [testo[offset[i]:offset[i + 1]].decode() for i in range(righe)]
+            elif tipo == 'booleano':
+                valori = [bool(valore) for valore in _leggi(flusso, righe)]
+            elif tipo == 'data':
+                valori = [date.fromordinal(g + _EPOCA) for g in _da_little_endian('i', _leggi(flusso, 4 * righe))]
+            else:
+                valori = list(_da_little_endian('q', _leggi(flusso, 8 * righe)))
+                if tipo == 'centesimi':
+                    valori = [Decimal(valore).scaleb(-2) for valore in valori]
+            blocco[colonna['nome']] = valori
+        yield blocco
+
+
+def comprimi(blocchi):
+    """Comprime in gzip un blocco alla volta (memoria costante)."""
+    # wbits=31: formato gzip (non zlib "nudo"); data di modifica nell'header = 0,
+    # quindi stessi dati → stessi byte compressi
+    compressore = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for blocco in blocchi:
+        if compresso := compressore.compress(blocco):
+            yield compresso
+    yield compressore.flush()
+
+
+def genera_esportazione(formato, gzip=False, alias=None):
+    """Blocchi di byte dell'esportazione completa ('csv' o 'colonne')."""
+    righe = righe_esportazione(alias)
+    blocchi = genera_csv(righe) if formato == 'csv' else genera_colonne(righe)
+    return comprimi(blocchi) if gzip else blocchi
+
+
+def scrivi_su_file(blocchi, percorso, generazione=None):
+    """
+    Inoltra i blocchi (per lo streaming) e intanto li scrive in 'percorso'.
+
+    Il file compare solo COMPLETO: si scrive in un file temporaneo della
+    stessa cartella e alla fine os.replace() (atomico) lo rinomina.
+    ⚠️ Se il client chiude la connessione a metà, la scrittura continua fino
+    in fondo senza inviare: chi ha già ricevuto una parte la deve poter
+    riprendere (Range) con gli stessi byte.
+
+    generazione: quella del catalogo nell'ETag (e nel nome) dello snapshot.
+    Se a fine scrittura è cambiata, le righe lette possono essere già della
+    generazione nuova: il file temporaneo si butta invece di rinominarlo.
+    """
+    cartella = os.path.dirname(os.path.abspath(percorso))
+    descrittore, temporaneo = tempfile.mkstemp(dir=cartella, prefix='.esportazione-', suffix='.tmp')
+    try:
+        with os.fdopen(descrittore, 'wb') as file:
+            try:
+                for blocco in blocchi:
+                    file.write(blocco)
+                    yield blocco
+            except GeneratorExit:
+                for blocco in blocchi:
+                    file.write(blocco)
+        if generazione is not None and generazione_catalogo() != generazione:
+            os.remove(temporaneo)
+            return
+        os.chmod(temporaneo, 0o644)  # mkstemp() crea il file leggibile solo dal proprietario
+        os.replace(temporaneo, percorso)
+    except BaseException:
+        if os.path.exists(temporaneo):
+            os.remove(temporaneo)
+        raise
+
+
+# --- SNAPSHOT SU DISCO E RANGE ---
+
+_ETAG = re.compile(r'^"esportazione-([0-9a-f]+)-([a-z.]+)"$')
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+_BLOCCO_FILE = 64 * 1024
+
+NON_SODDISFACIBILE = object()
+
+
+def cartella_esportazioni():
+    """ESPORTAZIONE_CARTELLA (None = cartella temporanea del sistema)."""
+    cartella = impostazione('ESPORTAZIONE_CARTELLA') or os.path.join(tempfile.gettempdir(), 'pww-esportazioni')
+    os.makedirs(cartella, exist_ok=True)
+    return str(cartella)
+
+
+def estensione(formato, gzip):
+    return FORMATI[formato][0] + ('.gz' if gzip else '')
+
+
+def etag_esportazione(generazione, formato, gzip):
+    return quote_etag(f'esportazione-{generazione:x}-{estensione(formato, gzip)}')
+
+
+def percorso_snapshot(etag):
+    """ETag → file dello snapshot (None se l'ETag non è di un'esportazione)."""
+    trovato = _ETAG.match(etag)
+    estensioni = {estensione(formato, gzip) for formato in FORMATI for gzip in (False, True)}
+    if trovato is None or trovato.group(2) not in estensioni:
+        return None  # ⚠️ mai un percorso costruito con testo arbitrario del client
+    generazione, est = trovato.groups()
+    return os.path.join(cartella_esportazioni(), f'catalogo-{generazione}.{est}')
+
+
+def pulisci_snapshot(est):
+    """Tiene solo gli ultimi ESPORTAZIONE_SNAPSHOT_MAX snapshot con estensione 'est'."""
+    cartella = cartella_esportazioni()
+    snapshot = sorted(
+        (voce for voce in os.scandir(cartella)
+         if voce.name.startswith('catalogo-') and voce.name.endswith(f'.{est}')),
+        key=lambda voce: voce.stat().st_mtime, reverse=True,
+    )
+    for voce in snapshot[impostazione('ESPORTAZIONE_SNAPSHOT_MAX'):]:
+        try:
+            os.remove(voce.path)  # chi lo sta leggendo continua: il file aperto resta valido
+        except FileNotFoundError:
+            pass
+
+
+def crea_snapshot(percorso, formato, gzip, generazione=None):
+    """Scrive lo snapshot completo senza inviarlo (serve subito per un Range)."""
+    for _ in scrivi_su_file(genera_esportazione(formato, gzip), percorso, generazione):
+        pass
+    pulisci_snapshot(estensione(formato, gzip))
+
+
+def _snapshot_e_pulizia(blocchi, percorso, est, generazione):
+    yield from scrivi_su_file(blocchi, percorso, generazione)
+    pulisci_snapshot(est)
+
+
+def intervallo_richiesto(intestazione, dimensione):
+    """
+    Header Range → (primo, ultimo) byte inclusi, None (risposta intera) oppure
+    NON_SODDISFACIBILE (416).
+
+    Esempi con un file da 1000 byte:
+        'bytes=0-99'   → (0, 99)
+        'bytes=900-'   → (900, 999)
+        'bytes=-100'   → (900, 999)   (gli ultimi 100)
+        'bytes=0-9,20-29' → None      (più intervalli: si risponde con tutto, come ammesso dall'RFC)
+    """
+    trovato = _RANGE.match(intestazione.replace(' ', ''))
+    if trovato is None or trovato.groups() == ('', ''):
+        return None
+    primo, ultimo = trovato.groups()
+    if primo == '':
+        suffisso = int(ultimo)
+        return (max(dimensione - suffisso, 0), dimensione - 1) if suffisso else NON_SODDISFACIBILE
+    primo = int(primo)
+    if ultimo and primo > int(ultimo):
+        return None  # 'bytes=10-5': header non valido, si ignora
+    if primo >= dimensione:
+        return NON_SODDISFACIBILE
+    return primo, (min(int(ultimo), dimensione - 1) if ultimo else dimensione - 1)
+
+
+def _leggi_file(file, primo, lunghezza):
+    with file:
+        file.seek(primo)
+        while lunghezza > 0:
+            blocco = file.read(min(_BLOCCO_FILE, lunghezza))
+            if not blocco:
+                break
+            lunghezza -= len(blocco)
+            yield blocco
+
+
+def _intestazioni(risposta, etag, nome_file):
+    risposta['ETag'] = etag
+    risposta['Accept-Ranges'] = 'bytes'
+    risposta['Content-Disposition'] = content_disposition_header(True, nome_file)
+    return risposta
+
+
+def risposta_esportazione(request, formato, gzip):
+    """
+    La risposta di GET /api/software/export/: 304, 206 / 416 (Range),
+    snapshot da disco oppure primo download in streaming.
+    """
+    est = estensione(formato, gzip)
+    nome_file = f'catalogo.{est}'
+    content_type = 'application/gzip' if gzip else FORMATI[formato][1]
+    # ⚠️ Letta UNA volta: lo snapshot di questo ETag si tiene solo se a fine
+    # scrittura la generazione è ancora questa (scrivi_su_file)
+    generazione = generazione_catalogo()
+    etag = etag_esportazione(generazione, formato, gzip)
+
+    condizionale = get_conditional_response(request, etag=etag)
+    if condizionale is not None:
+        condizionale['ETag'] = etag
+        return condizionale
+
+    percorso = percorso_snapshot(etag)
+    intestazione_range = request.headers.get('Range')
+    if intestazione_range:
+        # If-Range: "riprendi SOLO se il file è ancora quello che ho in parte".
+        # ETag di una generazione vecchia il cui snapshot c'è ancora → si
+        # riprende da lì; altrimenti (snapshot sparito, data HTTP, ...) tutto
+        # il file nuovo con 200
+        if_range = request.headers.get('If-Range')
+        if if_range is None or if_range == etag:
+            if not os.path.exists(percorso):
+                crea_snapshot(percorso, formato, gzip, generazione)
+        elif (vecchio := percorso_snapshot(if_range)) and os.path.exists(vecchio):
+            etag, percorso = if_range, vecchio
+        else:
+            intestazione_range = None
+
+    # Il file può sparire tra exists() e open() (pulisci_snapshot di un'altra richiesta)
+    try:
+        file = open(percorso, 'rb')
+    except FileNotFoundError:
+        # Primo download di questa generazione: streaming + snapshot su disco
+        blocchi = _snapshot_e_pulizia(genera_esportazione(formato, gzip), percorso, est, generazione)
+        risposta = StreamingHttpResponse(blocchi, content_type=content_type)
+        risposta['X-Accel-Buffering'] = 'no'
+        return _intestazioni(risposta, etag, nome_file)
+
+    dimensione = os.fstat(file.fileno()).st_size
+    intervallo = intervallo_richiesto(intestazione_range, dimensione) if intestazione_range else None
+    if intervallo is None:
+        # FileResponse: Content-Length e, con i server che lo supportano, sendfile()
+        risposta = FileResponse(file, content_type=content_type)
+        return _intestazioni(risposta, etag, nome_file)
+
+    if intervallo is NON_SODDISFACIBILE:
+        file.close()
+        risposta = HttpResponse(status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+        risposta['Content-Range'] = f'bytes */{dimensione}'
+        return _intestazioni(risposta, etag, nome_file)
+
+    primo, ultimo = intervallo
+    risposta = StreamingHttpResponse(
+        _leggi_file(file, primo, ultimo - primo + 1),
+        status=status.HTTP_206_PARTIAL_CONTENT, content_type=content_type,
+    )
+    risposta['Content-Range'] = f'bytes {primo}-{ultimo}/{dimensione}'
+    risposta['Content-Length'] = ultimo - primo + 1
+    return _intestazioni(risposta, etag, nome_file)
@@ -0,0 +1,154 @@
+import asyncio
+import json
+import threading
+
+from .conf import impostazione
+
+
+# --- EVENTI DEL CATALOGO IN TEMPO REALE (SERVER-SENT EVENTS) ---
+#
+# GET /api/async/software/events/   (Accept: text/event-stream)
+#
+# Invece di chiedere GET /api/software/ ogni 10 secondi "è cambiato qualcosa?",
+# la dashboard apre UNA connessione e il server le manda le modifiche appena
+# avvengono:
+#
+#   id: 1234                    ← "token" del feed delle modifiche (api/modifiche.py)
+#   event: create
+#   data: {"azione": "create", "ids": [7], "token": 1234}
+#
+#   : ping                      ← commento ogni EVENTI_HEARTBEAT secondi
+#
+# Nel browser basta:  new EventSource('/api/async/software/events/')
+#
+# Come arrivano gli eventi:
+#   view di scrittura → catalogo_modificato (api/signals.py) → HubEventi.pubblica()
+#   → una coda LIMITATA per ogni client connesso → app ASGI applicazione_eventi()
+#   (api/asgi.py, servita da pww/asgi.py: solo con un server ASGI)
+#
+# ⚠️ Un client lento (o bloccato) NON deve rallentare chi scrive:
+#   - pubblica() non aspetta mai: mette l'evento in coda e torna subito
+#   - coda piena (più di EVENTI_CODA_MAX eventi non letti) → il client viene
+#     SCOLLEGATO (evento 'scollegato') invece di bloccare o crescere in memoria.
+#     Riconnettendosi recupera quello che ha perso con
+#     GET /api/software/changes/?since=<id dell'ultimo evento ricevuto>
+#     (nel browser: evento.lastEventId)
+#
+# ⚠️ "id" e "token" solo su SQLite (dove esiste il feed delle modifiche).
+#
+# ⚠️ Niente thread per connessione: ogni client è una coroutine che aspetta
+# sulla sua asyncio.Queue nel loop del server ASGI. Migliaia di client fermi
+# = migliaia di code vuote (pochi KB ciascuna), zero CPU (vedi api/asgi.py
+# per il perché NON passa dall'handler ASGI di Django).
+#
+# ⚠️ L'hub è per PROCESSO (come le cache di api/cache.py): con più worker
+# ogni client riceve solo le scritture fatte dal SUO worker. Per più processi
+# serve un canale condiviso (es. Redis pub/sub) al posto di pubblica().
+
+# Fine dello stream: coda di un client troppo lento / client che ha chiuso
+SCOLLEGATO = object()
+DISCONNESSO = object()
+
+
+class _Iscritto:
+    """Un client connesso: la sua coda e il loop di asyncio che la legge."""
+
+    __slots__ = ('coda', 'loop')
+
+    def __init__(self, loop, dimensione):
+        self.coda = asyncio.Queue(maxsize=dimensione)
+        self.loop = loop
+
+
+class HubEventi:
+    """
+    Distribuisce ogni evento a tutti i client iscritti.
+
+    Esempio:
+        hub = HubEventi()
+        iscritto = hub.iscrivi()              # dentro una coroutine (api/asgi.py)
+        hub.pubblica({'azione': 'delete', 'ids': [3]})   # da qualunque thread
+        evento = await iscritto.coda.get()
+        hub.disiscrivi(iscritto)
+
+    ⚠️ pubblica() viene chiamata dalle view SINCRONE (in un thread), le code
+    vivono nel loop di asyncio: asyncio.Queue non è thread-safe, quindi la
+    consegna passa da loop.call_soon_threadsafe(), UNA volta per loop (non
+    per client: con 5.000 client sarebbero 5.000 risvegli del loop).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._iscritti = {}  # loop → set di _Iscritto
+
+    def iscrivi(self):
+        """Nuovo client. Da chiamare dentro il loop che leggerà la coda."""
+        loop = asyncio.get_running_loop()
+        iscritto = _Iscritto(loop, impostazione('EVENTI_CODA_MAX'))
+        with self._lock:
+            self._iscritti.setdefault(loop, set()).add(iscritto)
+        return iscritto
+
+    def disiscrivi(self, iscritto):
+        with self._lock:
+            gruppo = self._iscritti.get(iscritto.loop)
+            if gruppo is not None:
+                gruppo.discard(iscritto)
+                if not gruppo:
+                    del self._iscritti[iscritto.loop]
+
+    def numero_iscritti(self):
+        with self._lock:
+            return sum(len(gruppo) for gruppo in self._iscritti.values())
+
+    def pubblica(self, evento):
+        """Consegna 'evento' (dizionario JSON) a tutti i client. Non blocca mai."""
+        with self._lock:
+            gruppi = [(loop, list(gruppo)) for loop, gruppo in self._iscritti.items()]
+        for loop, iscritti in gruppi:
+            try:
+                loop.call_soon_threadsafe(self._consegna, iscritti, evento)
+            except RuntimeError:
+                # Loop chiuso (server fermato): i suoi client non esistono più
+                with self._lock:
+                    self._iscritti.pop(loop, None)
+
+    def chiudi(self, iscritto, motivo):
+        """
+        Toglie il client e lascia nella sua coda solo 'motivo' (SCOLLEGATO o
+        DISCONNESSO): chi legge lo trova subito, senza eventi vecchi davanti.
+        Da chiamare dentro il loop del client.
+        """
+        self.disiscrivi(iscritto)
+        while not iscritto.coda.empty():
+            iscritto.coda.get_nowait()
+        iscritto.coda.put_nowait(motivo)
+
+    def _consegna(self, iscritti, evento):
+        """Gira DENTRO il loop: qui asyncio.Queue si può usare."""
+        for iscritto in iscritti:
+            try:
+                iscritto.coda.put_nowait(evento)
+            except asyncio.QueueFull:
+                # Client troppo lento: niente più eventi, lo stream si chiude
+                self.chiudi(iscritto, SCOLLEGATO)
+
+
+def formato_sse(evento, nome, id_evento=None):
+    """Dizionario → messaggio SSE ("[id: ...\\n]event: ...\\ndata: {...}\\n\\n")."""
+    testo = f'event: {nome}\ndata: {json.dumps(evento, separators=(",", ":"))}\n\n'
+    return testo if id_evento is None else f'id: {id_evento}\n' + testo
+
+
+_hub = None
+_lock_hub = threading.Lock()
+
+
+def hub_eventi():
+    """L'hub del processo (creato al primo uso)."""
+    global _hub
+    if _hub is None:
+        with _lock_hub:
+            if _hub is None:
+                _hub = HubEventi()
+    return _hub
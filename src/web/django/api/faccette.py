@@ -0,0 +1,129 @@
+from collections import Counter
+
+from django.db.models import Count, F
+from django.db.models.functions import ExtractYear
+from rest_framework.exceptions import ValidationError
+
+from .cache import CacheLRU, cache_faccette, generazione_catalogo
+from .conf import impostazione
+from .repliche import versione_lettura
+
+
+# --- FACCETTE (CONTEGGI PER I FILTRI DELLA UI) ---
+#
+# GET /api/software/?limit=20&facets=gratuito,produttore,anno
+#
+# Accanto alla lista, la UI mostra quanti software ci sono per ogni valore
+# dei filtri ("Gratuiti (12)", "Adobe (5)", "2024 (7)"):
+#
+#   "facets": {
+#       "gratuito":   [{"valore": false, "count": 30}, {"valore": true, "count": 12}],
+#       "produttore": [{"valore": "Adobe", "count": 5}, ...],   ← i più frequenti
+#       "anno":       [{"valore": 2024, "count": 7}, ...]       ← dal più recente
+#   }
+#
+# ⚠️ UNA query per tutte le faccette, non una COUNT per faccetta:
+#   SELECT gratuito, produttore, <anno di data_rilascio>, COUNT(*)
+#   FROM api_software WHERE <filtri della view>
+#   GROUP BY 1, 2, 3
+# e poi le somme per singola faccetta in Python (le righe sono i gruppi,
+# non i software: poche centinaia anche con milioni di righe).
+#
+# ⚠️ La query legge tutte le righe filtrate (~0,4 s per 200.000 righe su
+# SQLite): per questo il risultato va in cache.
+#
+# I conteggi valgono per TUTTI i risultati filtrati, non per la pagina:
+# si calcolano una volta per "firma" del filtro (l'SQL del queryset) e si
+# tengono in cache fino alla prossima scrittura (generazione del catalogo),
+# così sfogliare le pagine (?cursor=) non li ricalcola.
+
+class _Anno(ExtractYear):
+    """
+    ExtractYear, ma su SQLite senza funzione Python.
+
+    Django calcola l'anno su SQLite con django_date_extract(), una funzione
+    Python chiamata per OGNI riga (~5 volte più lenta). Le date sono testo
+    'YYYY-MM-DD': bastano le prime 4 lettere.
+    """
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.lhs)
+        return f'CAST(SUBSTR({sql}, 1, 4) AS INTEGER)', params
+
+
+# nome della faccetta → colonna o espressione del GROUP BY
+FACCETTE = {
+    'gratuito': F('gratuito'),
+    'produttore': F('produttore'),
+    'anno': _Anno('data_rilascio'),
+}
+
+
+def leggi_faccette(request):
+    """
+    Legge ?facets=gratuito,anno e restituisce i nomi (nell'ordine di
+    FACCETTE), oppure None se il client non le chiede.
+    Un nome sconosciuto è un errore 400.
+    """
+    # request.GET (non query_params): come leggi_campi(), vale anche per HttpRequest
+    valore = request.GET.get('facets')
+    if valore is None:
+        return None
+    nomi = {nome.strip() for nome in valore.split(',') if nome.strip()}
+    sconosciute = sorted(nomi - FACCETTE.keys())
+    if sconosciute or not nomi:
+        raise ValidationError({'facets': [
+            f'Faccette non valide: {", ".join(sconosciute) or "nessuna"}. Ammesse: {", ".join(FACCETTE)}.'
+        ]})
+    return tuple(nome for nome in FACCETTE if nome in nomi)
+
+
+def _ordina(nome, conteggi):
+    if nome == 'anno':
+        valori = sorted(conteggi.items(), reverse=True)  # dal più recente
+    else:
+        # Dal più frequente; a parità di conteggio in ordine di valore
+        valori = sorted(conteggi.items(), key=lambda voce: (-voce[1], str(voce[0])))
+        if nome == 'produttore':
+            valori = valori[:impostazione('FACCETTE_PRODUTTORI_MAX')]
+    return [{'valore': valore, 'count': numero} for valore, numero in valori]
+
+
+def calcola_faccette(queryset, nomi):
+    """
+    Conteggi delle faccette 'nomi' sulle righe di 'queryset'. UNA query.
+
+    Esempio:
+        calcola_faccette(Software.objects.filter(gratuito_uguale(True)), ('anno',))
+        → {'anno': [{'valore': 2024, 'count': 7}, {'valore': 2023, 'count': 5}]}
+    """
+    colonne = {f'faccetta_{nome}': FACCETTE[nome] for nome in nomi}
+    # order_by(): senza, l'ordinamento del queryset finirebbe nel GROUP BY
+    gruppi = queryset.order_by().values(**colonne).annotate(numero=Count('*'))
+
+    conteggi = {nome: Counter() for nome in nomi}
+    for gruppo in gruppi:
+        for nome in nomi:
+            conteggi[nome][gruppo[f'faccetta_{nome}']] += gruppo['numero']
+    return {nome: _ordina(nome, conteggi[nome]) for nome in nomi}
+
+
+def faccette_catalogo(queryset, nomi):
+    """
+    calcola_faccette() con cache: chiave = (generazione, replica, SQL del filtro, faccette).
+    Zero query se lo stesso filtro è già stato contato dopo l'ultima scrittura.
+    """
+    sql, parametri = queryset.order_by().query.sql_with_params()
+    chiave = (generazione_catalogo(), versione_lettura(), sql, parametri, nomi)
+
+    cache = cache_faccette()
+    faccette = cache.leggi(chiave)
+    if faccette is CacheLRU.MANCANTE:
+        faccette = calcola_faccette(queryset, nomi)
+        cache.imposta(chiave, faccette)
+    return faccette
+
+
+def faccette_risposta(queryset, nomi):
+    """{'facets': {...}} da unire alla risposta, oppure {} se ?facets= manca."""
+    return {'facets': faccette_catalogo(queryset, nomi)} if nomi else {}
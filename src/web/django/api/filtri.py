@@ -0,0 +1,120 @@
+from django.db.models import Q, Value
+from django.db.models.functions import Lower
+from django.db.models.lookups import Exact
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+
+def produttore_uguale(produttore):
+    """
+    Condizione "produttore uguale, senza distinguere maiuscole/minuscole".
+
+    Equivale a Q(produttore__iexact=produttore), ma con SQL diverso:
+        iexact (SQLite):  WHERE produttore LIKE 'adobe' ESCAPE '\\'
+        questa:           WHERE LOWER(produttore) = LOWER('adobe')
+
+    ⚠️ LIKE non può usare nessun indice; LOWER(produttore) = ... usa l'indice
+    funzionale software_produttore_lower_idx (api/models.py). LOWER() anche
+    sul valore: il database converte entrambi i lati con le stesse regole.
+    """
+    return Q(Exact(Lower('produttore'), Lower(Value(produttore))))
+
+
+def gratuito_uguale(gratuito):
+    """
+    Condizione "gratuito = True/False" che può usare un indice.
+
+    Con un booleano Python Django scrive la colonna "nuda":
+        filter(gratuito=True)         → WHERE gratuito         ❌ nessun indice (SCAN)
+        filter(gratuito=Value(True))  → WHERE gratuito = 1     ✅ software_gratuito_rilascio_idx
+    """
+    return Q(gratuito=Value(gratuito))
+
+
+def produttore_tra(produttori):
+    """
+    produttore__in senza distinguere maiuscole/minuscole:
+        WHERE LOWER(produttore) = LOWER('adobe') OR LOWER(produttore) = LOWER('gnome')
+    Ogni ramo dell'OR usa l'indice funzionale (come produttore_uguale).
+    """
+    condizione = Q()
+    for produttore in produttori:
+        condizione |= produttore_uguale(produttore)
+    return condizione
+
+
+class ListaValori(serializers.ListField):
+    """
+    Lista da JSON (["Adobe", "GNOME"]) o da query string ("Adobe,GNOME").
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, str):
+            data = [valore.strip() for valore in data.split(',') if valore.strip()]
+        return super().to_internal_value(data)
+
+
+# --- VOCABOLARIO DEI FILTRI ---
+#
+# Stessi nomi e stesso significato dei filtri delle view di lettura:
+#   gratuito=true       ≈ GET /api/software/gratuiti/
+#   produttore=Adobe    ≈ GET /api/software/produttore/Adobe/
+#   più intervalli e liste (GET /api/software/filtra/):
+#   prezzo_min=10 & prezzo_max=50, rilascio_da=2024-01-01 & rilascio_a=2024-12-31,
+#   produttore__in=Adobe,GNOME
+#
+# Ogni filtro = (campo DRF che valida e converte il valore, valore → condizione Q).
+# Il campo DRF accetta sia valori JSON (true, 12.5) sia stringhe della query
+# string ("true", "12.5"): lo stesso vocabolario vale per body e URL.
+# ⚠️ Gli intervalli (>=, <=) valgono come filtri SOLO insieme a un indice che
+# inizi con quella colonna: (prezzo, id) e (data_rilascio, id) in api/models.py.
+FILTRI = {
+    'gratuito': (serializers.BooleanField(), gratuito_uguale),
+    'produttore': (serializers.CharField(), produttore_uguale),
+    'produttore__in': (ListaValori(child=serializers.CharField(), allow_empty=False), produttore_tra),
+    'prezzo_min': (serializers.DecimalField(max_digits=8, decimal_places=2), lambda v: Q(prezzo__gte=v)),
+    'prezzo_max': (serializers.DecimalField(max_digits=8, decimal_places=2), lambda v: Q(prezzo__lte=v)),
+    'rilascio_da': (serializers.DateField(), lambda v: Q(data_rilascio__gte=v)),
+    'rilascio_a': (serializers.DateField(), lambda v: Q(data_rilascio__lte=v)),
+}
+
+
+def leggi_filtri(parametri, obbligatori=False, ammessi=FILTRI):
+    """
+    Converte un dizionario di filtri (body JSON o query string) in UNA
+    condizione Q per .filter(). Solleva ValidationError (→ 400) per filtri
+    sconosciuti o valori non validi.
+
+    Esempio:
+        condizione = leggi_filtri({'produttore': 'Adobe', 'gratuito': 'true'})
+        Software.objects.filter(condizione)
+        → WHERE LOWER(produttore) = LOWER('Adobe') AND gratuito = 1
+
+    obbligatori=True: almeno un filtro è richiesto. ⚠️ Da usare per UPDATE e
+    DELETE di massa: un filtro vuoto vorrebbe dire "TUTTA la tabella".
+    
+    ammessi: nomi dei filtri accettati (default: tutti quelli di FILTRI).
+    """
+    if not isinstance(parametri, dict):
+        raise ValidationError({'filtro': ['Deve essere un oggetto JSON.']})
+
+    sconosciuti = [nome for nome in parametri if nome not in ammessi]
+    if sconosciuti:
+        raise ValidationError({'filtro': [
+            f'Filtri non validi: {", ".join(sconosciuti)}. Ammessi: {", ".join(ammessi)}.'
+        ]})
+
+    condizione = Q()
+    errori = {}
+    for nome, valore in parametri.items():
+        campo, crea_condizione = FILTRI[nome]
+        try:
+            condizione &= crea_condizione(campo.run_validation(valore))
+        except ValidationError as exc:
+            errori[nome] = exc.detail
+
+    if errori:
+        raise ValidationError({'filtro': errori})
+    if obbligatori and not condizione:
+        raise ValidationError({'filtro': ['Serve almeno un filtro.']})
+    return condizione
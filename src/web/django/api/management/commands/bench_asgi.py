@@ -0,0 +1,198 @@
+import asyncio
+import io
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# --- BENCHMARK WSGI / ASGI ---
+#
+# python manage.py bench_asgi
+# python manage.py bench_asgi --percorso /api/software/produttore/Adobe/ --concorrenza 100
+#
+# Tre scenari, tutti IN PROCESSO (niente rete, niente server esterno):
+#   1. WSGI + view sincrone: N thread, come un server WSGI multi-thread (gunicorn --threads)
+#   2. ASGI + view sincrone: N task asyncio, come uvicorn con le view di api/views.py
+#   3. ASGI + view async:    N task asyncio su /api/async/... (api/views_async.py)
+#
+# ⚠️ Misura il costo del percorso Django (handler, middleware, view,
+# serializzazione), non quello di un server HTTP vero: i numeri servono a
+# confrontare gli scenari tra loro, non come throughput assoluto.
+
+_HOST = 'localhost'  # sempre ammesso con DEBUG=True e ALLOWED_HOSTS vuoto
+
+
+def _ambiente_wsgi(percorso, query, metodo='GET', corpo=b''):
+    ambiente = {
+        'REQUEST_METHOD': metodo,
+        'SCRIPT_NAME': '',
+        'PATH_INFO': percorso,
+        'QUERY_STRING': query,
+        'SERVER_NAME': _HOST,
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': _HOST,
+        'HTTP_ACCEPT': 'application/json',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(corpo),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    if corpo:
+        ambiente['CONTENT_TYPE'] = 'application/json'
+        ambiente['CONTENT_LENGTH'] = str(len(corpo))
+    return ambiente
+
+
+def _richiesta_wsgi(applicazione, percorso, query, metodo='GET', corpo=b''):
+    """Una richiesta WSGI completa (corpo = JSON in byte). Restituisce il codice HTTP."""
+    stato = []
+    risposta = applicazione(
+        _ambiente_wsgi(percorso, query, metodo, corpo),
+        lambda status, headers, exc_info=None: stato.append(int(status.split()[0])),
+    )
+    try:
+        for _ in risposta:  # il body va consumato, come farebbe il server
+            pass
+    finally:
+        risposta.close()
+    return stato[0]
+
+
+async def _richiesta_asgi(applicazione, percorso, query):
+    """Una richiesta ASGI completa. Restituisce il codice HTTP."""
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': percorso,
+        'raw_path': percorso.encode(),
+        'query_string': query.encode(),
+        'root_path': '',
+        'headers': [(b'host', _HOST.encode()), (b'accept', b'application/json')],
+        'server': (_HOST, 80),
+        'client': ('127.0.0.1', 50000),
+    }
+    stato = []
+    body_inviato = False
+
+    async def receive():
+        nonlocal body_inviato
+        if not body_inviato:
+            body_inviato = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # Il client non si disconnette mai: Django cancella questa attesa a fine risposta
+        await asyncio.Event().wait()
+
+    async def send(messaggio):
+        if messaggio['type'] == 'http.response.start':
+            stato.append(messaggio['status'])
+
+    await applicazione(scope, receive, send)
+    return stato[0]
+
+
+def _risultato(nome, durate, codici, secondi):
+    durate.sort()
+    return {
+        'scenario': nome,
+        'richieste_al_secondo': len(durate) / secondi,
+        'p50_ms': statistics.median(durate) * 1000,
+        'p95_ms': durate[int(len(durate) * 0.95) - 1] * 1000,
+        'errori': sum(1 for codice in codici if codice != 200),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Confronta il throughput concorrente del catalogo sotto WSGI e sotto ASGI'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--percorso', default='/api/software/gratuiti/',
+                            help='Endpoint sincrono da misurare (la versione async è /api/async/...)')
+        parser.add_argument('--richieste', type=int, default=2000, help='Richieste per scenario')
+        parser.add_argument('--concorrenza', type=int, default=50, help='Richieste contemporanee')
+        parser.add_argument('--con-cache', action='store_true',
+                            help='Lascia attive le cache delle risposte e dei dettagli')
+
+    def handle(self, *args, **options):
+        parti = urlsplit(options['percorso'])
+        if not parti.path.startswith('/api/') or parti.path.startswith('/api/async/'):
+            raise CommandError('--percorso deve essere un endpoint sincrono /api/... (es. /api/software/gratuiti/)')
+        percorso, query = parti.path, parti.query
+        percorso_async = '/api/async/' + percorso[len('/api/'):]
+
+        if not options['con_cache']:
+            # ⚠️ Prima di qualunque richiesta: le cache vengono create al primo uso.
+            # Le view async non usano la cache delle risposte: senza questo il
+            # confronto sarebbe tra "query" e "zero query"
+            settings.API_CATALOGO = {
+                **getattr(settings, 'API_CATALOGO', {}),
+                'CACHE_RISPOSTE_MAX_VOCI': 0,
+                'CACHE_DETTAGLI_MAX_VOCI': 0,
+            }
+
+        from pww.asgi import application as asgi_snello, django_application as asgi_django
+        from pww.wsgi import application as wsgi
+
+        richieste, concorrenza = options['richieste'], options['concorrenza']
+        per_worker = max(1, richieste // concorrenza)
+
+        risultati = [
+            self._bench_wsgi('WSGI  + view sincrone', wsgi, percorso, query, concorrenza, per_worker),
+            asyncio.run(self._bench_asgi(
+                'ASGI  + view sincrone', asgi_django, percorso, query, concorrenza, per_worker)),
+            asyncio.run(self._bench_asgi(
+                'ASGI  + view async', asgi_snello, percorso_async, query, concorrenza, per_worker)),
+        ]
+
+        self.stdout.write(f'{percorso}?{query}  ·  {per_worker * concorrenza} richieste  ·  concorrenza {concorrenza}')
+        self.stdout.write(f'{"scenario":<24}{"req/s":>10}{"p50 ms":>10}{"p95 ms":>10}{"errori":>8}')
+        for r in risultati:
+            self.stdout.write(
+                f'{r["scenario"]:<24}{r["richieste_al_secondo"]:>10.0f}'
+                f'{r["p50_ms"]:>10.2f}{r["p95_ms"]:>10.2f}{r["errori"]:>8}'
+            )
+
+    def _bench_wsgi(self, nome, applicazione, percorso, query, concorrenza, per_worker):
+        _richiesta_wsgi(applicazione, percorso, query)  # riscaldamento (import, piani, ...)
+
+        def worker(_):
+            misure = []
+            for _ in range(per_worker):
+                inizio = time.perf_counter()
+                codice = _richiesta_wsgi(applicazione, percorso, query)
+                misure.append((time.perf_counter() - inizio, codice))
+            return misure
+
+        inizio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concorrenza) as pool:
+            misure = [m for lista in pool.map(worker, range(concorrenza)) for m in lista]
+        secondi = time.perf_counter() - inizio
+        return _risultato(nome, [d for d, _ in misure], [c for _, c in misure], secondi)
+
+    async def _bench_asgi(self, nome, applicazione, percorso, query, concorrenza, per_worker):
+        await _richiesta_asgi(applicazione, percorso, query)  # riscaldamento
+
+        async def worker():
+            misure = []
+            for _ in range(per_worker):
+                inizio = time.perf_counter()
+                codice = await _richiesta_asgi(applicazione, percorso, query)
+                misure.append((time.perf_counter() - inizio, codice))
+            return misure
+
+        inizio = time.perf_counter()
+        liste = await asyncio.gather(*(worker() for _ in range(concorrenza)))
+        secondi = time.perf_counter() - inizio
+        misure = [m for lista in liste for m in lista]
+        return _risultato(nome, [d for d, _ in misure], [c for _, c in misure], secondi)
@@ -0,0 +1,170 @@
+import json
+import logging
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from api.conf import impostazione
+from api.models import Software
+
+from .bench_asgi import _richiesta_wsgi, _risultato
+
+
+# --- BENCHMARK DEL PROFILO SQLITE (api/connessioni.py) ---
+#
+# python manage.py bench_sqlite
+# python manage.py bench_sqlite --lettori 16 --scrittori 4 --secondi 10
+#
+# Per ogni scenario, su una COPIA del database (quello vero non viene toccato):
+#   - N thread "lettori" chiedono a rotazione gli endpoint di --percorsi
+#   - M thread "scrittori" fanno PATCH /api/software/<id>/patch/ su id a caso
+# tutti insieme per --secondi, come un server WSGI multi-thread sotto carico.
+#
+# Scenari:
+#   1. Django predefinito: rollback journal, nessun altro PRAGMA
+#   2. SQLITE_PRAGMA:      il profilo di API_CATALOGO (WAL, mmap, cache, ...)
+#
+# Da guardare: letture/s e p95 delle letture MENTRE si scrive (in rollback
+# journal ogni COMMIT le ferma), e la colonna errori ("database is locked"
+# → 500).
+#
+# ⚠️ Come bench_asgi, tutto IN PROCESSO e con le cache delle risposte spente:
+# i numeri servono a confrontare gli scenari, non come throughput assoluto.
+
+_PERCORSI_DEFAULT = ['/api/software/?limit=50', '/api/software/gratuiti/', '/api/software/stats/']
+
+
+class Command(BaseCommand):
+    help = 'Letture e scritture concorrenti sul catalogo SQLite, senza e con il profilo SQLITE_PRAGMA'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--percorsi', nargs='+', default=_PERCORSI_DEFAULT,
+                            help='Endpoint GET letti a rotazione')
+        parser.add_argument('--lettori', type=int, default=8, help='Thread che leggono')
+        parser.add_argument('--scrittori', type=int, default=2, help='Thread che scrivono')
+        parser.add_argument('--secondi', type=float, default=5.0, help='Durata di ogni scenario')
+
+    def handle(self, *args, **options):
+        connessione = connections['default']
+        if connessione.vendor != 'sqlite':
+            raise CommandError('bench_sqlite misura solo database SQLite')
+        if options['lettori'] < 1 or options['scrittori'] < 0 or options['secondi'] <= 0:
+            raise CommandError('Servono almeno 1 lettore, 0 o più scrittori e una durata positiva')
+        percorsi = []
+        for percorso in options['percorsi']:
+            parti = urlsplit(percorso)
+            if not parti.path.startswith('/api/'):
+                raise CommandError(f'Percorso non valido: {percorso} (es. /api/software/gratuiti/)')
+            percorsi.append((parti.path, parti.query))
+
+        ids = list(Software.objects.values_list('id', flat=True)[:1000])
+        if not ids:
+            raise CommandError('Catalogo vuoto: niente da leggere né da modificare')
+
+        # Stesse cache spente di bench_asgi: ogni lettura deve arrivare al database.
+        # Niente repliche (api/repliche.py): si misura il primario
+        originale_catalogo = getattr(settings, 'API_CATALOGO', {})
+        catalogo = {
+            **originale_catalogo,
+            'CACHE_RISPOSTE_MAX_VOCI': 0, 'CACHE_DETTAGLI_MAX_VOCI': 0, 'REPLICHE_LETTURA': [],
+        }
+        scenari = [
+            ('Django predefinito', {'journal_mode': 'DELETE'}),
+            ('SQLITE_PRAGMA', impostazione('SQLITE_PRAGMA')),
+        ]
+        # Gli errori 500 ("database is locked") si contano, non si stampano
+        logger = logging.getLogger('django.request')
+        livello = logger.level
+        logger.setLevel(logging.CRITICAL)
+
+        from pww.wsgi import application
+
+        originale = connessione.settings_dict['NAME']
+        risultati = []
+        try:
+            with tempfile.TemporaryDirectory() as cartella:
+                for numero, (nome, profilo) in enumerate(scenari):
+                    copia = os.path.join(cartella, f'scenario{numero}.sqlite3')
+                    self._copia(originale, copia)
+                    settings.API_CATALOGO = {**catalogo, 'SQLITE_PRAGMA': profilo}
+                    self._usa_database(copia)
+                    risultati.extend(self._scenario(nome, application, percorsi, ids, options))
+                    self._usa_database(originale)
+        finally:
+            settings.API_CATALOGO = originale_catalogo
+            self._usa_database(originale)
+            logger.setLevel(livello)
+
+        self.stdout.write(
+            f'{options["lettori"]} lettori + {options["scrittori"]} scrittori · '
+            f'{options["secondi"]:g} s per scenario · {", ".join(options["percorsi"])}'
+        )
+        self.stdout.write(f'{"scenario":<32}{"op/s":>10}{"p50 ms":>10}{"p95 ms":>10}{"errori":>8}')
+        for r in risultati:
+            self.stdout.write(
+                f'{r["scenario"]:<32}{r["richieste_al_secondo"]:>10.0f}'
+                f'{r["p50_ms"]:>10.2f}{r["p95_ms"]:>10.2f}{r["errori"]:>8}'
+            )
+
+    def _copia(self, origine, destinazione):
+        """Copia coerente anche se il database è in WAL (API di backup, non copia del file)."""
+        with sqlite3.connect(origine) as sorgente, sqlite3.connect(destinazione) as copia:
+            sorgente.backup(copia)
+        sorgente.close()
+        copia.close()
+
+    def _usa_database(self, nome):
+        # ⚠️ settings_dict è lo STESSO dizionario per le connessioni di tutti i
+        # thread: quelle nuove (una per richiesta, CONN_MAX_AGE = 0) aprono 'nome'
+        connections['default'].close()
+        connections['default'].settings_dict['NAME'] = nome
+
+    def _scenario(self, nome, applicazione, percorsi, ids, options):
+        for percorso, query in percorsi:
+            _richiesta_wsgi(applicazione, percorso, query)  # riscaldamento (e PRAGMA sul file)
+        fine = time.perf_counter() + options['secondi']
+
+        def lettore(numero):
+            misure = []
+            while time.perf_counter() < fine:
+                percorso, query = percorsi[numero % len(percorsi)]
+                numero += 1
+                inizio = time.perf_counter()
+                codice = _richiesta_wsgi(applicazione, percorso, query)
+                misure.append((time.perf_counter() - inizio, codice))
+            return misure
+
+        def scrittore(numero):
+            casuale = random.Random(numero)
+            misure = []
+            while time.perf_counter() < fine:
+                corpo = json.dumps({'versione': f'{casuale.randint(1, 99)}.{casuale.randint(0, 99)}'}).encode()
+                inizio = time.perf_counter()
+                codice = _richiesta_wsgi(
+                    applicazione, f'/api/software/{casuale.choice(ids)}/patch/', '', 'PATCH', corpo
+                )
+                misure.append((time.perf_counter() - inizio, codice))
+            return misure
+
+        inizio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['lettori'] + options['scrittori']) as pool:
+            letture = [pool.submit(lettore, n) for n in range(options['lettori'])]
+            scritture = [pool.submit(scrittore, n) for n in range(options['scrittori'])]
+            letture = [m for futuro in letture for m in futuro.result()]
+            scritture = [m for futuro in scritture for m in futuro.result()]
+        secondi = time.perf_counter() - inizio
+
+        risultati = [_risultato(f'{nome} · letture', [d for d, _ in letture], [c for _, c in letture], secondi)]
+        if scritture:
+            risultati.append(_risultato(
+                f'{nome} · scritture', [d for d, _ in scritture], [c for _, c in scritture], secondi
+            ))
+        return risultati
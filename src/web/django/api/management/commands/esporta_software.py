@@ -0,0 +1,50 @@
+import os
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.esportazione import FORMATI, genera_esportazione, scrivi_su_file
+
+
+# --- ESPORTAZIONE DEL CATALOGO DA RIGA DI COMANDO ---
+#
+# python manage.py esporta_software catalogo.csv
+# python manage.py esporta_software catalogo.colonne.gz --formato colonne --gzip
+# python manage.py esporta_software - | head            # su stdout
+#
+# Stessi byte di GET /api/software/export/ (api/esportazione.py), senza
+# passare dal server HTTP: utile per i dump notturni o per chi ha accesso
+# diretto alla macchina. Memoria costante anche con milioni di righe.
+#
+# ⚠️ Su file il risultato compare solo a esportazione COMPLETA (file
+# temporaneo + rinomina): chi lo legge non vede mai un file a metà.
+
+
+class Command(BaseCommand):
+    help = 'Esporta tutto il catalogo in CSV o nel formato a colonne (anche compresso)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('destinazione', help="File da scrivere ('-' = stdout)")
+        parser.add_argument('--formato', choices=sorted(FORMATI), default='csv')
+        parser.add_argument('--gzip', action='store_true', help='Comprime con gzip')
+        parser.add_argument('--database', default=None, help='Alias del database (default: quello di lettura)')
+
+    def handle(self, *args, **options):
+        blocchi = genera_esportazione(options['formato'], options['gzip'], options['database'])
+        inizio = time.perf_counter()
+
+        if options['destinazione'] == '-':
+            # Byte, non testo: self.stdout scrive stringhe
+            for blocco in blocchi:
+                sys.stdout.buffer.write(blocco)
+            sys.stdout.buffer.flush()
+            return
+
+        destinazione = options['destinazione']
+        if not os.path.isdir(os.path.dirname(os.path.abspath(destinazione))):
+            raise CommandError(f'Cartella inesistente: {os.path.dirname(destinazione)}')
+        dimensione = sum(len(blocco) for blocco in scrivi_su_file(blocchi, destinazione))
+        self.stdout.write(self.style.SUCCESS(
+            f'{destinazione}: {dimensione / 1024 / 1024:.1f} MB in {time.perf_counter() - inizio:.2f} s'
+        ))
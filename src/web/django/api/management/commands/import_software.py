@@ -0,0 +1,213 @@
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connections, router, transaction
+from rest_framework import serializers
+
+from api.conf import impostazione
+from api.models import Software
+from api.signals import catalogo_modificato
+from api.views import SoftwareSerializer
+
+
+# --- IMPORTAZIONE DI MASSA DA FILE ---
+#
+# python manage.py import_software catalogo.csv
+# python manage.py import_software catalogo.ndjson.gz --scarti errori.ndjson
+# python manage.py esporta_software - | python manage.py import_software - --formato csv
+#
+# POST /api/software/create/ per ogni riga = una richiesta HTTP, una
+# validazione, un INSERT e un COMMIT (fsync!) per riga: ore per milioni di righe.
+# Qui:
+#   - il file viene letto in STREAMING (riga per riga, anche .gz): memoria
+#     costante qualunque sia la dimensione
+#   - le righe sono validate da SoftwareSerializer (stesse regole dell'API) a
+#     blocchi di BULK_BATCH_SIZE, con UN solo serializer per tutto il file
+#   - ogni blocco valido → UN bulk_create(); un COMMIT ogni --transazione righe
+#   - su SQLite, per la durata dell'importazione, PRAGMA più veloci (vedi
+#     pragma_importazione) e poi quelli di prima (il profilo di api/connessioni.py)
+#   - le righe non valide NON fermano l'importazione: finiscono nel file degli
+#     scarti (NDJSON: numero di riga, errori, dati originali)
+#
+# ⚠️ Ogni COMMIT è definitivo: se l'importazione si interrompe, le righe dei
+# blocchi già confermati restano nel catalogo (il messaggio d'errore dice
+# quante). I trigger del database (ricerca, statistiche, feed delle modifiche)
+# restano attivi: il catalogo è coerente anche durante il caricamento.
+
+FORMATI = ('csv', 'ndjson')
+
+# Estensione → formato (".gz" si toglie prima)
+_ESTENSIONI = {'.csv': 'csv', '.ndjson': 'ndjson', '.jsonl': 'ndjson', '.json': 'ndjson'}
+
+
+def _apri(percorso):
+    """File di testo UTF-8 (anche compresso .gz, anche '-' = stdin)."""
+    if percorso == '-':
+        return io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', newline='')
+    if percorso.endswith('.gz'):
+        return gzip.open(percorso, 'rt', encoding='utf-8', newline='')
+    return open(percorso, encoding='utf-8', newline='')
+
+
+def _righe_csv(file):
+    """(numero di riga, dizionario) per ogni riga; colonne sconosciute (es. 'id') ignorate dal serializer."""
+    lettore = csv.DictReader(file)
+    for dati in lettore:
+        yield lettore.line_num, dati
+
+
+def _righe_ndjson(file):
+    for numero, testo in enumerate(file, start=1):
+        if not testo.strip():
+            continue
+        try:
+            yield numero, json.loads(testo)
+        except json.JSONDecodeError as exc:
+            yield numero, {'__errore__': f'JSON non valido: {exc.msg}', 'testo': testo.rstrip('\n')}
+
+
+# PRAGMA di SQLite durante l'importazione
+#   synchronous=OFF: niente fsync a ogni COMMIT (un crash del SISTEMA può
+#       perdere gli ultimi blocchi, mai corrompere il database in WAL)
+#   cache_size: 256 MB di pagine in memoria, gli indici restano in cache
+#   temp_store=MEMORY: tabelle temporanee (ordinamenti) in RAM
+PRAGMA_IMPORTAZIONE = {'synchronous': 'OFF', 'cache_size': '-262144', 'temp_store': 'MEMORY'}
+
+
+@contextmanager
+def pragma_importazione(connessione):
+    """
+    Imposta PRAGMA_IMPORTAZIONE e alla fine rimette i valori di prima.
+
+    ⚠️ Dentro una transazione già aperta (call_command() in un atomic(), i
+    test) SQLite non permette di cambiare synchronous: si lasciano com'erano.
+    """
+    if connessione.vendor != 'sqlite' or connessione.in_atomic_block:
+        yield
+        return
+    with connessione.cursor() as cursor:
+        precedenti = {}
+        for nome, valore in PRAGMA_IMPORTAZIONE.items():
+            cursor.execute(f'PRAGMA {nome}')
+            precedenti[nome] = cursor.fetchone()[0]
+            cursor.execute(f'PRAGMA {nome} = {valore}')
+    try:
+        yield
+    finally:
+        with connessione.cursor() as cursor:
+            for nome, valore in precedenti.items():
+                cursor.execute(f'PRAGMA {nome} = {valore}')
+
+
+class Command(BaseCommand):
+    help = 'Importa software da un file CSV o NDJSON (anche .gz) con bulk_create a blocchi'
+
+    def add_arguments(self, parser):
+        parser.add_argument('sorgente', help="File da importare ('-' = stdin)")
+        parser.add_argument('--formato', choices=FORMATI, help="Default: dall'estensione del file")
+        parser.add_argument('--scarti', help='File NDJSON delle righe scartate (default: <sorgente>.scarti.ndjson)')
+        parser.add_argument(
+            '--transazione', type=int, default=100_000,
+            help='Righe per COMMIT (default 100000)',
+        )
+        parser.add_argument('--database', default=None, help='Alias del database (default: quello di scrittura)')
+
+    def handle(self, *args, **options):
+        sorgente = options['sorgente']
+        formato = options['formato'] or self._formato_da_estensione(sorgente)
+        if sorgente != '-' and not os.path.isfile(sorgente):
+            raise CommandError(f'File inesistente: {sorgente}')
+        if options['transazione'] < 1:
+            raise CommandError('--transazione deve essere almeno 1')
+        self.percorso_scarti = options['scarti'] or (
+            'scarti.ndjson' if sorgente == '-' else f'{sorgente}.scarti.ndjson'
+        )
+        self.file_scarti = None
+        connessione = connections[options['database'] or router.db_for_write(Software)]
+
+        self.importate = self.scartate = 0
+        self.inizio = time.perf_counter()
+        try:
+            with _apri(sorgente) as file, pragma_importazione(connessione):
+                righe = _righe_csv(file) if formato == 'csv' else _righe_ndjson(file)
+                self._importa(righe, connessione.alias, options['transazione'])
+        except (DatabaseError, UnicodeDecodeError, csv.Error, OSError) as exc:
+            raise CommandError(
+                f'{type(exc).__name__}: {exc}. Già importate (e confermate) {self.importate} righe.'
+            )
+        finally:
+            if self.file_scarti is not None:
+                self.file_scarti.close()
+
+        secondi = time.perf_counter() - self.inizio
+        self.stdout.write(self.style.SUCCESS(
+            f'Importate {self.importate} righe in {secondi:.1f} s '
+            f'({self.importate / secondi if secondi else 0:,.0f} righe/s), scartate {self.scartate}'
+        ))
+        if self.scartate:
+            self.stdout.write(self.style.WARNING(f'Righe scartate in {self.percorso_scarti}'))
+
+    def _formato_da_estensione(self, sorgente):
+        nome = sorgente[:-3] if sorgente.endswith('.gz') else sorgente
+        formato = _ESTENSIONI.get(os.path.splitext(nome)[1].lower())
+        if formato is None:
+            raise CommandError(f'Formato non riconosciuto per {sorgente}: usa --formato {" o ".join(FORMATI)}')
+        return formato
+
+    def _importa(self, righe, alias, righe_per_transazione):
+        """Blocchi di BULK_BATCH_SIZE righe; COMMIT ogni 'righe_per_transazione'."""
+        dimensione_blocco = impostazione('BULK_BATCH_SIZE')
+        # UN solo serializer per tutto il file (come POST /api/software/bulk/)
+        validatore = SoftwareSerializer()
+        fine = False
+        while not fine:
+            nella_transazione = 0
+            with transaction.atomic(using=alias):
+                while nella_transazione < righe_per_transazione:
+                    blocco = self._valida_blocco(righe, validatore, dimensione_blocco)
+                    if blocco is None:
+                        fine = True
+                        break
+                    Software.objects.using(alias).bulk_create(blocco, batch_size=dimensione_blocco)
+                    nella_transazione += len(blocco)
+            if nella_transazione:
+                self.importate += nella_transazione
+                # bulk_create() non invia post_save: cache, suggerimenti ed
+                # eventi vanno avvisati a mano (ids=None: troppi da elencare)
+                catalogo_modificato.send(sender=Software, azione='create', ids=None)
+                secondi = time.perf_counter() - self.inizio
+                self.stdout.write(f'  {self.importate} righe ({self.importate / secondi:,.0f} righe/s)')
+
+    def _valida_blocco(self, righe, validatore, dimensione):
+        """
+        Legge fino a 'dimensione' righe e le valida: restituisce gli oggetti
+        Software validi (anche nessuno) oppure None a fine file.
+        """
+        validi = []
+        lette = 0
+        for numero, dati in righe:
+            lette += 1
+            try:
+                if not isinstance(dati, dict) or '__errore__' in dati:
+                    raise serializers.ValidationError(
+                        dati.pop('__errore__') if isinstance(dati, dict) else 'Ogni riga deve essere un oggetto JSON'
+                    )
+                validi.append(Software(**validatore.run_validation(dati)))
+            except serializers.ValidationError as exc:
+                self._scarta(numero, exc.detail, dati)
+            if lette == dimensione:
+                break
+        return validi if lette else None
+
+    def _scarta(self, numero, errori, dati):
+        if self.file_scarti is None:
+            self.file_scarti = open(self.percorso_scarti, 'w', encoding='utf-8')
+        self.file_scarti.write(json.dumps({'riga': numero, 'errori': errori, 'dati': dati}, ensure_ascii=False) + '\n')
+        self.scartate += 1
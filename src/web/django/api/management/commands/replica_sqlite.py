@@ -0,0 +1,79 @@
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from api.conf import impostazione
+from api.repliche import copia_sqlite, percorso_sqlite
+
+
+# --- REPLICHE SQLITE SULLA STESSA MACCHINA ---
+#
+# python manage.py replica_sqlite                    # copia ora tutte le REPLICHE_LETTURA
+# python manage.py replica_sqlite --intervallo 5     # ogni 5 s, se il primario è cambiato
+# python manage.py replica_sqlite replica            # solo l'alias 'replica'
+#
+# Ogni replica è una copia di 'default' fatta con l'API di backup di SQLite
+# (api/repliche.py): coerente anche mentre il server scrive, e sostituita
+# con una rinomina solo a copia completa.
+#
+# Con --intervallo la copia si rifà solo se qualcuno ha scritto sul primario
+# (PRAGMA data_version): a catalogo fermo nessun lavoro e nessuna versione
+# nuova, quindi le cache delle risposte restano valide.
+#
+# ⚠️ Ritardo massimo delle repliche ≈ --intervallo + durata della copia:
+# REPLICHE_FINESTRA (read your writes) deve essere più lunga, e
+# REPLICHE_RITARDO_MAX molto più lunga (oltre, le letture tornano sul primario).
+
+
+class Command(BaseCommand):
+    help = 'Copia il database primario SQLite nelle repliche di sola lettura (API di backup)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('repliche', nargs='*', help='Alias da copiare (default: REPLICHE_LETTURA)')
+        parser.add_argument('--intervallo', type=float, default=None,
+                            help='Secondi tra due controlli (default: una sola copia)')
+
+    def handle(self, *args, **options):
+        repliche = options['repliche'] or impostazione('REPLICHE_LETTURA')
+        if not repliche:
+            raise CommandError('Nessuna replica: imposta REPLICHE_ATTIVE = True (pww/settings.py) o passa gli alias')
+        for alias in ['default', *repliche]:
+            if alias not in connections:
+                raise CommandError(f'Alias inesistente in DATABASES: {alias}')
+            if connections[alias].vendor != 'sqlite':
+                raise CommandError(f'{alias}: replica_sqlite copia solo database SQLite')
+        if 'default' in repliche:
+            raise CommandError("'default' è il primario, non una replica")
+        intervallo = options['intervallo']
+        if intervallo is not None and intervallo <= 0:
+            raise CommandError('--intervallo deve essere positivo')
+
+        # Connessione diretta di sqlite3 (non di Django): resta aperta per
+        # tutto il ciclo, così data_version vede le scritture degli ALTRI
+        sorgente = sqlite3.connect(percorso_sqlite('default'), timeout=30)
+        try:
+            ultima = None
+            while True:
+                versione = sorgente.execute('PRAGMA data_version').fetchone()[0]
+                if versione != ultima:
+                    self._copia(sorgente, repliche)
+                    ultima = versione
+                if intervallo is None:
+                    return
+                time.sleep(intervallo)
+        except KeyboardInterrupt:
+            self.stdout.write('Interrotto.')
+        except (sqlite3.Error, OSError) as exc:
+            raise CommandError(f'{type(exc).__name__}: {exc}')
+        finally:
+            sorgente.close()
+
+    def _copia(self, sorgente, repliche):
+        for alias in repliche:
+            inizio = time.perf_counter()
+            dimensione = copia_sqlite(sorgente, percorso_sqlite(alias))
+            self.stdout.write(
+                f'{alias}: {dimensione / 1024 / 1024:.1f} MB in {time.perf_counter() - inizio:.2f} s'
+            )
@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api.statistiche import differenze_statistiche, ricostruisci_statistiche, statistiche_mantenute
+
+
+# --- RICOSTRUZIONE DELLE STATISTICHE PER PRODUTTORE ---
+#
+# python manage.py ricostruisci_statistiche              # ricalcola la tabella
+# python manage.py ricostruisci_statistiche --controlla  # confronta e basta
+#
+# La tabella api_statisticaproduttore è tenuta aggiornata dai trigger
+# (api/statistiche.py): questo comando serve solo se i trigger sono mancati
+# per un po' (database ripristinato da un backup, trigger eliminati da una
+# migrazione, scritture con i trigger disattivati...).
+
+
+class Command(BaseCommand):
+    help = 'Ricalcola (o controlla) la tabella riassuntiva di GET /api/software/stats/'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--controlla', action='store_true',
+            help='Non modifica niente: confronta la tabella con una GROUP BY su api_software',
+        )
+
+    def handle(self, *args, **options):
+        if not statistiche_mantenute(connection):
+            raise CommandError(
+                f'Database {connection.vendor}: niente trigger né tabella riassuntiva, '
+                'GET /api/software/stats/ usa già la GROUP BY.'
+            )
+
+        if options['controlla']:
+            diverse = differenze_statistiche()
+            if diverse:
+                raise CommandError(
+                    f'{len(diverse)} righe diverse dal catalogo: python manage.py ricostruisci_statistiche'
+                )
+            self.stdout.write(self.style.SUCCESS('Statistiche allineate al catalogo.'))
+            return
+
+        inizio = time.perf_counter()
+        righe = ricostruisci_statistiche()
+        self.stdout.write(self.style.SUCCESS(
+            f'Statistiche ricostruite: {righe} righe in {time.perf_counter() - inizio:.2f} s'
+        ))
@@ -0,0 +1,96 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api.filtri import gratuito_uguale, produttore_uguale
+from api.models import Software
+from api.paginazione import LIMIT_MINIMO_QUERY
+
+
+# --- VERIFICA DEGLI INDICI ---
+#
+# python manage.py verifica_indici
+#
+# Un indice che esiste ma che il database non usa è solo costo (spazio +
+# scritture più lente). Questo comando chiede al database il PIANO di
+# esecuzione (EXPLAIN QUERY PLAN su SQLite, EXPLAIN su PostgreSQL/MySQL)
+# delle query principali del catalogo e controlla che nomini l'indice atteso.
+#
+#   SCAN api_software                                  ❌ legge tutta la tabella
+#   SEARCH api_software USING INDEX software_...       ✅ seek sull'indice
+#
+# Esce con errore se anche una sola query non usa il suo indice:
+# utile dopo aver toccato Meta.indexes o i filtri delle view.
+
+
+def query_da_verificare():
+    """(descrizione, queryset, nome dell'indice atteso) per ogni query del catalogo."""
+    return [
+        (
+            'GET /api/software/produttore/<p>/',
+            Software.objects.filter(produttore_uguale('Adobe')),
+            'software_produttore_lower_idx',
+        ),
+        (
+            'GET /api/software/gratuiti/',
+            Software.objects.filter(gratuito_uguale(True)),
+            # Senza ORDER BY vanno bene sia (gratuito, data_rilascio) sia
+            # (gratuito, prezzo): SQLite sceglie, basta che sia un seek
+            'software_gratuito_',
+        ),
+        (
+            'admin: ordering = [-data_rilascio]',
+            Software.objects.order_by('-data_rilascio'),
+            'software_rilascio_id_idx',
+        ),
+        (
+            'admin: filtro per produttore, ordine per nome',
+            Software.objects.filter(produttore='Adobe').order_by('nome'),
+            'software_produttore_nome_idx',
+        ),
+        (
+            'trigger statistiche: MIN(prezzo) per produttore e gratuito',
+            Software.objects.filter(produttore='Adobe').filter(gratuito_uguale(False)).order_by('prezzo')[:1],
+            'software_produttore_prezzo_idx',
+        ),
+        (
+            'GET /api/software/?limit=&ordering=data_rilascio',
+            Software.objects.filter(data_rilascio__gte='2024-01-01').order_by('data_rilascio', 'id')[:50],
+            'software_rilascio_id_idx',
+        ),
+        (
+            'GET /api/software/filtra/?rilascio_da=&ordering=prezzo',
+            Software.objects.filter(data_rilascio__gte='2024-01-01').order_by('prezzo', 'id')[:LIMIT_MINIMO_QUERY],
+            'software_prezzo_id_idx',
+        ),
+        (
+            'GET /api/software/filtra/?gratuito=false&ordering=prezzo',
+            Software.objects.filter(gratuito_uguale(False)).order_by('prezzo', 'id')[:LIMIT_MINIMO_QUERY],
+            'software_gratuito_prezzo_idx',
+        ),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Controlla con EXPLAIN che le query del catalogo usino i loro indici'
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Database: {connection.vendor}\n')
+
+        mancanti = []
+        for descrizione, queryset, indice in query_da_verificare():
+            # .explain(): restituisce il piano come testo, senza eseguire la query
+            piano = queryset.explain()
+            usa_indice = indice in piano
+            simbolo = '✅' if usa_indice else '❌'
+            self.stdout.write(f'{simbolo} {descrizione}  (atteso: {indice})')
+            for riga in piano.splitlines():
+                self.stdout.write(f'     {riga}')
+            if not usa_indice:
+                mancanti.append(descrizione)
+
+        if mancanti:
+            raise CommandError(
+                f'{len(mancanti)} query non usano l\'indice atteso: {", ".join(mancanti)}. '
+                'Migrazioni applicate? (python manage.py migrate)'
+            )
+        self.stdout.write(self.style.SUCCESS('Tutte le query usano il loro indice.'))
@@ -0,0 +1,96 @@
+import time
+
+from asgiref.sync import markcoroutinefunction
+from django.conf import settings
+from django.utils.deprecation import MiddlewareMixin
+
+from .conf import impostazione
+from .repliche import COOKIE_SCRITTURA
+
+
+# --- MIDDLEWARE SOLO ASYNC ---
+#
+# I middleware di Django (SecurityMiddleware, SessionMiddleware, ...) sono
+# "ibridi" (MiddlewareMixin): sotto ASGI eseguono process_request() e
+# process_response() con sync_to_async → un salto di thread per middleware,
+# a OGNI richiesta.
+#
+# Le view async del catalogo (api/views_async.py) passano invece solo da
+# middleware scritti come coroutine, elencati in API_CATALOGO['ASYNC_MIDDLEWARE']
+# e montati da ASGIHandlerCatalogo (api/asgi.py).
+#
+# Struttura di un middleware solo async:
+#   sync_capable = False, async_capable = True
+#   __call__ è "async def" e fa: await self.get_response(request)
+
+
+class IntestazioniSicurezza:
+    """
+    Versione async delle intestazioni aggiunte da SecurityMiddleware e
+    XFrameOptionsMiddleware, con le stesse impostazioni di settings.py:
+
+        X-Content-Type-Options: nosniff        (SECURE_CONTENT_TYPE_NOSNIFF)
+        Referrer-Policy: same-origin           (SECURE_REFERRER_POLICY)
+        Cross-Origin-Opener-Policy: same-origin (SECURE_CROSS_ORIGIN_OPENER_POLICY)
+        X-Frame-Options: DENY                  (X_FRAME_OPTIONS)
+
+    ⚠️ Niente sessioni, autenticazione e CSRF: le view async sono letture
+    pubbliche del catalogo (solo GET).
+    """
+
+    sync_capable = False
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # Senza questo Django tratterebbe l'istanza come sincrona
+        # (un oggetto con "async def __call__" non è una coroutine function)
+        markcoroutinefunction(self)
+
+    async def __call__(self, request):
+        response = await self.get_response(request)
+
+        if settings.SECURE_CONTENT_TYPE_NOSNIFF:
+            response.headers.setdefault('X-Content-Type-Options', 'nosniff')
+        if settings.SECURE_REFERRER_POLICY:
+            valori = settings.SECURE_REFERRER_POLICY
+            if not isinstance(valori, str):
+                valori = ','.join(valori)
+            response.headers.setdefault('Referrer-Policy', valori)
+        if settings.SECURE_CROSS_ORIGIN_OPENER_POLICY:
+            response.headers.setdefault(
+                'Cross-Origin-Opener-Policy', settings.SECURE_CROSS_ORIGIN_OPENER_POLICY
+            )
+        response.headers.setdefault('X-Frame-Options', getattr(settings, 'X_FRAME_OPTIONS', 'DENY').upper())
+        return response
+
+
+# --- FINESTRA "READ YOUR WRITES" (api/repliche.py) ---
+
+class FinestraScritture(MiddlewareMixin):
+    """
+    Dopo una scrittura riuscita (POST/PUT/PATCH/DELETE con codice < 400)
+    imposta il cookie COOKIE_SCRITTURA per REPLICHE_FINESTRA secondi: le
+    letture di quel client vanno sul primario finché le repliche non hanno
+    copiato la sua modifica.
+
+    Valore del cookie = istante di scadenza (secondi epoch), ricontrollato
+    dal server: un client che non rispetta max_age non resta sul primario.
+
+    ⚠️ Il cookie vale per un client con cookie (browser, requests.Session):
+    chi non li conserva legge dalle repliche anche subito dopo aver scritto.
+    Senza repliche configurate il cookie non viene impostato.
+    """
+
+    def process_response(self, request, response):
+        if (
+            request.method not in ('GET', 'HEAD', 'OPTIONS')
+            and response.status_code < 400
+            and impostazione('REPLICHE_LETTURA')
+        ):
+            finestra = impostazione('REPLICHE_FINESTRA')
+            response.set_cookie(
+                COOKIE_SCRITTURA, str(int(time.time()) + finestra),
+                max_age=finestra, httponly=True, samesite='Lax',
+            )
+        return response
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.1 on 2026-10-18 12:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='software',
+            index=models.Index(fields=['data_rilascio', 'id'], name='software_rilascio_id_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.0.1 on 2026-10-18 12:18
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_indice_rilascio_id'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='software',
+            index=models.Index(django.db.models.functions.text.Lower('produttore'), name='software_produttore_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='software',
+            index=models.Index(fields=['gratuito', 'data_rilascio'], name='software_gratuito_rilascio_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='software',
+            index=models.Index(fields=['produttore', 'nome'], name='software_produttore_nome_idx'),
+        ),
+    ]
@@ -0,0 +1,82 @@
+from django.db import migrations
+
+
+# Tabella FTS5 + trigger per GET /api/software/search/ (vedi api/ricerca.py).
+# ⚠️ Solo SQLite: sugli altri database la migrazione non fa nulla e la
+# ricerca usa il fallback con icontains.
+#
+# ⚠️ SQL COPIATO qui, non importato da api/ricerca.py: una migrazione deve
+# creare sempre gli stessi oggetti, anche quando il codice dell'app cambierà.
+# Le migrazioni successive che ricreano questi trigger li importano da qui.
+
+TABELLA_FTS = 'api_software_fts'
+
+SQL_CREA_FTS = f"""
+CREATE VIRTUAL TABLE {TABELLA_FTS} USING fts5(
+    nome, produttore,
+    content='api_software', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+)
+"""
+
+SQL_TRIGGER = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {TABELLA_FTS}_ai AFTER INSERT ON api_software BEGIN
+        INSERT INTO {TABELLA_FTS}(rowid, nome, produttore)
+        VALUES (new.id, new.nome, new.produttore);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {TABELLA_FTS}_ad AFTER DELETE ON api_software BEGIN
+        INSERT INTO {TABELLA_FTS}({TABELLA_FTS}, rowid, nome, produttore)
+        VALUES ('delete', old.id, old.nome, old.produttore);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {TABELLA_FTS}_au AFTER UPDATE OF nome, produttore ON api_software BEGIN
+        INSERT INTO {TABELLA_FTS}({TABELLA_FTS}, rowid, nome, produttore)
+        VALUES ('delete', old.id, old.nome, old.produttore);
+        INSERT INTO {TABELLA_FTS}(rowid, nome, produttore)
+        VALUES (new.id, new.nome, new.produttore);
+    END
+    """,
+]
+
+SQL_RICOSTRUISCI = f"INSERT INTO {TABELLA_FTS}({TABELLA_FTS}) VALUES ('rebuild')"
+
+SQL_ELIMINA = [
+    f'DROP TRIGGER IF EXISTS {TABELLA_FTS}_ai',
+    f'DROP TRIGGER IF EXISTS {TABELLA_FTS}_ad',
+    f'DROP TRIGGER IF EXISTS {TABELLA_FTS}_au',
+    f'DROP TABLE IF EXISTS {TABELLA_FTS}',
+]
+
+
+def crea_indice_ricerca(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(SQL_CREA_FTS)
+    for sql in SQL_TRIGGER:
+        schema_editor.execute(sql)
+    # Le righe già presenti entrano nell'indice subito (i trigger valgono
+    # solo per le scritture future)
+    schema_editor.execute(SQL_RICOSTRUISCI)
+
+
+def elimina_indice_ricerca(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in SQL_ELIMINA:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_indici_software'),
+    ]
+
+    operations = [
+        migrations.RunPython(crea_indice_ricerca, elimina_indice_ricerca),
+    ]
@@ -0,0 +1,138 @@
+# Generated by Django 5.0.1 on 2026-10-18 12:38
+
+from django.db import migrations, models
+
+
+# Trigger che tengono aggiornata api_statisticaproduttore (vedi api/statistiche.py).
+# ⚠️ Solo SQLite: sugli altri database la tabella resta vuota e
+# GET /api/software/stats/ usa la GROUP BY su api_software.
+#
+# ⚠️ SQL COPIATO qui, non importato da api/statistiche.py (come in 0004):
+# le migrazioni successive che ricreano questi trigger li importano da qui.
+
+TABELLA_STATISTICHE = 'api_statisticaproduttore'
+PREFISSO_TRIGGER = 'api_software_statistiche'
+
+
+def _centesimi(riga):
+    return f'CAST(ROUND({riga}.prezzo * 100) AS INTEGER)'
+
+
+def _sql_aggiungi(riga):
+    return f"""
+        INSERT INTO {TABELLA_STATISTICHE}
+            (produttore, gratuito, numero, somma_centesimi, min_centesimi, max_centesimi)
+        VALUES ({riga}.produttore, {riga}.gratuito, 1,
+                {_centesimi(riga)}, {_centesimi(riga)}, {_centesimi(riga)})
+        ON CONFLICT (produttore, gratuito) DO UPDATE SET
+            numero = numero + 1,
+            somma_centesimi = somma_centesimi + excluded.somma_centesimi,
+            min_centesimi = MIN(min_centesimi, excluded.min_centesimi),
+            max_centesimi = MAX(max_centesimi, excluded.max_centesimi);
+    """
+
+
+def _sql_togli(riga):
+    gruppo = f'produttore = {riga}.produttore AND gratuito = {riga}.gratuito'
+    righe_del_gruppo = f'FROM api_software AS s WHERE s.produttore = {riga}.produttore AND s.gratuito = {riga}.gratuito'
+    return f"""
+        DELETE FROM {TABELLA_STATISTICHE} WHERE {gruppo} AND numero = 1;
+        UPDATE {TABELLA_STATISTICHE} SET
+            numero = numero - 1,
+            somma_centesimi = somma_centesimi - {_centesimi(riga)},
+            min_centesimi = CASE WHEN {_centesimi(riga)} > min_centesimi THEN min_centesimi
+                            ELSE (SELECT CAST(ROUND(MIN(s.prezzo) * 100) AS INTEGER) {righe_del_gruppo}) END,
+            max_centesimi = CASE WHEN {_centesimi(riga)} < max_centesimi THEN max_centesimi
+                            ELSE (SELECT CAST(ROUND(MAX(s.prezzo) * 100) AS INTEGER) {righe_del_gruppo}) END
+        WHERE {gruppo};
+    """
+
+
+SQL_TRIGGER = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {PREFISSO_TRIGGER}_ai AFTER INSERT ON api_software BEGIN
+        {_sql_aggiungi('new')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {PREFISSO_TRIGGER}_ad AFTER DELETE ON api_software BEGIN
+        {_sql_togli('old')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {PREFISSO_TRIGGER}_au
+    AFTER UPDATE OF produttore, gratuito, prezzo ON api_software BEGIN
+        {_sql_togli('old')}
+        {_sql_aggiungi('new')}
+    END
+    """,
+]
+
+SQL_RICOSTRUISCI = [
+    f'DELETE FROM {TABELLA_STATISTICHE}',
+    f"""
+    INSERT INTO {TABELLA_STATISTICHE}
+        (produttore, gratuito, numero, somma_centesimi, min_centesimi, max_centesimi)
+    SELECT produttore, gratuito, COUNT(*),
+           SUM({_centesimi('s')}), MIN({_centesimi('s')}), MAX({_centesimi('s')})
+    FROM api_software AS s
+    GROUP BY produttore, gratuito
+    """,
+]
+
+SQL_ELIMINA = [
+    f'DROP TRIGGER IF EXISTS {PREFISSO_TRIGGER}_ai',
+    f'DROP TRIGGER IF EXISTS {PREFISSO_TRIGGER}_ad',
+    f'DROP TRIGGER IF EXISTS {PREFISSO_TRIGGER}_au',
+]
+
+
+def crea_trigger_statistiche(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in SQL_TRIGGER:
+        schema_editor.execute(sql)
+    # Le righe già presenti (i trigger valgono solo per le scritture future)
+    for sql in SQL_RICOSTRUISCI:
+        schema_editor.execute(sql)
+
+
+def elimina_trigger_statistiche(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in SQL_ELIMINA:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_ricerca_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatisticaProduttore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('produttore', models.CharField(max_length=100)),
+                ('gratuito', models.BooleanField()),
+                ('numero', models.PositiveIntegerField()),
+                ('somma_centesimi', models.BigIntegerField()),
+                ('min_centesimi', models.IntegerField()),
+                ('max_centesimi', models.IntegerField()),
+            ],
+            options={
+                'verbose_name_plural': 'Statistiche per produttore',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='software',
+            index=models.Index(fields=['produttore', 'gratuito', 'prezzo'], name='software_produttore_prezzo_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='statisticaproduttore',
+            constraint=models.UniqueConstraint(fields=('produttore', 'gratuito'), name='statistica_produttore_gratuito_uniq'),
+        ),
+        migrations.RunPython(crea_trigger_statistiche, elimina_trigger_statistiche),
+    ]
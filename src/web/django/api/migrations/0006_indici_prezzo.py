@@ -0,0 +1,21 @@
+# Generated by Django 5.0.1 on 2026-10-18 12:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_statistiche_produttore'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='software',
+            index=models.Index(fields=['prezzo', 'id'], name='software_prezzo_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='software',
+            index=models.Index(fields=['gratuito', 'prezzo'], name='software_gratuito_prezzo_idx'),
+        ),
+    ]
@@ -0,0 +1,105 @@
+# Generated by Django 5.0.1 on 2026-10-18 12:48
+
+import re
+from importlib import import_module
+
+from django.db import migrations, models
+
+# Trigger com'erano quando sono stati creati (SQL congelato in 0004 e 0005)
+ricerca = import_module('api.migrations.0004_ricerca_fts')
+statistiche = import_module('api.migrations.0005_statistiche_produttore')
+
+
+# Nuova colonna versione_ordinabile (vedi api/versioni.py), calcolata qui per
+# le righe già presenti.
+# ⚠️ Su SQLite AddField / RemoveField di una colonna NOT NULL ricostruiscono
+# la tabella api_software ed eliminano i suoi trigger (ricerca full-text e
+# statistiche): vanno ricreati, sia in avanti sia all'indietro.
+#
+# ⚠️ chiave_versione() è COPIATA qui, non importata da api/versioni.py: se un
+# giorno la chiave cambia, il ricalcolo va in una migrazione nuova, e questa
+# deve continuare a produrre le chiavi di allora.
+
+BLOCCO = 2000
+
+CIFRE = 8
+COMPONENTI = 4
+LUNGHEZZA_MASSIMA = 160
+
+_NUMERI = re.compile(r'v?([0-9]+(?:\.[0-9]+)*)')
+_IDENTIFICATORI = re.compile(r'[0-9]+|[^\W\d_]+')
+
+
+def _numero(cifre):
+    cifre = cifre.lstrip('0') or '0'
+    return '9' * CIFRE if len(cifre) > CIFRE else cifre.zfill(CIFRE)
+
+
+def chiave_versione(versione):
+    """Versione (testo libero) → chiave ordinabile come testo (vedi api/versioni.py)."""
+    testo = versione.strip().casefold().split('+', 1)[0]
+    trovati = _NUMERI.match(testo)
+    numeri = trovati.group(1).split('.') if trovati else []
+    resto = testo[trovati.end():] if trovati else testo
+
+    numeri += ['0'] * (COMPONENTI - len(numeri))
+    chiave = '.'.join(_numero(n) for n in numeri)
+
+    identificatori = _IDENTIFICATORI.findall(resto)
+    if not identificatori:
+        return (chiave + '!1')[:LUNGHEZZA_MASSIMA]
+    pre_release = '.'.join(
+        '0' + _numero(i) if i.isdigit() else '1' + i
+        for i in identificatori
+    )
+    return (chiave + '!0' + pre_release)[:LUNGHEZZA_MASSIMA]
+
+
+def ricrea_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in [*ricerca.SQL_TRIGGER, *statistiche.SQL_TRIGGER]:
+        schema_editor.execute(sql)
+
+
+def calcola_versioni_ordinabili(apps, schema_editor):
+    connessione = schema_editor.connection
+    if connessione.vendor == 'sqlite':
+        # chiave_versione() diventa una funzione SQL (solo per questa
+        # connessione): UNA UPDATE su tutta la tabella (pochi secondi per 200.000 righe)
+        connessione.connection.create_function('chiave_versione', 1, chiave_versione, deterministic=True)
+        schema_editor.execute('UPDATE api_software SET versione_ordinabile = chiave_versione(versione)')
+    else:
+        # A blocchi per id (keyset): mai un cursore aperto sulla tabella che si aggiorna
+        Software = apps.get_model('api', 'Software')
+        righe = Software.objects.using(connessione.alias)
+        ultimo_id = 0
+        while blocco := list(righe.filter(id__gt=ultimo_id).order_by('id').values_list('id', 'versione')[:BLOCCO]):
+            righe.bulk_update(
+                [Software(id=software_id, versione_ordinabile=chiave_versione(versione)) for software_id, versione in blocco],
+                ['versione_ordinabile'], batch_size=500,
+            )
+            ultimo_id = blocco[-1][0]
+    ricrea_trigger(apps, schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_indici_prezzo'),
+    ]
+
+    operations = [
+        # All'indietro gira per ULTIMA, dopo la RemoveField
+        migrations.RunPython(migrations.RunPython.noop, ricrea_trigger),
+        migrations.AddField(
+            model_name='software',
+            name='versione_ordinabile',
+            field=models.CharField(default='', editable=False, max_length=160),
+        ),
+        migrations.AddIndex(
+            model_name='software',
+            index=models.Index(fields=['nome', '-versione_ordinabile', '-id'], name='software_nome_versione_idx'),
+        ),
+        migrations.RunPython(calcola_versioni_ordinabili, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,136 @@
+# Generated by Django 5.0.1 on 2026-10-18 12:53
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+# Trigger com'erano quando sono stati creati (SQL congelato in 0004 e 0005)
+ricerca = import_module('api.migrations.0004_ricerca_fts')
+statistiche = import_module('api.migrations.0005_statistiche_produttore')
+
+
+# Feed delle modifiche per GET /api/software/changes/ (vedi api/modifiche.py):
+# colonna sequenza, contatore, lapidi e trigger.
+# ⚠️ Su SQLite AddField / RemoveField ricostruiscono api_software ed eliminano
+# TUTTI i suoi trigger: quelli di ricerca e statistiche vanno ricreati, sia in
+# avanti sia all'indietro. Sugli altri database il feed non è disponibile.
+#
+# ⚠️ SQL COPIATO qui, non importato da api/modifiche.py (come in 0004 e 0005).
+
+TABELLA_CONTATORE = 'api_sequenza_modifiche'
+TABELLA_ELIMINATI = 'api_softwareeliminato'
+PREFISSO_TRIGGER = 'api_software_modifiche'
+
+SQL_CREA_CONTATORE = f"""
+CREATE TABLE IF NOT EXISTS {TABELLA_CONTATORE} (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    valore INTEGER NOT NULL
+)
+"""
+
+_SQL_INCREMENTA = f"""
+    INSERT INTO {TABELLA_CONTATORE} (id, valore) VALUES (1, 1)
+    ON CONFLICT (id) DO UPDATE SET valore = valore + 1;
+"""
+
+_SQL_VALORE = f'(SELECT valore FROM {TABELLA_CONTATORE} WHERE id = 1)'
+
+SQL_TRIGGER = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {PREFISSO_TRIGGER}_ai AFTER INSERT ON api_software BEGIN
+        {_SQL_INCREMENTA}
+        UPDATE api_software SET sequenza = {_SQL_VALORE} WHERE id = new.id;
+        -- Id riusato (INSERT con id esplicito): la lapide non vale più
+        DELETE FROM {TABELLA_ELIMINATI} WHERE software_id = new.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {PREFISSO_TRIGGER}_au
+    AFTER UPDATE OF nome, versione, produttore, prezzo, gratuito, data_rilascio ON api_software BEGIN
+        {_SQL_INCREMENTA}
+        UPDATE api_software SET sequenza = {_SQL_VALORE} WHERE id = new.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {PREFISSO_TRIGGER}_ad AFTER DELETE ON api_software BEGIN
+        {_SQL_INCREMENTA}
+        INSERT INTO {TABELLA_ELIMINATI} (software_id, sequenza) VALUES (old.id, {_SQL_VALORE})
+        ON CONFLICT (software_id) DO UPDATE SET sequenza = excluded.sequenza;
+    END
+    """,
+]
+
+SQL_INIZIALIZZA = [
+    'UPDATE api_software SET sequenza = id',
+    f"""
+    INSERT INTO {TABELLA_CONTATORE} (id, valore)
+    VALUES (1, (SELECT COALESCE(MAX(id), 0) FROM api_software))
+    ON CONFLICT (id) DO UPDATE SET valore = MAX(valore, excluded.valore)
+    """,
+]
+
+SQL_ELIMINA = [
+    f'DROP TRIGGER IF EXISTS {PREFISSO_TRIGGER}_ai',
+    f'DROP TRIGGER IF EXISTS {PREFISSO_TRIGGER}_au',
+    f'DROP TRIGGER IF EXISTS {PREFISSO_TRIGGER}_ad',
+    f'DROP TABLE IF EXISTS {TABELLA_CONTATORE}',
+]
+
+
+def ricrea_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in [*ricerca.SQL_TRIGGER, *statistiche.SQL_TRIGGER]:
+        schema_editor.execute(sql)
+
+
+def crea_feed_modifiche(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(SQL_CREA_CONTATORE)
+    # Prima i valori delle righe già presenti, poi i trigger
+    for sql in SQL_INIZIALIZZA:
+        schema_editor.execute(sql)
+    for sql in SQL_TRIGGER:
+        schema_editor.execute(sql)
+    ricrea_trigger(apps, schema_editor)
+
+
+def elimina_feed_modifiche(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in SQL_ELIMINA:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_versione_ordinabile'),
+    ]
+
+    operations = [
+        # All'indietro gira per ULTIMA, dopo la RemoveField
+        migrations.RunPython(migrations.RunPython.noop, ricrea_trigger),
+        migrations.CreateModel(
+            name='SoftwareEliminato',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('software_id', models.BigIntegerField(unique=True)),
+                ('sequenza', models.BigIntegerField(db_index=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Software eliminati',
+            },
+        ),
+        migrations.AddField(
+            model_name='software',
+            name='sequenza',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='software',
+            index=models.Index(fields=['sequenza'], name='software_sequenza_idx'),
+        ),
+        migrations.RunPython(crea_feed_modifiche, elimina_feed_modifiche),
+    ]
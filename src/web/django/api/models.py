@@ -1,4 +1,39 @@
 from django.db import models
+from django.db.models.functions import Lower
+
+from .versioni import LUNGHEZZA_MASSIMA, chiave_versione
+
+
+class SoftwareQuerySet(models.QuerySet):
+    """
+    QuerySet di Software.objects: tiene versione_ordinabile allineata a
+    versione anche nelle operazioni di massa, che NON chiamano save().
+    """
+    
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.versione_ordinabile = chiave_versione(obj.versione)
+        return super().bulk_create(objs, *args, **kwargs)
+    
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        if 'versione' in fields:
+            objs = list(objs)
+            for obj in objs:
+                obj.versione_ordinabile = chiave_versione(obj.versione)
+            fields = [*fields, 'versione_ordinabile']
+        return super().bulk_update(objs, fields, *args, **kwargs)
+    
+    def update(self, **kwargs):
+        # ⚠️ Con la chiave già nei kwargs non si ricalcola: bulk_update() qui
+        # sopra la aggiunge e poi chiama update() con espressioni Case(When(...))
+        if 'versione' in kwargs and 'versione_ordinabile' not in kwargs:
+            # ⚠️ Con un'espressione (F(), Concat(), ...) il nuovo valore lo
+            # conosce solo il database: la chiave non si può calcolare
+            if not isinstance(kwargs['versione'], str):
+                raise TypeError('update(versione=...) accetta solo testo: usa save() o bulk_update()')
+            kwargs['versione_ordinabile'] = chiave_versione(kwargs['versione'])
+        return super().update(**kwargs)
 
 # ⚠️ IMPORTANTE: Ogni classe che eredita da models.Model = 1 tabella nel database
 # Django genera automaticamente SQL per creare/modificare tabelle (migrations)
@@ -22,6 +57,12 @@ class Software(models.Model):
     # Versione come testo (non numero!) per gestire formati come "2.5.3-beta"
     versione = models.CharField(max_length=20)
     
+    # Chiave derivata da 'versione' che il database sa ORDINARE ('10.0' dopo
+    # '9.1', '2.0-beta' prima di '2.0'): vedi api/versioni.py.
+    # editable=False: niente form dell'admin, niente serializer. La calcolano
+    # save() e SoftwareQuerySet, mai il client.
+    versione_ordinabile = models.CharField(max_length=LUNGHEZZA_MASSIMA, default='', editable=False)
+    
     produttore = models.CharField(max_length=100)
     
     
@@ -56,6 +97,19 @@ class Software(models.Model):
     data_rilascio = models.DateField()
     
     
+    # --- CAMPI GESTITI DAL DATABASE ---
+    
+    # Numero dell'ultima modifica della riga (contatore globale, cresce a ogni
+    # INSERT / UPDATE): lo scrivono i TRIGGER, mai Django (vedi api/modifiche.py).
+    # GET /api/software/changes/?since=N → le righe con sequenza > N
+    sequenza = models.BigIntegerField(default=0, editable=False)
+    
+    
+    # Manager con SoftwareQuerySet: Software.objects.bulk_create() & co.
+    # calcolano anche versione_ordinabile
+    objects = SoftwareQuerySet.as_manager()
+    
+    
     # --- METODI SPECIALI ---
     
     # __str__: rappresentazione testuale dell'oggetto
@@ -65,6 +119,15 @@ class Software(models.Model):
     def __str__(self):
         return f"{self.nome} v{self.versione}"
     
+    # save(): INSERT o UPDATE di UNA riga (view CRUD, admin, shell)
+    def save(self, *args, **kwargs):
+        self.versione_ordinabile = chiave_versione(self.versione)
+        # save(update_fields=['versione']) deve scrivere anche la chiave
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'versione' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'versione_ordinabile'}
+        super().save(*args, **kwargs)
+    
     
     # --- META OPTIONS ---
     
@@ -74,7 +137,48 @@ class Software(models.Model):
         # Senza: "Softwares" ❌ (grammaticamente sbagliato)
         # Con: "Software" ✅ (corretto in italiano)
         verbose_name_plural = "Software"
-        
+
+        # ⚠️ Senza indici ogni filtro legge TUTTA la tabella (full scan).
+        # Ogni indice qui sotto serve a query precise: se ne aggiungi o togli uno,
+        # verifica il piano delle query con: python manage.py verifica_indici
+        indexes = [
+            # Paginazione a cursore (api/paginazione.py) e ordinamento dell'admin:
+            # WHERE data_rilascio >= ... ORDER BY data_rilascio, id LIMIT n → seek sull'indice
+            models.Index(fields=['data_rilascio', 'id'], name='software_rilascio_id_idx'),
+            
+            # ?ordering=prezzo e filtri prezzo_min / prezzo_max (GET /api/software/filtra/):
+            # WHERE prezzo >= ... ORDER BY prezzo, id LIMIT n → seek sull'indice
+            models.Index(fields=['prezzo', 'id'], name='software_prezzo_id_idx'),
+            
+            # Indice FUNZIONALE (su un'espressione, non su una colonna):
+            # WHERE LOWER(produttore) = LOWER('Adobe') → /api/software/produttore/Adobe/
+            # ⚠️ Usato solo se la query contiene ESATTAMENTE LOWER(produttore)
+            # (vedi produttore_uguale() in api/filtri.py)
+            models.Index(Lower('produttore'), name='software_produttore_lower_idx'),
+            
+            # WHERE gratuito = 1 [ORDER BY data_rilascio] → /api/software/gratuiti/
+            models.Index(fields=['gratuito', 'data_rilascio'], name='software_gratuito_rilascio_idx'),
+            
+            # WHERE gratuito = 0 ORDER BY prezzo, id → "i più economici a pagamento"
+            # (SQLite aggiunge l'id in fondo a ogni indice: vale anche per lo spareggio)
+            models.Index(fields=['gratuito', 'prezzo'], name='software_gratuito_prezzo_idx'),
+            
+            # WHERE produttore = 'Adobe' [ORDER BY nome] (filtro dell'admin)
+            models.Index(fields=['produttore', 'nome'], name='software_produttore_nome_idx'),
+            
+            # Ultima versione di ogni nome (GET /api/software/latest/):
+            # PARTITION BY nome ORDER BY versione_ordinabile DESC, id DESC
+            # → righe già in ordine leggendo l'indice, nessun ordinamento
+            models.Index(fields=['nome', '-versione_ordinabile', '-id'], name='software_nome_versione_idx'),
+            
+            # WHERE sequenza > N ORDER BY sequenza LIMIT n → GET /api/software/changes/
+            models.Index(fields=['sequenza'], name='software_sequenza_idx'),
+            
+            # MIN(prezzo) / MAX(prezzo) WHERE produttore = ... AND gratuito = ...
+            # → i trigger delle statistiche per produttore (api/statistiche.py)
+            models.Index(fields=['produttore', 'gratuito', 'prezzo'], name='software_produttore_prezzo_idx'),
+        ]
+
         # --- ALTRE OPZIONI META UTILI ---
         
         # ordering: ordine default delle query
@@ -97,6 +201,65 @@ class Software(models.Model):
         # ]
 
 
+# --- TABELLA RIASSUNTIVA (mantenuta dal database) ---
+
+class StatisticaProduttore(models.Model):
+    """
+    Una riga per ogni coppia (produttore, gratuito) del catalogo: quanti
+    software e i loro prezzi (somma, minimo, massimo).
+    
+    GET /api/software/stats/ legge QUESTA tabella (una riga per produttore)
+    invece di raggruppare tutta api_software a ogni richiesta.
+    
+    ⚠️ Mai scriverla da Django: la aggiornano i TRIGGER su api_software
+    (vedi api/statistiche.py), così resta giusta anche con bulk_create(),
+    update() e DELETE dirette. Se dovesse divergere:
+        python manage.py ricostruisci_statistiche
+    """
+    
+    produttore = models.CharField(max_length=100)
+    gratuito = models.BooleanField()
+    numero = models.PositiveIntegerField()
+    
+    # Prezzi in CENTESIMI (interi): sommare decimali in SQL (REAL su SQLite)
+    # accumulerebbe errori di arrotondamento a ogni INSERT/DELETE
+    somma_centesimi = models.BigIntegerField()
+    min_centesimi = models.IntegerField()
+    max_centesimi = models.IntegerField()
+    
+    def __str__(self):
+        return f"{self.produttore} ({'gratuiti' if self.gratuito else 'a pagamento'}): {self.numero}"
+    
+    class Meta:
+        verbose_name_plural = "Statistiche per produttore"
+        constraints = [
+            # Necessario per INSERT ... ON CONFLICT (produttore, gratuito) dei trigger
+            models.UniqueConstraint(fields=['produttore', 'gratuito'], name='statistica_produttore_gratuito_uniq'),
+        ]
+
+
+# --- LAPIDI (SOFTWARE ELIMINATI) ---
+
+class SoftwareEliminato(models.Model):
+    """
+    Una riga per ogni software eliminato: chi sincronizza il catalogo con
+    GET /api/software/changes/ deve sapere anche cosa TOGLIERE dalla sua copia.
+    
+    ⚠️ Come StatisticaProduttore: la scrivono i TRIGGER su api_software
+    (vedi api/modifiche.py), non Django.
+    """
+    
+    # Non una ForeignKey: la riga di api_software non esiste più
+    software_id = models.BigIntegerField(unique=True)
+    sequenza = models.BigIntegerField(db_index=True)
+    
+    def __str__(self):
+        return f"Software {self.software_id} eliminato (modifica {self.sequenza})"
+    
+    class Meta:
+        verbose_name_plural = "Software eliminati"
+
+
 # --- ALTRI TIPI DI CAMPO COMUNI ---
 
 # class Esempio(models.Model):
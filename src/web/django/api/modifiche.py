@@ -0,0 +1,94 @@
+from rest_framework.exceptions import ValidationError
+
+
+# --- FEED DELLE MODIFICHE (SINCRONIZZAZIONE INCREMENTALE) ---
+#
+# GET /api/software/changes/?since=0      → tutto il catalogo (prima volta)
+# GET /api/software/changes/?since=1234   → SOLO quello che è cambiato dopo
+#
+# Chi tiene una copia del catalogo (mirror, app offline, ...) senza feed deve
+# riscaricare TUTTA la lista a ogni sincronizzazione: O(catalogo). Con il feed
+# scarica solo le righe cambiate: O(modifiche).
+#
+# Come funziona:
+#   - un CONTATORE globale (tabella api_sequenza_modifiche, una sola riga)
+#     cresce di 1 a ogni INSERT / UPDATE / DELETE su api_software
+#   - ogni riga di api_software ha in 'sequenza' il valore del contatore della
+#     sua ULTIMA modifica (indice software_sequenza_idx)
+#   - ogni riga eliminata lascia una "lapide" (tombstone) in
+#     api_softwareeliminato: id + sequenza della cancellazione
+#
+# Modificati dopo il token = WHERE sequenza > token ORDER BY sequenza: un seek
+# sull'indice, qualunque sia la dimensione del catalogo.
+#
+# ⚠️ Trigger e non signals di Django (come api/ricerca.py e api/statistiche.py):
+# registrano anche bulk_create(), update(), le DELETE dirette (sezione BULK di
+# api/views.py), l'admin e chi scrive sul database fuori da Django.
+#
+# ⚠️ Perché nessuna modifica va persa: SQLite ha UN solo scrittore alla volta,
+# quindi le transazioni prendono i numeri del contatore nello stesso ordine in
+# cui diventano visibili. Con database a scritture concorrenti (PostgreSQL)
+# una transazione lenta potrebbe rendere visibile il numero 10 DOPO che un
+# client ha già letto l'11: per questo il feed è solo per SQLite.
+#
+# ⚠️ Contatore e trigger esistono SOLO come SQL della migrazione 0008. Le
+# migrazioni che ricostruiscono api_software su SQLite li eliminano e li
+# ricreano con quell'SQL (come per ricerca e statistiche). Una colonna nuova
+# di Software va aggiunta alle colonne del trigger _au ("UPDATE OF ...") in
+# una migrazione NUOVA, che ricrea il trigger.
+
+TABELLA_CONTATORE = 'api_sequenza_modifiche'
+
+
+def feed_disponibile(connessione):
+    return connessione.vendor == 'sqlite'
+
+
+def token_corrente(connessione):
+    """
+    Valore attuale del contatore = il "token" di ?since= che comprende tutte
+    le modifiche fatte finora (None se il feed non è disponibile).
+    Usato dagli eventi SSE (api/signals.py): id dell'evento = token.
+    """
+    if not feed_disponibile(connessione):
+        return None
+    with connessione.cursor() as cursore:
+        cursore.execute(f'SELECT valore FROM {TABELLA_CONTATORE} WHERE id = 1')
+        riga = cursore.fetchone()
+    return riga[0] if riga else 0
+
+
+def leggi_since(request):
+    """Legge ?since= (token della sincronizzazione precedente, default 0 = tutto)."""
+    valore = request.query_params.get('since', '0')
+    try:
+        since = int(valore)
+    except ValueError:
+        raise ValidationError({'since': ['Deve essere un numero intero (il "token" della risposta precedente).']})
+    if since < 0:
+        raise ValidationError({'since': ['Non può essere negativo.']})
+    return since
+
+
+def unisci_modifiche(modificati, eliminati, limit):
+    """
+    Unisce le due liste (già in ordine di sequenza) e tiene le prime 'limit'
+    modifiche, come se fossero una lista sola.
+
+    modificati: righe con attributo .sequenza
+    eliminati:  tuple (software_id, sequenza)
+    Restituisce (modificati, id eliminati, ultima sequenza inclusa, altre modifiche?)
+    """
+    voci = sorted(
+        [(riga.sequenza, riga, None) for riga in modificati]
+        + [(sequenza, None, software_id) for software_id, sequenza in eliminati],
+        key=lambda voce: voce[0],
+    )
+    altre = len(voci) > limit
+    voci = voci[:limit]
+    return (
+        [riga for _, riga, _ in voci if riga is not None],
+        [software_id for _, riga, software_id in voci if riga is None],
+        voci[-1][0] if voci else None,
+        altre,
+    )
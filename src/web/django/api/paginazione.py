@@ -0,0 +1,242 @@
+import base64
+import json
+from datetime import date
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Max, Min, Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .conf import impostazione
+from .models import Software
+
+
+# --- PAGINAZIONE A CURSORE (KEYSET) ---
+#
+# Paginazione classica (OFFSET):
+#   SELECT * FROM api_software ORDER BY id LIMIT 50 OFFSET 100000
+#   ⚠️ Il database deve LEGGERE e SCARTARE 100.000 righe → pagine profonde lente!
+#
+# Paginazione keyset (cursore):
+#   SELECT * FROM api_software WHERE id > 100050 ORDER BY id LIMIT 50
+#   ✅ L'indice porta direttamente alla prima riga → ogni pagina costa come la prima
+#
+# Il "cursore" è un token OPACO (base64) che contiene i valori dell'ultima
+# riga vista: il client non deve interpretarlo, solo rimandarlo indietro.
+#
+# Esempio:
+#   GET /api/software/?limit=2
+#   {"next": "http://.../api/software/?limit=2&cursor=eyJvIjoiaWQiLC...",
+#    "prev": null, "software": [{...}, {...}]}
+
+# Ordinamenti ammessi: SOLO colonne con un indice (altrimenti niente seek).
+# Ogni ordinamento ha 'id' come spareggio finale: i valori di data_rilascio
+# (e di prezzo) possono ripetersi, la coppia (data_rilascio, id) invece è unica.
+ORDINAMENTI = {
+    'id': ['id'],
+    '-id': ['-id'],
+    'data_rilascio': ['data_rilascio', 'id'],          # indice (data_rilascio, id)
+    '-data_rilascio': ['-data_rilascio', '-id'],
+    'prezzo': ['prezzo', 'id'],                        # indice (prezzo, id)
+    '-prezzo': ['-prezzo', '-id'],
+}
+
+ORDINAMENTO_DEFAULT = 'id'
+
+# LIMIT minimo della query (le righe in più vengono scartate).
+# ⚠️ Con un LIMIT molto piccolo (≤ 10) il planner di SQLite preferisce
+# "filtra con l'indice del WHERE, poi ordina" anche quando scorrere l'indice
+# dell'ordinamento sarebbe immediato:
+#   WHERE data_rilascio >= ... ORDER BY prezzo, id LIMIT 4   → ~100 ms (ordina 70.000 righe)
+#   WHERE data_rilascio >= ... ORDER BY prezzo, id LIMIT 21  → ~0,2 ms (indice (prezzo, id))
+LIMIT_MINIMO_QUERY = 21
+
+# Colonne che la paginazione deve poter leggere da ogni riga, anche quando il
+# client ne chiede solo alcune con ?fields= (vedi _valori_riga)
+COLONNE_ORDINAMENTO = tuple(dict.fromkeys(
+    chiave.lstrip('-') for chiavi in ORDINAMENTI.values() for chiave in chiavi
+))
+
+
+def usa_paginazione(request):
+    """True se il client ha chiesto una pagina (?limit= o ?cursor=)."""
+    return 'limit' in request.query_params or 'cursor' in request.query_params
+
+
+def codifica_cursore(ordinamento, valori, indietro=False):
+    """Trasforma (ordinamento, valori dell'ultima riga, direzione) in un token opaco."""
+    dati = {'o': ordinamento, 'v': valori, 'p': indietro}
+    testo = json.dumps(dati, separators=(',', ':'))
+    # urlsafe: niente '+' e '/' nel token; rstrip('='): niente padding nell'URL
+    return base64.urlsafe_b64encode(testo.encode()).decode().rstrip('=')
+
+
+def decodifica_cursore(token):
+    """
+    Operazione inversa di codifica_cursore().
+
+    ⚠️ Il token arriva dal client: va validato tutto (struttura, ordinamento,
+    tipi dei valori), altrimenti un cursore manomesso diventa un errore 500.
+    """
+    try:
+        padding = '=' * (-len(token) % 4)
+        dati = json.loads(base64.urlsafe_b64decode(token + padding))
+        ordinamento = dati['o']
+        chiavi = ORDINAMENTI[ordinamento]
+        valori = dati['v']
+        if not isinstance(valori, list) or len(valori) != len(chiavi):
+            raise ValueError('numero di valori errato')
+        # ⚠️ to_python(None) accetta None: un null arriverebbe fino al .filter()
+        if any(valore is None for valore in valori):
+            raise ValueError('valore nullo')
+        # to_python(): converte e valida ('2024-01-15' → date, '12' → 12)
+        valori = [
+            Software._meta.get_field(chiave.lstrip('-')).to_python(valore)
+            for chiave, valore in zip(chiavi, valori)
+        ]
+        return {'o': ordinamento, 'v': valori, 'p': bool(dati['p'])}
+    except (ValueError, TypeError, KeyError, DjangoValidationError):
+        raise ValidationError({'cursor': ['Cursore non valido.']})
+
+
+def leggi_limit(request):
+    """Legge ?limit= e lo limita a PAGINAZIONE_LIMIT_MAX."""
+    valore = request.query_params.get('limit')
+    if valore is None:
+        return impostazione('PAGINAZIONE_LIMIT_DEFAULT')
+    try:
+        limit = int(valore)
+    except ValueError:
+        raise ValidationError({'limit': ['Deve essere un numero intero.']})
+    if limit < 1:
+        raise ValidationError({'limit': ['Deve essere maggiore di zero.']})
+    return min(limit, impostazione('PAGINAZIONE_LIMIT_MAX'))
+
+
+def _inverti(chiave):
+    """'id' → '-id', '-id' → 'id' (serve per andare alla pagina precedente)."""
+    return chiave[1:] if chiave.startswith('-') else '-' + chiave
+
+
+def _condizione_keyset(chiavi, valori):
+    """
+    Costruisce la WHERE che "salta" direttamente dopo l'ultima riga vista.
+
+    Con chiavi ['data_rilascio', 'id'] e valori [d, i]:
+        data_rilascio >= d AND (data_rilascio > d OR id > i)
+
+    ⚠️ La prima condizione (>=) è ridondante dal punto di vista logico, ma è
+    quella che permette al database di fare un SEEK sull'indice invece di
+    scorrerlo dall'inizio valutando l'OR riga per riga.
+    """
+    confronti = [('lt' if chiave.startswith('-') else 'gt', chiave.lstrip('-')) for chiave in chiavi]
+
+    operatore, campo = confronti[0]
+    if len(confronti) == 1:
+        return Q(**{f'{campo}__{operatore}': valori[0]})
+
+    operatore_id, campo_id = confronti[1]
+    return Q(**{f'{campo}__{operatore}e': valori[0]}) & (
+        Q(**{f'{campo}__{operatore}': valori[0]}) | Q(**{f'{campo_id}__{operatore_id}': valori[1]})
+    )
+
+
+def _valori_riga(riga, chiavi):
+    """Valori delle colonne di ordinamento di una riga, in forma serializzabile JSON."""
+    valori = []
+    for chiave in chiavi:
+        valore = getattr(riga, chiave.lstrip('-'))
+        if isinstance(valore, date):
+            valore = valore.isoformat()
+        elif isinstance(valore, Decimal):
+            valore = str(valore)
+        valori.append(valore)
+    return valori
+
+
+def stima_totale(queryset):
+    """
+    Stima ECONOMICA del numero di righe: MAX(id) - MIN(id) + 1.
+
+    ⚠️ COUNT(*) su SQLite scorre tutta la tabella; MIN/MAX sulla primary key
+    sono due seek sull'indice. La stima è esatta finché non ci sono righe
+    eliminate, altrimenti è un limite superiore.
+
+    ⚠️ Con un filtro (GET /api/software/filtra/) gli id delle righe che
+    passano sono sparsi: MAX - MIN direbbe quasi la dimensione del catalogo.
+    Lì si usa COUNT(*) con la stessa WHERE, che scorre solo l'intervallo
+    dell'indice del filtro (non la tabella).
+    """
+    if queryset.query.has_filters():
+        return queryset.count()
+    estremi = queryset.aggregate(minimo=Min('id'), massimo=Max('id'))
+    if estremi['minimo'] is None:
+        return 0
+    return estremi['massimo'] - estremi['minimo'] + 1
+
+
+def pagina_keyset(request, queryset):
+    """
+    Applica la paginazione keyset a un queryset.
+
+    Parametri della richiesta:
+        ?limit=50              righe per pagina (max PAGINAZIONE_LIMIT_MAX)
+        ?ordering=-data_rilascio  ordinamento (solo colonne indicizzate)
+        ?cursor=<token>        token ricevuto in "next" o "prev"
+        ?totale=1              aggiunge "count_stimato" (vedi stima_totale)
+
+    Restituisce (righe, meta):
+        righe: lista di oggetti Software della pagina
+        meta: {'next': url | None, 'prev': url | None[, 'count_stimato': n]}
+    """
+    limit = leggi_limit(request)
+
+    token = request.query_params.get('cursor')
+    cursore = decodifica_cursore(token) if token else None
+
+    if cursore:
+        # Il cursore "ricorda" l'ordinamento: ?ordering= viene ignorato
+        ordinamento = cursore['o']
+    else:
+        ordinamento = request.query_params.get('ordering', ORDINAMENTO_DEFAULT)
+        if ordinamento not in ORDINAMENTI:
+            raise ValidationError({'ordering': [f'Valori ammessi: {", ".join(ORDINAMENTI)}.']})
+
+    chiavi = ORDINAMENTI[ordinamento]
+    indietro = bool(cursore and cursore['p'])
+
+    # Pagina precedente = stessa query con ordinamento INVERTITO,
+    # poi si rigirano le righe per restituirle nell'ordine normale
+    chiavi_query = [_inverti(chiave) for chiave in chiavi] if indietro else chiavi
+
+    # Il totale è quello della view (con i suoi filtri), non della sola pagina
+    filtrato = queryset
+    if cursore:
+        queryset = queryset.filter(_condizione_keyset(chiavi_query, cursore['v']))
+
+    # limit + 1: la riga in più dice se esiste un'altra pagina (senza COUNT)
+    righe = list(queryset.order_by(*chiavi_query)[:max(limit + 1, LIMIT_MINIMO_QUERY)])
+    altre_righe = len(righe) > limit
+    righe = righe[:limit]
+    if indietro:
+        righe.reverse()
+        ha_successiva, ha_precedente = True, altre_righe
+    else:
+        ha_successiva, ha_precedente = altre_righe, cursore is not None
+
+    url = remove_query_param(request.build_absolute_uri(), 'cursor')
+    meta = {'next': None, 'prev': None}
+    if righe and ha_successiva:
+        meta['next'] = replace_query_param(
+            url, 'cursor', codifica_cursore(ordinamento, _valori_riga(righe[-1], chiavi))
+        )
+    if righe and ha_precedente:
+        meta['prev'] = replace_query_param(
+            url, 'cursor', codifica_cursore(ordinamento, _valori_riga(righe[0], chiavi), indietro=True)
+        )
+
+    if request.query_params.get('totale') in ('1', 'true'):
+        meta['count_stimato'] = stima_totale(filtrato)
+
+    return righe, meta
@@ -0,0 +1,258 @@
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from contextvars import ContextVar
+from functools import wraps
+from inspect import iscoroutinefunction
+from urllib.parse import unquote, urlsplit
+
+from django.conf import settings
+from django.db import connections
+
+from .conf import impostazione
+
+
+# --- LETTURE SULLE REPLICHE, SCRITTURE SUL PRIMARIO ---
+#
+# Con un solo database le GET del catalogo (tante) e le scritture (poche ma
+# con i COMMIT) si contendono lo stesso file. Con le repliche:
+#
+#   GET del catalogo (view con @lettura_da_replica) → una replica a caso di
+#                                                   API_CATALOGO['REPLICHE_LETTURA']
+#   tutto il resto (scritture, admin, sessioni)  → 'default' (il primario)
+#
+# Le repliche SQLite sono COPIE del primario fatte con l'API di backup:
+#   python manage.py replica_sqlite                  # una copia
+#   python manage.py replica_sqlite --intervallo 5   # ogni 5 s, se il primario è cambiato
+# La copia nuova sostituisce la vecchia con una rinomina: chi sta leggendo
+# finisce sulla copia vecchia, le connessioni nuove aprono quella nuova.
+#
+# ⚠️ Una replica è INDIETRO rispetto al primario (fino a un intervallo):
+#   - chi ha appena scritto deve rileggere i suoi dati → dopo una scrittura
+#     riuscita il middleware FinestraScritture (api/middleware.py) imposta il
+#     cookie COOKIE_SCRITTURA: per REPLICHE_FINESTRA secondi le letture di quel
+#     client vanno sul primario ("read your writes")
+#   - le cache delle risposte, delle faccette e gli ETag (api/cache.py)
+#     includono la VERSIONE della replica letta (data di modifica del file):
+#     i dati vecchi di una replica non finiscono sotto la generazione nuova
+#   - replica non ancora copiata (file assente) → si legge dal primario
+#   - replica indietro di oltre REPLICHE_RITARDO_MAX secondi rispetto
+#     all'ultima scrittura sul primario (replica_sqlite fermo, copia
+#     fallita...) → si legge dal primario, invece di servire per sempre una
+#     copia congelata
+#
+# ⚠️ Solo le view che leggono e basta: non GET /api/software/<id>/ (la sua
+# cache per id non ha generazione), non i suggerimenti (indice in memoria
+# aggiornato dalle scritture), non l'esportazione (snapshot su disco per
+# generazione). Le risposte in streaming leggono dal primario: il generatore
+# gira DOPO la view, fuori da @lettura_da_replica.
+#
+# Configurazione (pww/settings.py, con REPLICHE_ATTIVE = True):
+#   DATABASES['replica'] = {
+#       'ENGINE': 'django.db.backends.sqlite3',
+#       'NAME': 'file:/percorso/replica.sqlite3?mode=ro&immutable=1',
+#       'OPTIONS': {'uri': True},
+#       'TEST': {'MIRROR': 'default'},   # nei test la replica È il primario
+#   }
+#   DATABASE_ROUTERS = ['api.repliche.RouterLetturaScrittura']
+#   API_CATALOGO['REPLICHE_LETTURA'] = ['replica']   # ⚠️ default [] = spente
+#
+# Senza repliche l'alias 'replica' NON esiste (nessun file da aprire per
+# check e makemigrations); una replica elencata ma non configurata → primario.
+#
+# ⚠️ Attivale solo con "replica_sqlite --intervallo N" sempre in esecuzione
+# (es. un servizio di systemd accanto al server).
+#
+# mode=ro&immutable=1: il file non cambia mai (viene sostituito), quindi
+# niente lock e niente -wal/-shm. Per lo stesso motivo CONN_MAX_AGE deve
+# restare 0: una connessione persistente continuerebbe a leggere la copia vecchia.
+
+COOKIE_SCRITTURA = 'pww_scrittura'
+
+# (alias, versione) scelti per la richiesta corrente; None = primario.
+# ContextVar e non thread-local: vale anche per le view async, e
+# sync_to_async la copia nel thread che esegue le query
+_lettura = ContextVar('api_repliche_lettura', default=None)
+
+
+def percorso_sqlite(alias):
+    """File di un alias SQLite, anche se NAME è un URI ('file:...?mode=ro')."""
+    nome = str(connections[alias].settings_dict['NAME'])
+    if nome.startswith('file:'):
+        return unquote(urlsplit(nome).path)
+    return nome
+
+
+def versione_replica(alias):
+    """
+    Versione dei dati di una replica: data di modifica del file in
+    nanosecondi (cambia a ogni copia). None = replica non disponibile.
+    """
+    if alias not in connections:
+        return None  # elencata in REPLICHE_LETTURA ma non in DATABASES
+    if connections[alias].vendor != 'sqlite':
+        # Un altro database servirebbe la SUA versione (es. l'LSN di PostgreSQL)
+        return None
+    try:
+        return os.stat(percorso_sqlite(alias)).st_mtime_ns
+    except (OSError, ValueError):
+        return None
+
+
+def modifica_primario():
+    """
+    Ultima scrittura sul primario: data di modifica (ns) del file o del suo
+    -wal (in WAL le scritture finiscono lì fino al checkpoint). None = non nota.
+
+    ⚠️ Due os.stat() per richiesta: microsecondi, nessuna query.
+    """
+    if connections['default'].vendor != 'sqlite':
+        return None
+    percorso = percorso_sqlite('default')
+    ultima = None
+    for file in (percorso, percorso + '-wal'):
+        try:
+            modifica = os.stat(file).st_mtime_ns
+        except (OSError, ValueError):
+            continue
+        ultima = modifica if ultima is None else max(ultima, modifica)
+    return ultima
+
+
+def alias_repliche():
+    """
+    Alias di DATABASES che sono repliche: quelli di REPLICHE_LETTURA e quelli
+    con TEST['MIRROR'] (come Django configura le repliche), anche se spente.
+    """
+    return set(impostazione('REPLICHE_LETTURA')) | {
+        alias for alias, configurazione in settings.DATABASES.items()
+        if configurazione.get('TEST', {}).get('MIRROR')
+    }
+
+
+def scrittura_recente(request):
+    """True se il client ha scritto da meno di REPLICHE_FINESTRA secondi."""
+    valore = request.COOKIES.get(COOKIE_SCRITTURA)
+    try:
+        return valore is not None and float(valore) > time.time()
+    except ValueError:
+        return False
+
+
+def scegli_lettura(request):
+    """(alias, versione) della replica da cui leggere, oppure None = primario."""
+    repliche = impostazione('REPLICHE_LETTURA')
+    if not repliche or scrittura_recente(request):
+        return None
+    ritardo_max = impostazione('REPLICHE_RITARDO_MAX')
+    primario = modifica_primario() if ritardo_max is not None else None
+    disponibili = []
+    for alias in repliche:
+        versione = versione_replica(alias)
+        if versione is None:
+            continue
+        # Copia più vecchia dell'ultima scrittura di oltre ritardo_max secondi.
+        # (Primario fermo → modifica più vecchia della copia: replica aggiornata)
+        if primario is not None and primario - versione > ritardo_max * 1_000_000_000:
+            continue
+        disponibili.append((alias, versione))
+    return random.choice(disponibili) if disponibili else None
+
+
+def versione_lettura():
+    """Versione della replica letta dalla richiesta corrente (None = primario)."""
+    scelta = _lettura.get()
+    return scelta[1] if scelta is not None else None
+
+
+def lettura_da_replica(view):
+    """
+    Decorator: le query del catalogo di questa view vanno su una replica.
+
+    Uso (SOTTO @api_view e @budget_query, SOPRA @etag_catalogo):
+        @api_view(['GET'])
+        @budget_query(2)
+        @lettura_da_replica
+        @etag_catalogo('software_gratuiti')
+        @cache_catalogo('software_gratuiti')
+        def software_gratuiti(request): ...
+
+    Funziona anche con le view async (async def).
+    """
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def wrapper_async(request, *args, **kwargs):
+            token = _lettura.set(scegli_lettura(request))
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                _lettura.reset(token)
+        return wrapper_async
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        token = _lettura.set(scegli_lettura(request))
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _lettura.reset(token)
+    return wrapper
+
+
+class RouterLetturaScrittura:
+    """
+    Router di Django (DATABASE_ROUTERS): None = "decide il prossimo router",
+    alla fine 'default'.
+
+    - letture dei modelli dell'app api dentro @lettura_da_replica → la replica scelta
+    - scritture → sempre il primario
+    - migrazioni: mai sulle repliche (sono copie, lo schema arriva con la
+      copia), nemmeno su quelle configurate ma fuori da REPLICHE_LETTURA
+    """
+
+    def db_for_read(self, model, **hints):
+        scelta = _lettura.get()
+        if scelta is None or model._meta.app_label != 'api':
+            return None
+        return scelta[0]
+
+    def db_for_write(self, model, **hints):
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in alias_repliche():
+            return False
+        return None
+
+
+def copia_sqlite(sorgente, destinazione):
+    """
+    Copia coerente del database aperto in 'sorgente' (connessione sqlite3)
+    nel file 'destinazione', sostituito solo a copia COMPLETA.
+    Restituisce la dimensione in byte.
+
+    ⚠️ API di backup e non copia del file: in WAL le ultime transazioni sono
+    ancora nel file -wal, e una copia "a metà" di una scrittura sarebbe corrotta.
+    """
+    descrittore, temporaneo = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(destinazione)), prefix='.replica-', suffix='.sqlite3'
+    )
+    os.close(descrittore)
+    try:
+        copia = sqlite3.connect(temporaneo)
+        try:
+            sorgente.backup(copia)
+            # La copia eredita il WAL del primario (api/connessioni.py): una
+            # replica immutable deve essere UN solo file, senza -wal e -shm
+            copia.execute('PRAGMA journal_mode = DELETE')
+        finally:
+            copia.close()
+        os.chmod(temporaneo, 0o644)  # mkstemp crea file leggibili solo dal proprietario
+        os.replace(temporaneo, destinazione)
+    except BaseException:
+        if os.path.exists(temporaneo):
+            os.remove(temporaneo)
+        raise
+    return os.path.getsize(destinazione)
@@ -0,0 +1,118 @@
+import re
+
+from django.db import connections, router
+from django.db.models import Q
+
+from .models import Software
+
+
+# --- RICERCA FULL-TEXT (SQLite FTS5) ---
+#
+# LIKE '%photo%' (search_fields dell'admin) legge TUTTE le righe e confronta
+# il testo una riga alla volta: con milioni di righe sono secondi.
+#
+# FTS5 = modulo di SQLite per la ricerca testuale: un "indice invertito"
+#   parola → righe che la contengono   (come l'indice analitico di un libro)
+# Cercare "photo*" = leggere una voce dell'indice, non la tabella.
+#
+# Tabella virtuale api_software_fts (creata dalla migrazione 0004):
+#   - colonne nome, produttore
+#   - content='api_software': NON duplica il testo, legge le righe da
+#     api_software usando rowid = id
+#   - tokenize unicode61 remove_diacritics 2: "Ünix" si trova anche con "unix"
+#   - prefix '2 3': indici extra per i prefissi di 2 e 3 lettere (ph*, pho*)
+#
+# ⚠️ Sincronizzata da TRIGGER nel database, non da signals di Django: così
+# restano allineati anche bulk_create(), update(), le DELETE dirette
+# (api/views.py, sezione BULK) e chi scrive sul database fuori da Django.
+#
+# La tabella e i trigger esistono SOLO come SQL della migrazione 0004 (qui
+# nessuna copia che possa divergere). Con content='...' l'indice va
+# aggiornato a mano: i trigger tolgono una riga inserendo il comando speciale
+# 'delete' con i VECCHI valori, e "UPDATE OF nome, produttore" fa sì che
+# cambiare solo il prezzo non tocchi l'indice.
+#
+# ⚠️ Le migrazioni che "ricostruiscono" la tabella api_software su SQLite
+# (molti AlterField / AddField) eliminano i trigger: vanno ricreati in coda
+# alla migrazione, con l'SQL della 0004 (vedi 0007). Se un giorno i trigger
+# cambiano, la modifica va in una migrazione NUOVA.
+
+TABELLA_FTS = 'api_software_fts'
+
+# Peso delle colonne nel punteggio bm25: una parola nel nome conta più
+# della stessa parola nel produttore
+PESO_NOME = 2.0
+PESO_PRODUTTORE = 1.0
+
+
+def parole(testo):
+    """'Visual Studio-Code!' → ['Visual', 'Studio', 'Code'] (lettere e cifre Unicode)."""
+    return re.findall(r'\w+', testo)
+
+
+def espressione_fts(testo):
+    """
+    Testo libero dell'utente → espressione MATCH di FTS5 sicura.
+
+        'photo adob'  → '"photo"* "adob"*'   (tutte le parole, come prefissi)
+
+    ⚠️ Mai passare il testo dell'utente così com'è: FTS5 ha una sua sintassi
+    (AND, OR, NOT, NEAR, *, ^, ":", parentesi) e "c++" o 'a"b' darebbero un
+    errore SQL. Ogni parola va tra virgolette: diventa testo, non sintassi.
+    Le parole di una sola lettera restano esatte (un prefisso di 1 lettera
+    corrisponderebbe a mezzo catalogo).
+    """
+    termini = []
+    for parola in parole(testo):
+        termini.append(f'"{parola}"*' if len(parola) > 1 else f'"{parola}"')
+    return ' '.join(termini)
+
+
+def ricerca_fts_disponibile(connessione):
+    return connessione.vendor == 'sqlite'
+
+
+def cerca_nel_catalogo(testo, colonne, limit):
+    """
+    Cerca nel catalogo e restituisce al massimo 'limit' righe (tuple con le
+    'colonne' richieste), dalla più pertinente.
+
+    SQLite: UNA query su FTS5, ordinata per bm25 (punteggio di pertinenza:
+    più è basso, più la riga è pertinente).
+    ⚠️ Il tempo dipende da QUANTE righe corrispondono (vanno tutte valutate
+    per ordinarle), non dalla dimensione della tabella: con 1 milione di righe
+    "photo" → ~15 ms, un prefisso che ne trova 100.000 ("ad") → ~250 ms.
+    Altri database: fallback con icontains su nome/produttore, ordinato per nome
+    (stessi risultati, senza punteggio e senza indice).
+    """
+    connessione = connections[router.db_for_read(Software)]
+    if not ricerca_fts_disponibile(connessione):
+        condizione = Q()
+        for parola in parole(testo):
+            condizione &= Q(nome__icontains=parola) | Q(produttore__icontains=parola)
+        return list(
+            Software.objects.using(connessione.alias).filter(condizione)
+            .order_by('nome', 'id').values_list(*colonne)[:limit]
+        )
+
+    quote = connessione.ops.quote_name
+    # s.id sempre presente: .raw() ha bisogno della primary key
+    elenco_colonne = ', '.join(
+        f's.{quote(Software._meta.get_field(colonna).column)}'
+        for colonna in ('id', *(c for c in colonne if c != 'id'))
+    )
+    # JOIN per rowid: FTS5 trova e ordina gli id, api_software fornisce le colonne
+    sql = f"""
+        SELECT {elenco_colonne}
+        FROM {TABELLA_FTS}
+        JOIN api_software AS s ON s.id = {TABELLA_FTS}.rowid
+        WHERE {TABELLA_FTS} MATCH %s
+        ORDER BY bm25({TABELLA_FTS}, %s, %s)
+        LIMIT %s
+    """
+    # .raw() e non cursor.execute(): Django converte i valori come per una
+    # query normale (prezzo → Decimal, data_rilascio → date, gratuito → bool)
+    risultati = Software.objects.db_manager(connessione.alias).raw(
+        sql, [espressione_fts(testo), PESO_NOME, PESO_PRODUTTORE, limit]
+    )
+    return [tuple(getattr(software, colonna) for colonna in colonne) for software in risultati]
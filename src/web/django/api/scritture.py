@@ -0,0 +1,91 @@
+from .models import Software
+from .modifiche import TABELLA_CONTATORE, feed_disponibile
+from .versioni import chiave_versione
+
+
+# --- SCRITTURE DI UNA RIGA IN UNA QUERY (RETURNING) ---
+#
+# PUT / PATCH / DELETE di UN software con l'ORM: SELECT dell'oggetto, poi
+# UPDATE / DELETE → 2 round trip. Con RETURNING (SQLite 3.35+, PostgreSQL) la
+# scrittura stessa restituisce la riga:
+#
+#   UPDATE api_software SET versione = %s, versione_ordinabile = %s WHERE id = %s
+#   RETURNING id, nome, versione, produttore, prezzo, gratuito, data_rilascio
+#
+# Nessuna riga restituita = id inesistente (404), senza SELECT prima.
+# I campi NON inviati (PATCH, o un campo facoltativo omesso in PUT) arrivano
+# dal database, non dai default del modello.
+#
+# Token del feed (api/modifiche.py) per gli eventi SSE, dalla stessa query:
+# RETURNING si calcola PRIMA dei trigger AFTER, quindi vede il contatore
+# PRIMA dell'incremento del trigger della riga → token = valore + 1 (una riga,
+# un incremento). Così api/signals.py non fa la SELECT del contatore.
+#
+# ⚠️ Niente save() / delete(): nessun pre_save / post_save / pre_delete /
+# post_delete. Il chiamante invia catalogo_modificato, e queste funzioni
+# vanno usate solo se nessun altro ascolta quei signal (api/signals.py).
+
+_CONTATORE_PRIMA = f'(SELECT COALESCE(MAX(valore), 0) FROM {TABELLA_CONTATORE})'
+
+
+def returning_disponibile(connessione):
+    """True se il database sa fare UPDATE / DELETE ... RETURNING."""
+    # Stessa versione minima di INSERT ... RETURNING (SQLite 3.35)
+    return connessione.features.can_return_columns_from_insert
+
+
+def _esegui(connessione, sql, parametri, campi):
+    """
+    Esegue sql + RETURNING dei 'campi' (e del contatore, se c'è il feed).
+    Restituisce ({campo: valore Python}, token) oppure (None, None) se nessuna riga.
+    """
+    con_token = feed_disponibile(connessione)
+    colonne = [connessione.ops.quote_name(Software._meta.get_field(nome).column) for nome in campi]
+    if con_token:
+        colonne.append(_CONTATORE_PRIMA)
+    with connessione.cursor() as cursore:
+        cursore.execute(f'{sql} RETURNING {", ".join(colonne)}', parametri)
+        riga = cursore.fetchone()
+    if riga is None:
+        return None, None
+    # Valori grezzi del database (SQLite: prezzo float, data testo, 0/1):
+    # to_python() li converte come un form Django
+    valori = {nome: Software._meta.get_field(nome).to_python(valore) for nome, valore in zip(campi, riga)}
+    return valori, (riga[-1] + 1 if con_token else None)
+
+
+def aggiorna_riga(connessione, software_id, valori, campi):
+    """
+    UPDATE di UNA riga con valori già validati ({campo: valore}).
+
+    Restituisce (la riga DOPO l'UPDATE, solo i 'campi', token del feed)
+    oppure (None, None) se l'id non esiste.
+    """
+    if 'versione' in valori:
+        # Come SoftwareQuerySet.update() (api/models.py)
+        valori = {**valori, 'versione_ordinabile': chiave_versione(valori['versione'])}
+    modificati = [Software._meta.get_field(nome) for nome in valori]
+    tabella = connessione.ops.quote_name(Software._meta.db_table)
+    assegnazioni = ', '.join(f'{connessione.ops.quote_name(campo.column)} = %s' for campo in modificati)
+    parametri = [campo.get_db_prep_save(valori[campo.name], connessione) for campo in modificati]
+    return _esegui(
+        connessione, f'UPDATE {tabella} SET {assegnazioni} WHERE id = %s', [*parametri, software_id], campi
+    )
+
+
+def elimina_riga(connessione, software_id, campi):
+    """DELETE di UNA riga: (i 'campi' della riga eliminata, token) oppure (None, None)."""
+    tabella = connessione.ops.quote_name(Software._meta.db_table)
+    return _esegui(connessione, f'DELETE FROM {tabella} WHERE id = %s', [software_id], campi)
+
+
+def elimina_righe(connessione, ids):
+    """
+    DELETE FROM api_software WHERE id IN (...) diretta (cancellazioni di massa).
+    Restituisce il numero di righe eliminate: gli id inesistenti non contano.
+    """
+    tabella = connessione.ops.quote_name(Software._meta.db_table)
+    segnaposto = ', '.join(['%s'] * len(ids))
+    with connessione.cursor() as cursore:
+        cursore.execute(f'DELETE FROM {tabella} WHERE id IN ({segnaposto})', list(ids))
+        return cursore.rowcount
@@ -0,0 +1,179 @@
+import decimal
+
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.settings import ISO_8601, api_settings
+
+from .conf import impostazione
+
+
+# --- SERIALIZZAZIONE VELOCE (SOLO LETTURA) ---
+#
+# ModelSerializer, per OGNI riga di una lista:
+#   1. Django crea un oggetto Software (model instance)
+#   2. per ogni campo: get_attribute() → to_representation() → dizionario
+#   ⚠️ Con migliaia di righe questo lavoro domina il tempo di CPU della view!
+#
+# PianoSerializzazione fa lo stesso lavoro "a monte", UNA volta sola:
+#   - legge i campi del serializer (stesso ordine, stessi nomi)
+#   - sceglie per ogni campo un "codificatore" (es. Decimal → '239.88')
+#   - le righe arrivano da .values_list() come tuple: niente model instance
+#
+# ⚠️ L'output è IDENTICO a quello del serializer (stessi dizionari, stessi byte
+# JSON). Per tornare al percorso DRF classico: API_CATALOGO['SERIALIZZATORE_VELOCE'] = False
+
+
+def _codificatore_decimal(campo):
+    """Replica DecimalField.to_representation() con quantize precalcolato."""
+    esponente = decimal.Decimal('.1') ** campo.decimal_places
+    contesto = decimal.getcontext().copy()
+    if campo.max_digits is not None:
+        contesto.prec = campo.max_digits
+    arrotondamento = campo.rounding
+
+    if not getattr(campo, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING):
+        return lambda valore: valore.quantize(esponente, rounding=arrotondamento, context=contesto)
+    return lambda valore: '{:f}'.format(valore.quantize(esponente, rounding=arrotondamento, context=contesto))
+
+
+def _codificatore(campo):
+    """
+    Sceglie il codificatore di un campo del serializer.
+
+    Restituisce None quando il valore letto dal database è già quello giusto
+    (int, str, bool): zero lavoro per quei campi.
+    """
+    if isinstance(campo, (serializers.IntegerField, serializers.CharField, serializers.BooleanField)):
+        return None
+
+    if isinstance(campo, serializers.DecimalField) and not campo.localize:
+        return _codificatore_decimal(campo)
+
+    if isinstance(campo, serializers.DateField):
+        formato = getattr(campo, 'format', api_settings.DATE_FORMAT)
+        if formato is not None and formato.lower() == ISO_8601:
+            return lambda valore: valore.isoformat()
+
+    # Tipo non previsto: si usa il metodo del serializer (corretto, solo più lento)
+    return campo.to_representation
+
+
+class PianoSerializzazione:
+    """
+    "Piano" precompilato per serializzare righe di .values_list().
+
+    Esempio:
+        piano = PianoSerializzazione(SoftwareSerializer)
+        righe = piano.queryset(Software.objects.all())   # tuple, non oggetti
+        dati = piano.serializza(righe)                   # lista di dizionari
+
+        # Solo alcuni campi (?fields=id,nome): SELECT id, nome FROM ...
+        piano.per_campi(('id', 'nome')).serializza(...)
+    """
+
+    def __init__(self, serializer_class, solo_campi=None):
+        self.serializer_class = serializer_class
+        self.solo_campi = solo_campi
+        self._piano = None
+        self._sottopiani = {}
+
+    def _compila(self):
+        # ⚠️ Compilato al PRIMO uso (non all'import): i campi di un
+        # ModelSerializer richiedono che i modelli siano già caricati
+        campi = [
+            (nome, campo)
+            for nome, campo in self.serializer_class().fields.items()
+            if not campo.write_only and (self.solo_campi is None or nome in self.solo_campi)
+        ]
+        self._piano = (
+            tuple(campo.source for _, campo in campi),                 # colonne del DB
+            [(nome, _codificatore(campo)) for nome, campo in campi],  # chiavi JSON
+        )
+        return self._piano
+
+    @property
+    def campi(self):
+        """Colonne da leggere con values_list(), nell'ordine del serializer."""
+        return (self._piano or self._compila())[0]
+
+    @property
+    def nomi(self):
+        """Chiavi prodotte nel JSON, nell'ordine del serializer."""
+        return tuple(nome for nome, _ in (self._piano or self._compila())[1])
+
+    def per_campi(self, campi):
+        """
+        Piano ridotto ai soli 'campi' (None = tutti), compilato una volta e riusato.
+
+        ⚠️ L'ordine delle chiavi resta quello del serializer, non quello di ?fields=
+        """
+        if campi is None:
+            return self
+        chiave = frozenset(campi)
+        if chiave not in self._sottopiani:
+            self._sottopiani[chiave] = PianoSerializzazione(self.serializer_class, chiave)
+        return self._sottopiani[chiave]
+
+    def queryset(self, queryset, named=False, extra=()):
+        """
+        queryset → queryset di tuple con le sole colonne del piano.
+
+        extra: colonne aggiuntive messe IN FONDO alla tupla (es. quelle che
+        servono alla paginazione); riga() le ignora, quindi non finiscono nel JSON.
+        """
+        colonne = self.campi
+        return queryset.values_list(*colonne, *(c for c in extra if c not in colonne), named=named)
+
+    def riga(self, riga):
+        """Una tupla → dizionario (stesse chiavi e valori del serializer)."""
+        _, campi = self._piano or self._compila()
+        return {
+            nome: valore if codifica is None or valore is None else codifica(valore)
+            for (nome, codifica), valore in zip(campi, riga)
+        }
+
+    def serializza(self, righe):
+        """Iterabile di tuple → lista di dizionari (equivale a Serializer(many=True).data)."""
+        riga = self.riga
+        return [riga(r) for r in righe]
+
+
+def leggi_campi(request, disponibili):
+    """
+    Legge ?fields= e ?exclude= (sparse fieldset) e restituisce i campi da
+    includere, oppure None se il client vuole tutti i campi.
+
+    Esempi:
+        ?fields=id,nome,versione  → ['id', 'nome', 'versione']
+        ?exclude=prezzo           → tutti i campi tranne prezzo
+
+    ⚠️ I nomi vengono validati: un campo sconosciuto è un errore 400,
+    non un campo ignorato in silenzio.
+    """
+    def elenco(parametro):
+        # request.GET (non query_params): funziona anche con l'HttpRequest
+        # di Django delle view async (api/views_async.py)
+        valore = request.GET.get(parametro)
+        if valore is None:
+            return None
+        nomi = [nome.strip() for nome in valore.split(',') if nome.strip()]
+        sconosciuti = [nome for nome in nomi if nome not in disponibili]
+        if sconosciuti:
+            raise ValidationError({parametro: [f'Campi non validi: {", ".join(sconosciuti)}.']})
+        return nomi
+
+    inclusi = elenco('fields')
+    esclusi = elenco('exclude')
+    if inclusi is None and esclusi is None:
+        return None
+
+    campi = [nome for nome in disponibili if (inclusi is None or nome in inclusi)
+             and (esclusi is None or nome not in esclusi)]
+    if not campi:
+        raise ValidationError({'fields': ['Nessun campo selezionato.']})
+    return campi
+
+
+def usa_serializzatore_veloce():
+    """Interruttore globale: API_CATALOGO['SERIALIZZATORE_VELOCE']."""
+    return impostazione('SERIALIZZATORE_VELOCE')
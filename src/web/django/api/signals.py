@@ -0,0 +1,124 @@
+from django.db import connections, router, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from .cache import incrementa_generazione, invalida_dettagli
+from .conf import impostazione
+from .eventi import hub_eventi
+from .models import Software
+from .modifiche import token_corrente
+from .suggerimenti import indice_suggerimenti
+
+
+# --- SIGNALS DEL CATALOGO ---
+#
+# Signal = "evento" di Django: chi modifica i dati lo invia, chi è interessato
+# (cache, indici, ...) lo riceve, senza che i due si conoscano.
+#
+# ⚠️ post_save / post_delete scattano SOLO con obj.save() e obj.delete()
+# (view CRUD, admin, shell). Le operazioni di massa (bulk_create, update(),
+# delete() su queryset) NON li inviano: chi le usa deve inviare a mano
+# catalogo_modificato.
+#
+# Questo file viene importato in ApiConfig.ready() (api/apps.py).
+
+# Inviato dopo OGNI modifica al catalogo.
+# Argomenti: sender=Software, azione='create' | 'update' | 'delete',
+#            ids=lista degli id modificati (None = non noti, "tutto può essere cambiato")
+#            token=token del feed dopo la modifica, se chi scrive lo conosce già
+#                  (facoltativo: RETURNING, vedi api/scritture.py)
+catalogo_modificato = Signal()
+
+
+@receiver(post_save, sender=Software, dispatch_uid='api.catalogo.post_save')
+def _software_salvato(sender, instance, created, **kwargs):
+    catalogo_modificato.send(
+        sender=Software, azione='create' if created else 'update', ids=[instance.pk]
+    )
+
+
+@receiver(post_delete, sender=Software, dispatch_uid='api.catalogo.post_delete')
+def _software_eliminato(sender, instance, **kwargs):
+    catalogo_modificato.send(sender=Software, azione='delete', ids=[instance.pk])
+
+
+# ⚠️ Tutti i receiver qui sotto lavorano DOPO il commit (transaction.on_commit;
+# fuori da una transazione esegue subito). Prima del commit chi legge vede
+# ancora le righe vecchie: se la generazione fosse già nuova, una lettura in
+# quel momento salverebbe in cache i dati vecchi sotto la generazione nuova,
+# e ci resterebbero fino alla scrittura successiva (admin, ATOMIC_REQUESTS,
+# endpoint bulk: la transazione può durare a lungo).
+#
+# ⚠️ L'ordine conta: on_commit esegue nell'ordine di registrazione, quindi
+# prima la generazione nuova, poi i dettagli (salva_dettaglio() di una
+# lettura iniziata prima vede la generazione cambiata e non salva).
+
+@receiver(catalogo_modificato, dispatch_uid='api.catalogo.generazione')
+def _nuova_generazione(sender, **kwargs):
+    # Le risposte in cache della generazione precedente diventano irraggiungibili
+    transaction.on_commit(incrementa_generazione)
+
+
+@receiver(catalogo_modificato, dispatch_uid='api.catalogo.dettagli')
+def _invalida_dettagli(sender, ids=None, **kwargs):
+    # Anche per 'create': l'id nuovo potrebbe essere in cache come "non esiste"
+    transaction.on_commit(lambda: invalida_dettagli(ids))
+
+
+@receiver(catalogo_modificato, dispatch_uid='api.catalogo.suggerimenti')
+def _aggiorna_suggerimenti(sender, ids=None, **kwargs):
+    # Solo un segno "da rileggere": la query la fa la prossima richiesta di
+    # suggerimenti, non la scrittura. Prima del commit la richiesta
+    # rileggerebbe le righe vecchie e toglierebbe il segno
+    transaction.on_commit(lambda: indice_suggerimenti().segna_modificati(ids))
+
+
+@receiver(catalogo_modificato, dispatch_uid='api.catalogo.eventi')
+def _pubblica_evento(sender, azione=None, ids=None, token=None, **kwargs):
+    # Ai client SSE (api/eventi.py) solo DOPO il commit: una modifica poi
+    # annullata (rollback) non deve arrivare a nessuno.
+    hub = hub_eventi()
+    evento = {'azione': azione, 'ids': ids}
+    if token is None and hub.numero_iscritti():
+        # Token del feed (api/modifiche.py) per riprendere dopo una
+        # disconnessione: letto ORA, dentro la transazione della scrittura,
+        # quando SQLite (un solo scrittore) non può aver confermato modifiche
+        # d'altri dopo questa. Una SELECT in più, solo con client connessi e
+        # solo se la scrittura non l'ha già restituito (api/scritture.py)
+        token = token_corrente(connections[router.db_for_write(Software)])
+    if token is not None:
+        evento['token'] = token
+    transaction.on_commit(lambda: hub.pubblica(evento))
+
+
+# --- CANCELLAZIONI E AGGIORNAMENTI VELOCI ---
+#
+# queryset.delete() carica OGNI riga come oggetto Software se qualcuno ascolta
+# pre_delete / post_delete (deve passargli l'oggetto). Il nostro receiver
+# qui sopra ascolta SEMPRE, quindi Django non farebbe mai la DELETE diretta.
+# Le cancellazioni di massa possono saltarlo (e inviare a mano
+# catalogo_modificato) solo se NESSUN ALTRO ascolta.
+# Lo stesso per gli UPDATE diretti al posto di obj.save() (PUT, vedi api/views.py)
+# con pre_save / post_save.
+#
+# "Nessun altro ascolta" lo dichiara il progetto, con l'impostazione
+# SEGNALI_ESTERNI (api/conf.py): Django non ha un'API pubblica per elencare
+# i receiver di un signal. ⚠️ Chi aggiunge un receiver su Software in
+# un'altra app deve mettere SEGNALI_ESTERNI = True, altrimenti le scritture
+# veloci lo saltano.
+
+
+def cancellazione_veloce_possibile():
+    """
+    True se una DELETE diretta su Software non salta nessun receiver esterno
+    (pre_delete / post_delete) né cancellazioni a cascata (ForeignKey verso Software).
+    """
+    # get_fields(): relazioni inverse comprese (le ForeignKey di altri modelli)
+    if any(campo.auto_created and not campo.concrete for campo in Software._meta.get_fields()):
+        return False
+    return not impostazione('SEGNALI_ESTERNI')
+
+
+def aggiornamento_veloce_possibile():
+    """True se un UPDATE diretto su Software non salta nessun receiver esterno (pre_save / post_save)."""
+    return not impostazione('SEGNALI_ESTERNI')
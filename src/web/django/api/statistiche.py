@@ -0,0 +1,174 @@
+from decimal import Decimal
+
+from django.db import connections, router, transaction
+from django.db.models import Count, F, IntegerField, Max, Min, Sum
+from django.db.models.functions import Cast, Round
+
+from .models import Software, StatisticaProduttore
+
+
+# --- STATISTICHE PER PRODUTTORE (tabella riassuntiva) ---
+#
+# "Quanti software e che prezzo medio per produttore?" con una GROUP BY su
+# api_software = leggere TUTTE le righe a ogni richiesta.
+#
+# Qui la risposta è già pronta in una tabella piccola (una riga per coppia
+# produttore/gratuito, modello StatisticaProduttore) che il DATABASE tiene
+# aggiornata con dei trigger a ogni INSERT / UPDATE / DELETE su api_software:
+#
+#   INSERT → numero + 1, somma + prezzo, min/max confrontati col nuovo prezzo
+#   DELETE → numero - 1, somma - prezzo; min/max ricalcolati SOLO se la riga
+#            eliminata era il minimo o il massimo (un seek sull'indice
+#            software_produttore_prezzo_idx)
+#   UPDATE → come DELETE della riga vecchia + INSERT della nuova
+#
+# GET /api/software/stats/ costa quindi O(produttori), non O(righe).
+#
+# ⚠️ Trigger e non signals di Django: restano giusti anche con bulk_create(),
+# update(), le DELETE dirette (api/views.py, sezione BULK) e chi scrive sul
+# database fuori da Django. Solo SQLite (migrazione 0005): sugli altri
+# database la view usa la GROUP BY classica.
+#
+# ⚠️ Come per api/ricerca.py: i trigger esistono SOLO come SQL della
+# migrazione 0005, e le migrazioni che ricostruiscono la tabella api_software
+# su SQLite li eliminano e li ricreano con quell'SQL (vedi 0007). Qui restano
+# solo il ricalcolo completo e le letture.
+
+TABELLA_STATISTICHE = 'api_statisticaproduttore'
+
+
+def _centesimi(riga):
+    """Alias della tabella → prezzo della riga in centesimi interi (SQL)."""
+    return f'CAST(ROUND({riga}.prezzo * 100) AS INTEGER)'
+
+
+# Le stesse righe calcolate leggendo tutta api_software (GROUP BY)
+SQL_CALCOLA = f"""
+    SELECT produttore, gratuito, COUNT(*),
+           SUM({_centesimi('s')}), MIN({_centesimi('s')}), MAX({_centesimi('s')})
+    FROM api_software AS s
+    GROUP BY produttore, gratuito
+"""
+
+# Ricalcola tutto da api_software (prima volta, o dopo un problema)
+SQL_RICOSTRUISCI = [
+    f'DELETE FROM {TABELLA_STATISTICHE}',
+    f"""
+    INSERT INTO {TABELLA_STATISTICHE}
+        (produttore, gratuito, numero, somma_centesimi, min_centesimi, max_centesimi)
+    {SQL_CALCOLA}
+    """,
+]
+
+COLONNE = ('produttore', 'gratuito', 'numero', 'somma_centesimi', 'min_centesimi', 'max_centesimi')
+
+# Filtri di api/filtri.py applicabili alla tabella riassuntiva (prezzi e date
+# delle singole righe non ci sono più: prezzo_min & co. non hanno senso)
+FILTRI_STATISTICHE = ('gratuito', 'produttore', 'produttore__in')
+
+
+def statistiche_mantenute(connessione):
+    return connessione.vendor == 'sqlite'
+
+
+def righe_statistiche(condizione, alias=None):
+    """
+    Tuple (produttore, gratuito, numero, somma, min, max) ordinate per
+    produttore, con i prezzi in centesimi. UNA query.
+
+    condizione: Q dei filtri (api/filtri.py). Vale sia per la tabella
+    riassuntiva sia per api_software: i campi hanno gli stessi nomi.
+    """
+    connessione = connections[alias or router.db_for_read(Software)]
+    if statistiche_mantenute(connessione):
+        queryset = StatisticaProduttore.objects.using(connessione.alias).filter(condizione)
+        return list(queryset.order_by('produttore', 'gratuito').values_list(*COLONNE))
+
+    # Altri database: GROUP BY su tutto il catalogo (stesso risultato, O(righe))
+    centesimi = Cast(Round(F('prezzo') * 100), IntegerField())
+    queryset = (
+        Software.objects.using(connessione.alias).filter(condizione)
+        .values('produttore', 'gratuito')
+        .annotate(
+            numero=Count('id'), somma_centesimi=Sum(centesimi),
+            min_centesimi=Min(centesimi), max_centesimi=Max(centesimi),
+        )
+        .order_by('produttore', 'gratuito')
+    )
+    return list(queryset.values_list(*COLONNE))
+
+
+def _euro(centesimi):
+    """23988 → '239.88' (stringa, come i prezzi di SoftwareSerializer)."""
+    return str(Decimal(centesimi).scaleb(-2))
+
+
+def _riassunto(numero, gratuiti, somma, minimo, massimo):
+    return {
+        'numero': numero,
+        'gratuiti': gratuiti,
+        'prezzo_totale': _euro(somma),
+        'prezzo_medio': str((Decimal(somma) / numero / 100).quantize(Decimal('0.01'))),
+        'prezzo_min': _euro(minimo),
+        'prezzo_max': _euro(massimo),
+    }
+
+
+def statistiche_catalogo(righe):
+    """
+    Righe per (produttore, gratuito) → risposta per produttore + totale.
+
+    Esempio:
+        {'totale': {'numero': 3, 'gratuiti': 1, 'prezzo_medio': '83.29', ...},
+         'produttori': [{'produttore': 'Adobe', 'numero': 2, ...}, ...]}
+    """
+    produttori = {}
+    for produttore, gratuito, numero, somma, minimo, massimo in righe:
+        voce = produttori.get(produttore)
+        if voce is None:
+            produttori[produttore] = [numero, numero if gratuito else 0, somma, minimo, massimo]
+            continue
+        voce[0] += numero
+        voce[1] += numero if gratuito else 0
+        voce[2] += somma
+        voce[3] = min(voce[3], minimo)
+        voce[4] = max(voce[4], massimo)
+
+    if not produttori:
+        return {'totale': None, 'produttori': []}
+
+    valori = list(produttori.values())
+    totale = _riassunto(
+        sum(v[0] for v in valori), sum(v[1] for v in valori), sum(v[2] for v in valori),
+        min(v[3] for v in valori), max(v[4] for v in valori),
+    )
+    return {
+        'totale': totale,
+        'produttori': [
+            {'produttore': produttore, **_riassunto(*voce)}
+            for produttore, voce in produttori.items()
+        ],
+    }
+
+
+def ricostruisci_statistiche(alias=None):
+    """Ricalcola la tabella riassuntiva da zero. Restituisce il numero di righe."""
+    connessione = connections[alias or router.db_for_write(StatisticaProduttore)]
+    # atomic: chi legge nel frattempo vede la tabella vecchia, mai quella vuota
+    with transaction.atomic(using=connessione.alias), connessione.cursor() as cursor:
+        for sql in SQL_RICOSTRUISCI:
+            cursor.execute(sql)
+    return StatisticaProduttore.objects.using(connessione.alias).count()
+
+
+def differenze_statistiche(alias=None):
+    """
+    Righe della tabella riassuntiva diverse da quelle calcolate con la
+    GROUP BY (set vuoto = tabella corretta). Non modifica niente.
+    """
+    connessione = connections[alias or router.db_for_read(StatisticaProduttore)]
+    with connessione.cursor() as cursor:
+        cursor.execute(SQL_CALCOLA)
+        attese = {(produttore, bool(gratuito), *valori) for produttore, gratuito, *valori in cursor.fetchall()}
+    attuali = set(StatisticaProduttore.objects.using(connessione.alias).values_list(*COLONNE))
+    return attuali ^ attese
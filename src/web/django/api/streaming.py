@@ -0,0 +1,153 @@
+import itertools
+
+from django.http import StreamingHttpResponse
+from rest_framework import renderers
+from rest_framework.settings import api_settings
+from rest_framework.utils import encoders
+
+from .conf import impostazione
+
+
+# --- RISPOSTE IN STREAMING ---
+#
+# Risposta normale (Response di DRF):
+#   1. legge TUTTE le righe dal database
+#   2. costruisce UNA lista Python con tutti i dizionari
+#   3. la converte in UNA stringa JSON e solo alla fine la invia
+#   ⚠️ Memoria e tempo al primo byte crescono con la dimensione della tabella!
+#
+# Risposta in streaming (StreamingHttpResponse di Django):
+#   legge le righe a blocchi (iterator) e invia ogni blocco appena è pronto
+#   ✅ In memoria c'è sempre e solo UN blocco, qualunque sia la dimensione del catalogo
+#
+# Formati disponibili:
+#   Accept: application/x-ndjson → NDJSON: un oggetto JSON per riga
+#   ?stream=1                    → JSON normale, ma generato pezzo per pezzo
+
+# Encoder identico a quello di JSONRenderer (stessi byte di una Response normale)
+_encoder = encoders.JSONEncoder(
+    ensure_ascii=not api_settings.UNICODE_JSON,
+    allow_nan=not api_settings.STRICT_JSON,
+    separators=(',', ':') if api_settings.COMPACT_JSON else (', ', ': '),
+)
+
+
+class NDJSONRenderer(renderers.BaseRenderer):
+    """
+    Renderer per 'application/x-ndjson' (Newline Delimited JSON).
+
+    ⚠️ Va registrato sulle view (@renderer_classes): senza, DRF risponde
+    406 Not Acceptable a chi manda "Accept: application/x-ndjson".
+    Le liste vengono invece inviate in streaming (vedi risposta_streaming);
+    questo renderer serve solo per le risposte "normali" (es. errori 404).
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return (_encoder.encode(data) + '\n').encode(self.charset)
+
+
+# Renderer di default + NDJSON, da usare con @renderer_classes(RENDERER_CATALOGO)
+RENDERER_CATALOGO = [*api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer]
+
+
+def modalita_streaming(request):
+    """
+    Restituisce 'ndjson', 'json' oppure None (nessuno streaming).
+
+    - 'ndjson': il client ha chiesto application/x-ndjson (Accept o ?format=ndjson)
+    - 'json':   il client ha chiesto ?stream=1
+    """
+    if getattr(request, 'accepted_renderer', None) and request.accepted_renderer.format == 'ndjson':
+        return 'ndjson'
+    if request.query_params.get('stream') in ('1', 'true'):
+        return 'json'
+    return None
+
+
+def _blocchi(iterabile, dimensione):
+    """Divide un iterabile in liste di 'dimensione' elementi (l'ultima può essere più corta)."""
+    iteratore = iter(iterabile)
+    while blocco := list(itertools.islice(iteratore, dimensione)):
+        yield blocco
+
+
+def _genera_ndjson(righe, serializza):
+    for blocco in _blocchi(righe, impostazione('STREAMING_CHUNK')):
+        yield ''.join(_encoder.encode(serializza(riga)) + '\n' for riga in blocco)
+
+
+def _genera_json(righe, serializza, intestazione):
+    """
+    Genera un JSON valido un pezzo alla volta.
+
+    intestazione=None → array:   [{...},{...}]
+    intestazione={'produttore': 'Adobe'} →
+        {"produttore":"Adobe","software":[{...},{...}],"count":2}
+
+    ⚠️ "count" sta in FONDO: si conosce solo dopo aver inviato tutte le righe
+    (in JSON l'ordine delle chiavi non conta).
+    """
+    if intestazione is None:
+        yield '['
+    else:
+        yield _encoder.encode(intestazione)[:-1] + (',' if intestazione else '') + '"software":['
+
+    conteggio = 0
+    for blocco in _blocchi(righe, impostazione('STREAMING_CHUNK')):
+        separatore = ',' if conteggio else ''
+        yield separatore + ','.join(_encoder.encode(serializza(riga)) for riga in blocco)
+        conteggio += len(blocco)
+
+    yield ']' if intestazione is None else f'],"count":{conteggio}}}'
+
+
+def righe_queryset(queryset):
+    """
+    Itera il queryset a blocchi di STREAMING_CHUNK righe.
+
+    .iterator(): Django NON mette in cache i risultati del queryset
+    (con .all() normale tutte le righe restano in memoria fino alla fine).
+    """
+    return queryset.iterator(chunk_size=impostazione('STREAMING_CHUNK'))
+
+
+def prima_riga(righe):
+    """
+    Legge la prima riga in anticipo (es. per rispondere 404 se non ce ne sono).
+
+    Restituisce (prima, righe) dove 'righe' contiene ancora TUTTE le righe,
+    oppure (None, None) se l'iteratore è vuoto. Nessuna query in più.
+    """
+    prima = next(righe, None)
+    if prima is None:
+        return None, None
+    return prima, itertools.chain([prima], righe)
+
+
+def risposta_streaming(modalita, righe, serializza, intestazione=None):
+    """
+    Crea la StreamingHttpResponse.
+
+    Args:
+        modalita: 'ndjson' o 'json' (vedi modalita_streaming)
+        righe: iteratore di oggetti (es. righe_queryset(queryset))
+        serializza: funzione oggetto → dizionario
+        intestazione: campi extra della risposta JSON (None = array semplice);
+            in NDJSON viene ignorata: ogni riga è un software
+    """
+    if modalita == 'ndjson':
+        contenuto = _genera_ndjson(righe, serializza)
+        content_type = 'application/x-ndjson; charset=utf-8'
+    else:
+        contenuto = _genera_json(righe, serializza, intestazione)
+        content_type = 'application/json'
+
+    risposta = StreamingHttpResponse(contenuto, content_type=content_type)
+    # Niente buffering nei proxy (es. nginx): i blocchi devono arrivare subito
+    risposta['X-Accel-Buffering'] = 'no'
+    return risposta
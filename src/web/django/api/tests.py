@@ -1,3 +1,1429 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import io
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import date
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.core.signals import request_finished, request_started
+from django.db import DatabaseError, close_old_connections, connections, router
+from django.db.models.signals import post_delete, pre_save
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from .asgi import PERCORSO_EVENTI, ASGIHandlerCatalogo, applicazione_eventi
+from .budget import BudgetQuerySuperato, budget_query
+from .cache import (
+    CacheLRU, cache_dettagli, cache_faccette, cache_risposte, generazione_catalogo, incrementa_generazione,
+    verifica_cache_condivisa,
+)
+from .connessioni import pragma_profilo
+from .esportazione import leggi_colonne
+from .eventi import SCOLLEGATO, HubEventi, hub_eventi
+from .models import Software
+from .modifiche import token_corrente
+from .paginazione import codifica_cursore
+from .repliche import (
+    COOKIE_SCRITTURA, RouterLetturaScrittura, copia_sqlite, lettura_da_replica, versione_lettura,
+)
+from .signals import catalogo_modificato
+from .statistiche import differenze_statistiche
+from .suggerimenti import IndiceSuggerimenti, indice_suggerimenti
+from .versioni import chiave_versione
+
+
+# --- PAGINAZIONE A CURSORE (api/paginazione.py) ---
+
+class PaginazioneTest(TestCase):
+
+    def setUp(self):
+        cache_risposte().svuota()
+        # Due software con la stessa data: l'id fa da spareggio
+        for nome, giorno in [('A', 1), ('B', 2), ('C', 2), ('D', 3), ('E', 4)]:
+            Software.objects.create(
+                nome=nome, versione='1.0', produttore='Adobe', prezzo='0.00',
+                gratuito=True, data_rilascio=date(2024, 1, giorno),
+            )
+
+    def pagina(self, url):
+        risposta = self.client.get(url)
+        self.assertEqual(risposta.status_code, 200)
+        dati = risposta.json()
+        return [s['nome'] for s in dati['software']], dati
+
+    def test_avanti_e_indietro(self):
+        nomi, dati = self.pagina('/api/software/?limit=2&ordering=-data_rilascio')
+        self.assertEqual(nomi, ['E', 'D'])
+        self.assertIsNone(dati['prev'])
+        tutte = nomi
+        while dati['next']:
+            nomi, dati = self.pagina(dati['next'])
+            tutte += nomi
+        self.assertEqual(tutte, ['E', 'D', 'C', 'B', 'A'])
+        # Dall'ultima pagina si torna indietro seguendo "prev"
+        nomi, dati = self.pagina(dati['prev'])
+        self.assertEqual(nomi, ['C', 'B'])
+        self.assertIsNotNone(dati['next'])
+
+    def test_cursore_manomesso(self):
+        _, dati = self.pagina('/api/software/?limit=2')
+        cursore = dati['next'].split('cursor=')[1]
+        for token in (cursore[:-3], 'non-base64!', codifica_cursore('nome', ['A']),
+                      codifica_cursore('data_rilascio', ['ieri', 1]), codifica_cursore('id', [1, 2]),
+                      codifica_cursore('id', [None]), codifica_cursore('prezzo', [None, 1])):
+            with self.subTest(token=token):
+                risposta = self.client.get('/api/software/', {'cursor': token})
+                self.assertEqual(risposta.status_code, 400)
+                self.assertIn('cursor', risposta.json())
+        self.assertEqual(self.client.get('/api/software/', {'limit': '0'}).status_code, 400)
+
+
+# --- RISPOSTE IN STREAMING (api/streaming.py) ---
+
+# Blocchi da 2 righe: con 5 software la risposta arriva in più pezzi
+@override_settings(API_CATALOGO={**getattr(settings, 'API_CATALOGO', {}), 'STREAMING_CHUNK': 2})
+class StreamingTest(TestCase):
+
+    def setUp(self):
+        cache_risposte().svuota()
+        for numero in range(5):
+            Software.objects.create(
+                nome=f'Software {numero}', versione='1.0', produttore='Adobe' if numero % 2 else 'GNOME',
+                prezzo='0.00' if numero % 2 else '9.99', gratuito=bool(numero % 2),
+                data_rilascio=date(2024, 1, numero + 1),
+            )
+
+    def contenuto(self, risposta):
+        self.assertEqual(risposta.status_code, 200)
+        self.assertTrue(risposta.streaming)
+        return b''.join(risposta.streaming_content).decode()
+
+    def test_ndjson(self):
+        risposta = self.client.get('/api/software/', HTTP_ACCEPT='application/x-ndjson')
+        self.assertEqual(risposta['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        righe = self.contenuto(risposta).splitlines()
+        self.assertEqual([json.loads(riga) for riga in righe], self.client.get('/api/software/').json())
+
+    def test_json_identico_alla_risposta_normale(self):
+        self.assertEqual(
+            json.loads(self.contenuto(self.client.get('/api/software/', {'stream': '1'}))),
+            self.client.get('/api/software/').json(),
+        )
+        # Con intestazione: "count" arriva in fondo, ma il JSON è lo stesso
+        dati = json.loads(self.contenuto(self.client.get('/api/software/produttore/adobe/', {'stream': '1'})))
+        self.assertEqual(dati, self.client.get('/api/software/produttore/adobe/').json())
+        self.assertEqual(dati['count'], 2)
+
+    def test_produttore_inesistente(self):
+        risposta = self.client.get('/api/software/produttore/nessuno/', HTTP_ACCEPT='application/x-ndjson')
+        self.assertEqual(risposta.status_code, 404)
+        self.assertFalse(risposta.streaming)
+
+
+# --- SERIALIZZAZIONE VELOCE (api/serializzazione.py) ---
+
+class SerializzazioneVeloceTest(TestCase):
+
+    def setUp(self):
+        cache_risposte().svuota()
+        cache_dettagli().svuota()
+        # Prezzi con e senza decimali: il Decimal va formattato come fa DRF
+        for nome, prezzo in [('Photoshop', Decimal('239.9')), ('GIMP', Decimal('0')), ('Office', Decimal('99.99'))]:
+            self.software = Software.objects.create(
+                nome=nome, versione='1.0', produttore='Adobe', prezzo=prezzo,
+                gratuito=not prezzo, data_rilascio=date(2024, 2, 29),
+            )
+
+    def test_stesso_json_del_serializer(self):
+        urls = [
+            '/api/software/', '/api/software/?limit=2', '/api/software/?fields=nome,prezzo',
+            '/api/software/gratuiti/', '/api/software/produttore/adobe/', f'/api/software/{self.software.id}/',
+        ]
+        for veloce in (True, False):
+            catalogo = {**getattr(settings, 'API_CATALOGO', {}), 'SERIALIZZATORE_VELOCE': veloce}
+            with override_settings(API_CATALOGO=catalogo):
+                cache_risposte().svuota()
+                cache_dettagli().svuota()
+                contenuti = [self.client.get(url).content for url in urls]
+            if veloce:
+                veloci = contenuti
+        for url, veloce, classico in zip(urls, veloci, contenuti):
+            with self.subTest(url=url):
+                self.assertEqual(veloce, classico)
+
+    def test_nessun_oggetto_software(self):
+        # Il percorso veloce legge tuple: Django non costruisce model instance
+        with mock.patch.object(Software, 'from_db', side_effect=AssertionError('oggetto creato')):
+            dati = self.client.get('/api/software/').json()
+        self.assertEqual([s['prezzo'] for s in dati], ['239.90', '0.00', '99.99'])
+
+
+# --- SPARSE FIELDSET (?fields= / ?exclude=) ---
+
+class CampiTest(TestCase):
+
+    def setUp(self):
+        cache_risposte().svuota()
+        for nome in ('Photoshop', 'Lightroom', 'Illustrator'):
+            Software.objects.create(
+                nome=nome, versione='1.0', produttore='Adobe', prezzo='9.99',
+                gratuito=False, data_rilascio=date(2024, 1, 1),
+            )
+
+    def test_solo_le_colonne_richieste(self):
+        with CaptureQueriesContext(connections['default']) as query:
+            dati = self.client.get('/api/software/', {'fields': 'nome,id'}).json()
+        # Chiavi nell'ordine del serializer, non in quello di ?fields=
+        self.assertEqual(list(dati[0]), ['id', 'nome'])
+        self.assertNotIn('"prezzo"', query[0]['sql'])
+
+        dati = self.client.get('/api/software/', {'exclude': 'prezzo,data_rilascio'}).json()
+        self.assertEqual(list(dati[0]), ['id', 'nome', 'versione', 'produttore', 'gratuito'])
+
+    def test_paginazione_senza_colonne_di_ordinamento(self):
+        # Il cursore ha bisogno di data_rilascio e id anche se non sono nel JSON
+        risposta = self.client.get('/api/software/', {'fields': 'nome', 'limit': 2, 'ordering': '-data_rilascio'})
+        dati = risposta.json()
+        self.assertEqual(dati['software'], [{'nome': 'Illustrator'}, {'nome': 'Lightroom'}])
+        self.assertEqual(self.client.get(dati['next']).json()['software'], [{'nome': 'Photoshop'}])
+
+    def test_campi_non_validi(self):
+        for parametri in ({'fields': 'nome,colore'}, {'exclude': 'sequenza'}, {'fields': 'nome', 'exclude': 'nome'}):
+            with self.subTest(parametri=parametri):
+                self.assertEqual(self.client.get('/api/software/', parametri).status_code, 400)
+
+
+# --- OPERAZIONI DI MASSA (/api/software/bulk/...) ---
+
+DATI_BULK = {
+    'nome': 'GIMP', 'versione': '2.10', 'produttore': 'GNOME',
+    'prezzo': '0.00', 'gratuito': True, 'data_rilascio': '2023-11-05',
+}
+
+
+@override_settings(API_CATALOGO={**getattr(settings, 'API_CATALOGO', {}), 'BULK_BATCH_SIZE': 2,
+                                 'BULK_MAX_ELEMENTI': 10})
+class BulkCreaTest(TestCase):
+
+    def crea(self, elementi, parziale=False):
+        url = '/api/software/bulk/?parziale=1' if parziale else '/api/software/bulk/'
+        return self.client.post(url, elementi, content_type='application/json')
+
+    def test_a_blocchi(self):
+        elementi = [{**DATI_BULK, 'nome': f'GIMP {numero}'} for numero in range(5)]
+        with CaptureQueriesContext(connections['default']) as query:
+            risposta = self.crea(elementi)
+        self.assertEqual(risposta.status_code, 201)
+        ids = [r['id'] for r in risposta.json()['risultati']]
+        self.assertEqual(list(Software.objects.filter(id__in=ids).values_list('nome', flat=True).order_by('id')),
+                         [e['nome'] for e in elementi])
+        # 5 righe a blocchi di 2 → 3 INSERT, non 5
+        self.assertEqual(sum(q['sql'].startswith('INSERT') for q in query), 3)
+
+    def test_tutto_o_niente(self):
+        elementi = [DATI_BULK, {**DATI_BULK, 'prezzo': 'gratis'}, {**DATI_BULK, 'nome': ''}]
+        risposta = self.crea(elementi)
+        self.assertEqual(risposta.status_code, 400)
+        dati = risposta.json()
+        self.assertEqual((dati['creati'], dati['errori']), (0, 2))
+        self.assertEqual(list(dati['risultati'][1]['errori']), ['prezzo'])
+        self.assertFalse(Software.objects.exists())
+
+        risposta = self.crea(elementi, parziale=True)
+        self.assertEqual(risposta.status_code, 207)
+        self.assertEqual(Software.objects.count(), 1)
+
+    def test_errore_a_meta_annulla_tutto(self):
+        inserimenti = []
+
+        def secondo_insert_fallisce(execute, sql, params, many, context):
+            if sql.startswith('INSERT'):
+                inserimenti.append(sql)
+                if len(inserimenti) == 2:
+                    raise DatabaseError('disco pieno')
+            return execute(sql, params, many, context)
+
+        with connections['default'].execute_wrapper(secondo_insert_fallisce):
+            with self.assertRaises(DatabaseError):
+                self.crea([DATI_BULK] * 4)
+        # Il primo blocco era già stato inserito: la transazione lo ha tolto
+        self.assertFalse(Software.objects.exists())
+
+    def test_body_non_valido(self):
+        for corpo in ([], {'nome': 'GIMP'}, [DATI_BULK] * 11):
+            with self.subTest(corpo=corpo):
+                self.assertEqual(self.crea(corpo).status_code, 400)
+
+
+class BulkAggiornaTest(TestCase):
+
+    def setUp(self):
+        cache_dettagli().svuota()
+        self.ids = [
+            Software.objects.create(**{**DATI_BULK, 'nome': nome, 'produttore': produttore}).id
+            for nome, produttore in [('Photoshop', 'Adobe'), ('Lightroom', 'Adobe'), ('GIMP', 'GNOME')]
+        ]
+
+    def aggiorna(self, corpo, parziale=False):
+        url = '/api/software/bulk/patch/?parziale=1' if parziale else '/api/software/bulk/patch/'
+        return self.client.patch(url, corpo, content_type='application/json')
+
+    def valori(self, campo):
+        return list(Software.objects.order_by('id').values_list(campo, flat=True))
+
+    def test_un_update_per_insieme_di_campi(self):
+        uno, due, tre = self.ids
+        with CaptureQueriesContext(connections['default']) as query:
+            risposta = self.aggiorna([
+                {'id': uno, 'changes': {'prezzo': '19.99'}},
+                {'id': due, 'changes': {'prezzo': '29.99'}},
+                {'id': tre, 'changes': {'versione': '3.0', 'gratuito': False}},
+            ])
+        self.assertEqual(risposta.status_code, 200)
+        self.assertEqual(risposta.json()['aggiornati'], 3)
+        self.assertEqual(self.valori('prezzo'), [Decimal('19.99'), Decimal('29.99'), Decimal('0.00')])
+        self.assertEqual(self.valori('versione'), ['2.10', '2.10', '3.0'])
+        self.assertEqual(sum(q['sql'].startswith('UPDATE') for q in query), 2)
+
+    def test_tutto_o_niente(self):
+        corpo = [
+            {'id': self.ids[0], 'changes': {'prezzo': '19.99'}},
+            {'id': 999999, 'changes': {'prezzo': '29.99'}},
+            {'id': self.ids[1], 'changes': {'id': 5}},
+        ]
+        risposta = self.aggiorna(corpo)
+        self.assertEqual(risposta.status_code, 400)
+        risultati = risposta.json()['risultati']
+        self.assertEqual([list(r.get('errori', {})) for r in risultati], [[], ['id'], ['changes']])
+        self.assertEqual(self.valori('prezzo'), [Decimal('0.00')] * 3)
+
+        self.assertEqual(self.aggiorna(corpo, parziale=True).status_code, 207)
+        self.assertEqual(self.valori('prezzo'), [Decimal('19.99'), Decimal('0.00'), Decimal('0.00')])
+
+    def test_con_filtro(self):
+        self.client.get(f'/api/software/{self.ids[0]}/')
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connections['default']) as query:
+            risposta = self.aggiorna({'filtro': {'produttore': 'adobe'}, 'changes': {'gratuito': False}})
+        self.assertEqual(risposta.json(), {'aggiornati': 2})
+        # UNA query, senza SELECT delle righe (SAVEPOINT: la transazione del test)
+        istruzioni = [q['sql'].split()[0] for q in query]
+        self.assertEqual([i for i in istruzioni if i not in ('SAVEPOINT', 'RELEASE')], ['UPDATE'])
+        self.assertEqual(self.valori('gratuito'), [False, False, True])
+        # ids=None nel signal: i dettagli in cache sono stati tutti invalidati
+        self.assertFalse(self.client.get(f'/api/software/{self.ids[0]}/').json()['gratuito'])
+
+        for corpo in ({'filtro': {}, 'changes': {'gratuito': True}},
+                      {'filtro': {'produttore': 'adobe'}, 'changes': {'colore': 'rosso'}}):
+            with self.subTest(corpo=corpo):
+                self.assertEqual(self.aggiorna(corpo).status_code, 400)
+
+
+class BulkEliminaTest(TestCase):
+
+    def setUp(self):
+        cache_dettagli().svuota()
+        self.ids = [
+            Software.objects.create(**{**DATI_BULK, 'nome': nome, 'produttore': produttore}).id
+            for nome, produttore in [('Photoshop', 'Adobe'), ('Lightroom', 'Adobe'), ('GIMP', 'GNOME')]
+        ]
+
+    def elimina(self, corpo):
+        return self.client.delete('/api/software/bulk/delete/', corpo, content_type='application/json')
+
+    def test_per_id_senza_leggere_le_righe(self):
+        self.client.get(f'/api/software/{self.ids[0]}/')
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connections['default']) as query:
+            risposta = self.elimina({'ids': [self.ids[0], self.ids[0], 999999]})
+        self.assertEqual(risposta.json(), {'eliminati': 1})
+        self.assertFalse(any(q['sql'].startswith('SELECT') for q in query))
+        self.assertEqual(self.client.get(f'/api/software/{self.ids[0]}/').status_code, 404)
+
+    def test_con_filtro(self):
+        self.client.get(f'/api/software/{self.ids[0]}/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.elimina({'filtro': {'produttore': 'ADOBE'}}).json(), {'eliminati': 2})
+        self.assertEqual(list(Software.objects.values_list('nome', flat=True)), ['GIMP'])
+        # Id letti prima della DELETE: il dettaglio in cache è invalidato
+        self.assertEqual(self.client.get(f'/api/software/{self.ids[0]}/').status_code, 404)
+
+    @override_settings(API_CATALOGO={**getattr(settings, 'API_CATALOGO', {}), 'SEGNALI_ESTERNI': True})
+    def test_receiver_esterno(self):
+        # Qualcun altro ascolta post_delete (SEGNALI_ESTERNI): niente DELETE
+        # diretta, il receiver riceve ogni riga
+        eliminati = []
+
+        def ricevi(sender, instance, **kwargs):
+            eliminati.append(instance.nome)
+
+        post_delete.connect(ricevi, sender=Software)
+        self.addCleanup(post_delete.disconnect, ricevi, sender=Software)
+        self.assertEqual(self.elimina({'filtro': {'produttore': 'adobe'}}).json(), {'eliminati': 2})
+        self.assertEqual(sorted(eliminati), ['Lightroom', 'Photoshop'])
+
+    def test_body_non_valido(self):
+        for corpo in ({}, {'ids': [1], 'filtro': {'gratuito': True}}, {'ids': []}, {'ids': ['1']},
+                      {'ids': [True]}, {'filtro': {}}, {'filtro': {'colore': 'rosso'}}):
+            with self.subTest(corpo=corpo):
+                self.assertEqual(self.elimina(corpo).status_code, 400)
+        self.assertEqual(Software.objects.count(), 3)
+
+
+# --- VIEW ASYNC E HANDLER ASGI (api/views_async.py, api/asgi.py) ---
+
+class AsyncTest(TestCase):
+
+    def setUp(self):
+        cache_risposte().svuota()
+        cache_dettagli().svuota()
+        self.software = Software.objects.create(
+            nome='Photoshop', versione='25.0', produttore='Adobe',
+            prezzo='239.88', gratuito=False, data_rilascio=date(2023, 10, 10),
+        )
+        Software.objects.create(
+            nome='GIMP', versione='2.10', produttore='GNOME',
+            prezzo='0.00', gratuito=True, data_rilascio=date(2023, 11, 5),
+        )
+
+    def asgi(self, percorso, query=''):
+        """GET attraverso ASGIHandlerCatalogo, come la servirebbe pww/asgi.py."""
+        # Come il test client: la connessione della transazione del test resta aperta
+        request_started.disconnect(close_old_connections)
+        request_finished.disconnect(close_old_connections)
+        self.addCleanup(request_started.connect, close_old_connections)
+        self.addCleanup(request_finished.connect, close_old_connections)
+        messaggi = []
+        richiesta = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+        async def receive():
+            if richiesta:
+                return richiesta.pop()
+            await asyncio.Event().wait()  # il client resta connesso
+
+        async def send(messaggio):
+            messaggi.append(messaggio)
+
+        scope = {
+            'type': 'http', 'method': 'GET', 'path': percorso, 'query_string': query.encode(),
+            'headers': [(b'host', b'testserver')], 'server': ('testserver', 80),
+        }
+        # async_to_sync: l'ORM async esegue le query in QUESTO thread (la transazione del test)
+        async_to_sync(ASGIHandlerCatalogo())(scope, receive, send)
+        intestazioni = {nome.decode(): valore.decode() for nome, valore in messaggi[0]['headers']}
+        return messaggi[0]['status'], intestazioni, b''.join(m.get('body', b'') for m in messaggi[1:])
+
+    def test_stessi_byte_delle_view_sincrone(self):
+        for percorso in ['software/', 'software/?fields=nome,prezzo', 'software/gratuiti/',
+                         'software/produttore/adobe/', 'software/produttore/nessuno/',
+                         f'software/{self.software.id}/', 'software/999999/', 'software/?fields=colore']:
+            with self.subTest(percorso=percorso):
+                sincrona = self.client.get(f'/api/{percorso}')
+                asincrona = self.client.get(f'/api/async/{percorso}')
+                self.assertEqual(asincrona.status_code, sincrona.status_code)
+                self.assertEqual(asincrona.content, sincrona.content)
+
+    def test_handler_con_middleware_solo_async(self):
+        codice, intestazioni, corpo = self.asgi('/api/async/software/gratuiti/', 'fields=nome')
+        self.assertEqual(codice, 200)
+        self.assertEqual(json.loads(corpo), {'count': 1, 'software': [{'nome': 'GIMP'}]})
+        # IntestazioniSicurezza sì, i MIDDLEWARE di settings.py no (niente sessioni né CSRF)
+        self.assertEqual(intestazioni['X-Frame-Options'], 'DENY')
+        self.assertEqual(intestazioni['X-Content-Type-Options'], 'nosniff')
+        self.assertNotIn('Vary', intestazioni)
+        # Stessa gestione degli errori di Django
+        self.assertEqual(self.asgi('/api/async/nessuna/')[0], 404)
+
+    def test_middleware_sincrono_rifiutato(self):
+        catalogo = {**getattr(settings, 'API_CATALOGO', {}),
+                    'ASYNC_MIDDLEWARE': ['django.middleware.common.CommonMiddleware']}
+        with override_settings(API_CATALOGO=catalogo), self.assertRaises(ImproperlyConfigured):
+            ASGIHandlerCatalogo()
+
+
+# --- INDICI (manage.py verifica_indici) ---
+
+class IndiciTest(TestCase):
+
+    def test_query_sui_loro_indici(self):
+        uscita = io.StringIO()
+        call_command('verifica_indici', stdout=uscita)
+        self.assertNotIn('❌', uscita.getvalue())
+
+    def test_indice_mancante(self):
+        # DROP INDEX dentro la transazione del test: il rollback finale lo ripristina
+        with connections['default'].cursor() as cursore:
+            cursore.execute('DROP INDEX software_produttore_lower_idx')
+        uscita = io.StringIO()
+        with self.assertRaisesMessage(CommandError, 'GET /api/software/produttore/<p>/'):
+            call_command('verifica_indici', stdout=uscita)
+        self.assertIn('❌ GET /api/software/produttore/<p>/', uscita.getvalue())
+
+
+# --- BUDGET DI QUERY (api/budget.py) ---
+#
+# python manage.py test api
+#
+# Con BUDGET_QUERY = 'errore' una view che supera il suo @budget_query solleva
+# BudgetQuerySuperato, e il test client la propaga: il test fallisce con
+# l'elenco delle query eseguite.
+
+CATALOGO_TEST = {**getattr(settings, 'API_CATALOGO', {}), 'BUDGET_QUERY': 'errore'}
+
+
+@override_settings(API_CATALOGO=CATALOGO_TEST)
+class BudgetQueryViewTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.software = Software.objects.create(
+            nome='Photoshop', versione='25.0', produttore='Adobe',
+            prezzo='239.88', gratuito=False, data_rilascio=date(2023, 10, 10),
+        )
+        Software.objects.create(
+            nome='VS Code', versione='1.86', produttore='Microsoft',
+            prezzo='0.00', gratuito=True, data_rilascio=date(2024, 2, 1),
+        )
+
+    def setUp(self):
+        # ⚠️ Con una risposta in cache la view fa 0 query: non misureremmo niente
+        cache_risposte().svuota()
+        cache_dettagli().svuota()
+        cache_faccette().svuota()
+
+    def test_letture_nel_budget(self):
+        software_id = self.software.id
+        for url in [
+            '/api/software/',
+            '/api/software/?limit=1',
+            '/api/software/?limit=1&totale=1',
+            '/api/software/?limit=1&totale=1&facets=gratuito,produttore,anno',
+            '/api/software/?fields=id,nome',
+            f'/api/software/{software_id}/',
+            '/api/software/999999/',
+            '/api/software/gratuiti/',
+            '/api/software/gratuiti/?facets=produttore',
+            '/api/software/produttore/adobe/',
+            '/api/software/produttore/adobe/?facets=gratuito,anno',
+            '/api/software/produttore/nessuno/',
+            '/api/software/filtra/?prezzo_max=300&rilascio_da=2023-01-01&ordering=prezzo&limit=1',
+            '/api/software/filtra/?produttore__in=adobe,GNOME&facets=anno',
+            '/api/software/filtra/?gratuito=false&limit=1&totale=1&facets=anno',
+            '/api/software/stats/',
+            '/api/software/stats/?gratuito=false&produttore=adobe',
+            '/api/software/latest/',
+            '/api/software/latest/?limit=1&dopo=A&gratuito=false',
+            '/api/software/changes/?since=0&limit=1',
+            '/api/software/search/?q=photo',
+            '/api/software/suggest/?q=fotosh',
+            '/api/software/cache/',
+            '/api/async/software/',
+            f'/api/async/software/{software_id}/',
+            '/api/async/software/gratuiti/',
+            '/api/async/software/produttore/adobe/',
+        ]:
+            with self.subTest(url=url):
+                risposta = self.client.get(url, HTTP_ACCEPT='application/json')
+                self.assertIn(risposta.status_code, (200, 404))
+
+    def test_scritture_nel_budget(self):
+        dati = {
+            'nome': 'GIMP', 'versione': '2.10', 'produttore': 'GNOME',
+            'prezzo': '0.00', 'gratuito': True, 'data_rilascio': '2023-11-05',
+        }
+        risposta = self.client.post('/api/software/create/', dati, content_type='application/json')
+        self.assertEqual(risposta.status_code, 201)
+        software_id = risposta.json()['id']
+
+        risposta = self.client.put(
+            f'/api/software/{software_id}/update/', {**dati, 'versione': '2.12'},
+            content_type='application/json',
+        )
+        self.assertEqual(risposta.status_code, 200)
+
+        risposta = self.client.patch(
+            f'/api/software/{software_id}/patch/', {'versione': '3.0'},
+            content_type='application/json',
+        )
+        self.assertEqual(risposta.status_code, 200)
+
+        risposta = self.client.delete(f'/api/software/{software_id}/delete/')
+        self.assertEqual(risposta.status_code, 200)
+
+    def test_scritture_in_una_query(self):
+        # Token degli eventi inviati, confrontato con il contatore dopo ogni scrittura
+        token = []
+
+        def registra(sender, **kwargs):
+            token.append(kwargs.get('token'))
+
+        catalogo_modificato.connect(registra)
+        self.addCleanup(catalogo_modificato.disconnect, registra)
+        connessione = connections['default']
+        software_id = self.software.id
+        dati = {
+            'nome': 'Photoshop', 'versione': '26.0', 'produttore': 'Adobe',
+            'prezzo': '263.88', 'gratuito': False, 'data_rilascio': '2024-10-14',
+        }
+        with CaptureQueriesContext(connessione) as query:
+            risposta = self.client.put(f'/api/software/{software_id}/update/', dati, content_type='application/json')
+        self.assertEqual(len(query), 1)
+        self.assertEqual(risposta.json(), {'id': software_id, **dati})
+        self.assertEqual(Software.objects.get(id=software_id).versione_ordinabile, chiave_versione('26.0'))
+        self.assertEqual(token[-1], token_corrente(connessione))
+
+        with CaptureQueriesContext(connessione) as query:
+            risposta = self.client.patch(f'/api/software/{software_id}/patch/', {'prezzo': '9.99'},
+                                         content_type='application/json')
+        self.assertEqual(len(query), 1)
+        self.assertEqual(risposta.json(), {'id': software_id, **dati, 'prezzo': '9.99'})
+        self.assertEqual(token[-1], token_corrente(connessione))
+
+        with CaptureQueriesContext(connessione) as query:
+            risposta = self.client.delete(f'/api/software/{software_id}/delete/')
+        self.assertEqual(len(query), 1)
+        self.assertEqual(risposta.json(), {'messaggio': 'Software "Photoshop" eliminato con successo'})
+        self.assertFalse(Software.objects.filter(id=software_id).exists())
+        self.assertEqual(token[-1], token_corrente(connessione))
+
+        self.assertEqual(self.client.put(f'/api/software/{software_id}/update/', dati,
+                                         content_type='application/json').status_code, 404)
+        self.assertEqual(self.client.patch(f'/api/software/{software_id}/patch/', {'prezzo': '9.99'},
+                                           content_type='application/json').status_code, 404)
+        self.assertEqual(self.client.delete(f'/api/software/{software_id}/delete/').status_code, 404)
+
+    def test_put_senza_campo_facoltativo(self):
+        # 'gratuito' ha un default: un PUT senza non lo cambia, e la risposta
+        # riporta il valore salvato (True), non il default del modello (False)
+        vs_code = Software.objects.get(nome='VS Code')
+        dati = {
+            'nome': 'VS Code', 'versione': '1.87', 'produttore': 'Microsoft',
+            'prezzo': '0.00', 'data_rilascio': '2024-03-01',
+        }
+        risposta = self.client.put(f'/api/software/{vs_code.id}/update/', dati, content_type='application/json')
+        self.assertEqual(risposta.json(), {'id': vs_code.id, **dati, 'gratuito': True})
+        vs_code.refresh_from_db()
+        self.assertEqual((vs_code.versione, vs_code.gratuito), ('1.87', True))
+
+    @override_settings(API_CATALOGO={**CATALOGO_TEST, 'SEGNALI_ESTERNI': True})
+    def test_scritture_con_receiver_esterno(self):
+        # Qualcun altro ascolta pre_save / post_delete (SEGNALI_ESTERNI): si
+        # torna a save() e delete() (SELECT dell'oggetto + scrittura, sempre nel budget)
+        ricevuti = []
+
+        def registra(sender, instance, **kwargs):
+            ricevuti.append(instance.versione)
+
+        for segnale in (pre_save, post_delete):
+            segnale.connect(registra, sender=Software)
+            self.addCleanup(segnale.disconnect, registra, sender=Software)
+        software_id = self.software.id
+        risposta = self.client.patch(f'/api/software/{software_id}/patch/', {'versione': '25.1'},
+                                     content_type='application/json')
+        self.assertEqual(risposta.status_code, 200)
+        dati = {**risposta.json(), 'versione': '26.0'}
+        self.assertEqual(self.client.put(f'/api/software/{software_id}/update/', dati,
+                                         content_type='application/json').status_code, 200)
+        self.assertEqual(self.client.delete(f'/api/software/{software_id}/delete/').status_code, 200)
+        self.assertEqual(ricevuti, ['25.1', '26.0', '26.0'])
+
+
+class BudgetQueryDecoratorTest(TestCase):
+
+    @staticmethod
+    def view_con_due_query(request):
+        Software.objects.exists()
+        return Software.objects.count()
+
+    def test_budget_superato_errore(self):
+        view = budget_query(1)(self.view_con_due_query)
+        with override_settings(API_CATALOGO={'BUDGET_QUERY': 'errore'}):
+            with self.assertRaises(BudgetQuerySuperato):
+                view(RequestFactory().get('/'))
+
+    def test_budget_superato_avviso(self):
+        view = budget_query(1)(self.view_con_due_query)
+        with override_settings(API_CATALOGO={'BUDGET_QUERY': 'avviso'}):
+            with self.assertLogs('api.budget', level='WARNING'):
+                self.assertEqual(view(RequestFactory().get('/')), 0)
+
+    def test_budget_view_async(self):
+        async def view_async(request):
+            await Software.objects.aexists()
+            return await Software.objects.acount()
+
+        with override_settings(API_CATALOGO={'BUDGET_QUERY': 'errore'}):
+            self.assertEqual(async_to_sync(budget_query(2)(view_async))(RequestFactory().get('/')), 0)
+            with self.assertRaises(BudgetQuerySuperato):
+                async_to_sync(budget_query(1)(view_async))(RequestFactory().get('/'))
+
+    def test_budget_disattivato(self):
+        view = budget_query(0)(self.view_con_due_query)
+        with override_settings(API_CATALOGO={'BUDGET_QUERY': None}):
+            self.assertEqual(view(RequestFactory().get('/')), 0)
+
+
+# --- CACHE DELLE RISPOSTE E DEI DETTAGLI (api/cache.py) ---
+
+@override_settings(API_CATALOGO=CATALOGO_TEST)
+class CacheTest(TestCase):
+
+    def setUp(self):
+        cache_risposte().svuota()
+        cache_dettagli().svuota()
+        self.software = Software.objects.create(
+            nome='Photoshop', versione='25.0', produttore='Adobe',
+            prezzo='239.88', gratuito=False, data_rilascio=date(2023, 10, 10),
+        )
+
+    def modifica(self, versione):
+        risposta = self.client.patch(
+            f'/api/software/{self.software.id}/patch/', {'versione': versione},
+            content_type='application/json',
+        )
+        self.assertEqual(risposta.status_code, 200)
+
+    def test_risposta_in_cache_fino_alla_scrittura(self):
+        self.assertEqual(self.client.get('/api/software/')['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            risposta = self.client.get('/api/software/')
+        self.assertEqual(risposta['X-Cache'], 'HIT')
+        # Parametri diversi = rappresentazione diversa = voce diversa
+        self.assertEqual(self.client.get('/api/software/', {'fields': 'nome'})['X-Cache'], 'MISS')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.modifica('26.0')
+        risposta = self.client.get('/api/software/')
+        self.assertEqual(risposta['X-Cache'], 'MISS')
+        self.assertEqual(risposta.json()[0]['versione'], '26.0')
+
+    def test_etag_e_304(self):
+        risposta = self.client.get('/api/software/gratuiti/')
+        etag = risposta['ETag']
+        self.assertIn('max-age=5', risposta['Cache-Control'])
+        self.assertEqual(risposta['Vary'], 'Accept')
+        # NDJSON è un'altra rappresentazione della stessa URL: ETag diverso
+        self.assertNotEqual(
+            self.client.get('/api/software/gratuiti/', HTTP_ACCEPT='application/x-ndjson')['ETag'], etag
+        )
+
+        with self.assertNumQueries(0):
+            risposta = self.client.get('/api/software/gratuiti/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(risposta.status_code, 304)
+        self.assertEqual(risposta.content, b'')
+        self.assertEqual(risposta['ETag'], etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.modifica('26.0')
+        risposta = self.client.get('/api/software/gratuiti/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(risposta.status_code, 200)
+        self.assertNotEqual(risposta['ETag'], etag)
+        # Niente ETag sugli errori: un 404 non va riconvalidato
+        self.assertFalse(self.client.get('/api/software/produttore/nessuno/').has_header('ETag'))
+
+    def test_generazione_nuova_solo_dopo_il_commit(self):
+        prima = generazione_catalogo()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.modifica('26.0')
+            # Transazione non ancora confermata: chi legge ora vede ancora i
+            # dati vecchi, e li salverebbe sotto la generazione vecchia
+            self.assertEqual(generazione_catalogo(), prima)
+        self.assertNotEqual(generazione_catalogo(), prima)
+
+    def test_dettagli_e_404_in_cache(self):
+        url = f'/api/software/{self.software.id}/'
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url, {'fields': 'id,nome'}).json(),
+                             {'id': self.software.id, 'nome': 'Photoshop'})
+
+        # "Non esiste" in cache: il secondo 404 non tocca il database
+        inesistente = self.software.id + 100
+        self.assertEqual(self.client.get(f'/api/software/{inesistente}/').status_code, 404)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(f'/api/software/{inesistente}/').status_code, 404)
+        # ... finché quell'id non viene creato
+        with self.captureOnCommitCallbacks(execute=True):
+            Software.objects.create(
+                id=inesistente, nome='GIMP', versione='2.10', produttore='GNOME',
+                prezzo='0.00', gratuito=True, data_rilascio=date(2023, 11, 5),
+            )
+        self.assertEqual(self.client.get(f'/api/software/{inesistente}/').status_code, 200)
+
+    def test_404_scade(self):
+        with override_settings(API_CATALOGO={**CATALOGO_TEST, 'CACHE_DETTAGLI_TTL_NEGATIVO': 0}):
+            self.client.get('/api/software/999999/')
+            with self.assertNumQueries(1):
+                self.assertEqual(self.client.get('/api/software/999999/').status_code, 404)
+
+    def test_dettagli_invalidati_dopo_il_commit(self):
+        url = f'/api/software/{self.software.id}/'
+        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.modifica('26.0')
+            self.assertIsNot(cache_dettagli().leggi(self.software.id), CacheLRU.MANCANTE)
+        self.assertIs(cache_dettagli().leggi(self.software.id), CacheLRU.MANCANTE)
+        self.assertEqual(self.client.get(url).json()['versione'], '26.0')
+
+    def test_piu_processi_senza_cache_condivisa(self):
+        with override_settings(API_CATALOGO={**CATALOGO_TEST, 'PROCESSI': 4}):
+            with self.assertRaises(ImproperlyConfigured):
+                verifica_cache_condivisa()
+            cartella = tempfile.mkdtemp()
+            self.addCleanup(shutil.rmtree, cartella)
+            condivisa = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                                     'LOCATION': cartella}}
+            with override_settings(CACHES=condivisa):
+                verifica_cache_condivisa()
+
+    @override_settings(API_CATALOGO={**CATALOGO_TEST, 'PROCESSI': 4})
+    def test_dettagli_con_piu_processi(self):
+        url = f'/api/software/{self.software.id}/'
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            self.client.get(url)
+        # Scrittura in un ALTRO processo: qui nessun signal, solo la generazione condivisa
+        Software.objects.filter(id=self.software.id).update(versione='26.0')
+        incrementa_generazione()
+        self.assertEqual(self.client.get(url).json()['versione'], '26.0')
+
+
+# --- RICERCA FULL-TEXT (api/ricerca.py) ---
+
+class RicercaTest(TestCase):
+
+    def setUp(self):
+        cache_risposte().svuota()
+        self.photoshop = Software.objects.create(
+            nome='Photoshop', versione='25.0', produttore='Adobe',
+            prezzo='239.88', gratuito=False, data_rilascio=date(2023, 10, 10),
+        )
+        Software.objects.create(
+            nome='Lightroom', versione='7.0', produttore='Adobe Photo',
+            prezzo='9.99', gratuito=False, data_rilascio=date(2023, 10, 10),
+        )
+
+    def cerca(self, testo):
+        risposta = self.client.get('/api/software/search/', {'q': testo, 'fields': 'nome'})
+        self.assertEqual(risposta.status_code, 200)
+        return [software['nome'] for software in risposta.json()['software']]
+
+    def test_prefisso_e_pertinenza(self):
+        # "photo" nel nome pesa più di "photo" nel produttore
+        self.assertEqual(self.cerca('PHOTO'), ['Photoshop', 'Lightroom'])
+        self.assertEqual(self.cerca('light adob'), ['Lightroom'])
+
+    def test_sintassi_fts_neutralizzata(self):
+        self.assertEqual(self.cerca('photo" OR NEAR(*'), [])
+
+    def test_trigger_seguono_le_scritture(self):
+        # update() e delete() su queryset non inviano signals: ci pensano i trigger
+        Software.objects.filter(id=self.photoshop.id).update(nome='Fotoritocco')
+        cache_risposte().svuota()
+        self.assertEqual(self.cerca('fotor'), ['Fotoritocco'])
+        self.assertEqual(self.cerca('photoshop'), [])
+
+        Software.objects.filter(id=self.photoshop.id).delete()
+        cache_risposte().svuota()
+        self.assertEqual(self.cerca('fotor'), [])
+
+
+# --- STATISTICHE PER PRODUTTORE (api/statistiche.py) ---
+
+class StatisticheTest(TestCase):
+
+    def setUp(self):
+        cache_risposte().svuota()
+        for nome, produttore, prezzo, gratuito in [
+            ('Photoshop', 'Adobe', '239.88', False),
+            ('Lightroom', 'Adobe', '9.99', False),
+            ('Acrobat Reader', 'Adobe', '0.00', True),
+            ('VS Code', 'Microsoft', '0.00', True),
+        ]:
+            Software.objects.create(
+                nome=nome, versione='1.0', produttore=produttore, prezzo=prezzo,
+                gratuito=gratuito, data_rilascio=date(2024, 1, 1),
+            )
+
+    def statistiche(self, **parametri):
+        cache_risposte().svuota()
+        risposta = self.client.get('/api/software/stats/', parametri)
+        self.assertEqual(risposta.status_code, 200)
+        return risposta.json()
+
+    def test_riassunto_per_produttore(self):
+        dati = self.statistiche()
+        self.assertEqual(dati['count'], 2)
+        self.assertEqual(dati['totale']['numero'], 4)
+        adobe = dati['produttori'][0]
+        self.assertEqual(
+            (adobe['produttore'], adobe['numero'], adobe['gratuiti'], adobe['prezzo_totale'], adobe['prezzo_max']),
+            ('Adobe', 3, 1, '249.87', '239.88'),
+        )
+        self.assertEqual(self.statistiche(gratuito='false')['totale']['prezzo_medio'], '124.94')
+
+    def test_trigger_seguono_le_scritture(self):
+        # Massimo eliminato → ricalcolato; update() e delete() di massa → trigger
+        Software.objects.filter(nome='Photoshop').delete()
+        Software.objects.filter(nome='VS Code').update(produttore='Adobe')
+        Software.objects.filter(gratuito=True).update(prezzo='0.50')
+        self.assertEqual(differenze_statistiche(), set())
+
+        dati = self.statistiche()
+        self.assertEqual(dati['count'], 1)
+        self.assertEqual(dati['produttori'][0]['prezzo_max'], '9.99')
+        self.assertEqual(dati['produttori'][0]['gratuiti'], 2)
+
+
+# --- FACCETTE (api/faccette.py) ---
+
+class FaccetteTest(TestCase):
+
+    def setUp(self):
+        cache_risposte().svuota()
+        cache_faccette().svuota()
+        for nome, produttore, gratuito, anno in [
+            ('Photoshop', 'Adobe', False, 2023),
+            ('Acrobat Reader', 'Adobe', True, 2024),
+            ('VS Code', 'Microsoft', True, 2024),
+        ]:
+            Software.objects.create(
+                nome=nome, versione='1.0', produttore=produttore, prezzo='0.00',
+                gratuito=gratuito, data_rilascio=date(anno, 1, 1),
+            )
+
+    def test_conteggi_e_cache_tra_le_pagine(self):
+        with self.assertNumQueries(2):  # pagina + UNA query per tutte le faccette
+            risposta = self.client.get('/api/software/', {'limit': 1, 'facets': 'anno,gratuito,produttore'})
+        faccette = risposta.json()['facets']
+        self.assertEqual(faccette['gratuito'], [{'valore': True, 'count': 2}, {'valore': False, 'count': 1}])
+        self.assertEqual(faccette['produttore'][0], {'valore': 'Adobe', 'count': 2})
+        self.assertEqual(faccette['anno'], [{'valore': 2024, 'count': 2}, {'valore': 2023, 'count': 1}])
+
+        # Pagina successiva: stesse faccette, già in cache
+        with self.assertNumQueries(1):
+            risposta = self.client.get(risposta.json()['next'])
+        self.assertEqual(risposta.json()['facets'], faccette)
+
+    def test_faccette_del_filtro(self):
+        risposta = self.client.get('/api/software/gratuiti/', {'facets': 'produttore'})
+        self.assertEqual(risposta.json()['facets'], {'produttore': [
+            {'valore': 'Adobe', 'count': 1}, {'valore': 'Microsoft', 'count': 1},
+        ]})
+        self.assertEqual(self.client.get('/api/software/', {'facets': 'colore'}).status_code, 400)
+
+
+# --- FILTRI COMBINATI E ORDINAMENTO (GET /api/software/filtra/) ---
+
+class FiltraTest(TestCase):
+
+    def setUp(self):
+        cache_risposte().svuota()
+        for nome, produttore, prezzo, anno in [
+            ('Photoshop', 'Adobe', '239.88', 2023),
+            ('Lightroom', 'Adobe', '9.99', 2024),
+            ('GIMP', 'GNOME', '0.00', 2024),
+            ('Office', 'Microsoft', '99.00', 2024),
+        ]:
+            Software.objects.create(
+                nome=nome, versione='1.0', produttore=produttore, prezzo=prezzo,
+                gratuito=prezzo == '0.00', data_rilascio=date(anno, 1, 1),
+            )
+
+    def filtra(self, **parametri):
+        risposta = self.client.get('/api/software/filtra/', {'fields': 'nome', **parametri})
+        self.assertEqual(risposta.status_code, 200)
+        return risposta.json()
+
+    def test_intervalli_e_ordine_per_prezzo(self):
+        dati = self.filtra(rilascio_da='2024-01-01', prezzo_max='100', ordering='prezzo')
+        self.assertEqual([s['nome'] for s in dati['software']], ['GIMP', 'Lightroom', 'Office'])
+        self.assertEqual(
+            [s['nome'] for s in self.filtra(produttore__in='adobe,gnome', ordering='-prezzo')['software']],
+            ['Photoshop', 'Lightroom', 'GIMP'],
+        )
+
+    def test_pagine_per_prezzo(self):
+        nomi = []
+        parametri = {'ordering': '-prezzo', 'limit': 1}
+        while True:
+            dati = self.filtra(**parametri)
+            nomi += [s['nome'] for s in dati['software']]
+            if not dati['next']:
+                break
+            parametri['cursor'] = dati['next'].split('cursor=')[1].split('&')[0]
+        self.assertEqual(nomi, ['Photoshop', 'Office', 'Lightroom', 'GIMP'])
+
+    def test_totale(self):
+        # ?totale=1 è un parametro della paginazione, non un filtro sconosciuto
+        dati = self.filtra(totale='1', limit=2)
+        self.assertEqual(len(dati['software']), 2)
+        self.assertEqual(dati['count_stimato'], 4)
+
+    def test_totale_del_filtro(self):
+        # Photoshop, Lightroom, Office: 3 righe con gli id sparsi (GIMP in mezzo)
+        parametri = {'produttore__in': 'adobe,microsoft', 'totale': '1', 'limit': 1}
+        dati = self.filtra(**parametri)
+        self.assertEqual(dati['count_stimato'], 3)
+        # Anche dalla seconda pagina: il totale non dipende dal cursore
+        parametri['cursor'] = dati['next'].split('cursor=')[1].split('&')[0]
+        self.assertEqual(self.filtra(**parametri)['count_stimato'], 3)
+
+    def test_filtri_sconosciuti(self):
+        for parametri in ({'prezo_min': '1'}, {'prezzo_min': 'tanti'}, {'ordering': 'nome'}):
+            with self.subTest(parametri=parametri):
+                self.assertEqual(self.client.get('/api/software/filtra/', parametri).status_code, 400)
+        # Le statistiche non conoscono i prezzi delle singole righe
+        self.assertEqual(self.client.get('/api/software/stats/', {'prezzo_min': '1'}).status_code, 400)
+
+
+# --- VERSIONI ORDINABILI (api/versioni.py) ---
+
+class VersioniTest(TestCase):
+
+    def crea(self, nome, versione):
+        return Software.objects.create(
+            nome=nome, versione=versione, produttore='Adobe', prezzo='0.00',
+            gratuito=True, data_rilascio=date(2024, 1, 1),
+        )
+
+    def test_precedenza(self):
+        ordinate = ['beta', '1.0-alpha', '1.0-alpha.1', '1.0-beta', '1.0-rc.2', '1.0-rc.10',
+                    '1.0', 'v1.0.0.1', '1.1', '9.1', '10.0']
+        self.assertEqual(sorted(reversed(ordinate), key=chiave_versione), ordinate)
+        self.assertEqual(chiave_versione('2.0+build.5'), chiave_versione('2'))
+
+    def test_chiave_segue_le_scritture(self):
+        software = self.crea('GIMP', '2.10')
+        software.versione = '10.0'
+        software.save(update_fields=['versione'])
+        Software.objects.bulk_create([Software(
+            nome='GIMP', versione='3.0-rc.1', produttore='GNOME', prezzo='0.00',
+            gratuito=True, data_rilascio=date(2024, 1, 1),
+        )])
+        Software.objects.filter(versione='3.0-rc.1').update(versione='3.0')
+        software.versione = '11.0-beta'
+        Software.objects.bulk_update([software], ['versione'])
+        for versione, chiave in Software.objects.values_list('versione', 'versione_ordinabile'):
+            self.assertEqual(chiave, chiave_versione(versione))
+
+    def test_ultima_versione_per_nome(self):
+        cache_risposte().svuota()
+        for nome, versione in [('GIMP', '2.10'), ('GIMP', '2.9'), ('GIMP', '3.0-rc.1'),
+                               ('Krita', '5.2'), ('Krita', '10.0-beta'), ('Zed', '0.1')]:
+            self.crea(nome, versione)
+        risposta = self.client.get('/api/software/latest/', {'limit': 2, 'fields': 'nome,versione'})
+        dati = risposta.json()
+        self.assertEqual(dati['software'], [
+            {'nome': 'GIMP', 'versione': '3.0-rc.1'}, {'nome': 'Krita', 'versione': '10.0-beta'},
+        ])
+        self.assertEqual(self.client.get(dati['next']).json()['software'], [{'nome': 'Zed', 'versione': '0.1'}])
+
+
+# --- FEED DELLE MODIFICHE (api/modifiche.py) ---
+
+class ModificheTest(TestCase):
+
+    def setUp(self):
+        cache_risposte().svuota()
+        self.software = [
+            Software.objects.create(
+                nome=nome, versione='1.0', produttore='Adobe', prezzo='0.00',
+                gratuito=True, data_rilascio=date(2024, 1, 1),
+            )
+            for nome in ('Photoshop', 'Lightroom', 'Acrobat')
+        ]
+
+    def modifiche(self, since, **parametri):
+        cache_risposte().svuota()
+        risposta = self.client.get('/api/software/changes/', {'since': since, 'fields': 'id,nome', **parametri})
+        self.assertEqual(risposta.status_code, 200)
+        return risposta.json()
+
+    def test_solo_le_modifiche_dopo_il_token(self):
+        token = self.modifiche(0)['token']
+        photoshop, lightroom, acrobat = self.software
+
+        lightroom.nome = 'Lightroom Classic'
+        lightroom.save()
+        Software.objects.filter(id=photoshop.id).update(prezzo='9.99')  # update() di massa: trigger
+        Software.objects.filter(id=acrobat.id).delete()
+
+        dati = self.modifiche(token)
+        self.assertEqual(dati['software'], [
+            {'id': lightroom.id, 'nome': 'Lightroom Classic'}, {'id': photoshop.id, 'nome': 'Photoshop'},
+        ])
+        self.assertEqual(dati['eliminati'], [acrobat.id])
+        self.assertIsNone(dati['next'])
+        self.assertEqual(self.modifiche(dati['token'])['software'], [])
+
+    def test_pagine_limitate(self):
+        Software.objects.filter(id=self.software[0].id).delete()
+        dati = self.modifiche(0, limit=2)
+        self.assertEqual([s['nome'] for s in dati['software']], ['Lightroom', 'Acrobat'])
+        self.assertEqual(dati['eliminati'], [])
+        dati = self.modifiche(dati['token'], limit=2)
+        self.assertEqual((dati['software'], dati['eliminati'], dati['next']), ([], [self.software[0].id], None))
+
+
+# --- EVENTI SSE (api/eventi.py, api/asgi.py) ---
+
+class EventiTest(TestCase):
+
+    def test_modifica_arriva_dopo_il_commit(self):
+        # Come in produzione: lo stream nel loop di asyncio (un altro thread),
+        # la scrittura nel thread "sincrono" della view
+        ricevuti = []
+        loop = asyncio.new_event_loop()
+        chiuso = asyncio.Event()
+        richiesta = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+        async def receive():
+            if richiesta:
+                return richiesta.pop()
+            await chiuso.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(messaggio):
+            ricevuti.append(messaggio.get('body', b'').decode() or messaggio.get('status'))
+
+        software = Software.objects.create(
+            nome='GIMP', versione='2.10', produttore='GNOME',
+            prezzo='0.00', gratuito=True, data_rilascio=date(2023, 11, 5),
+        )
+        software_id = software.id
+        scope = {'type': 'http', 'method': 'GET', 'path': PERCORSO_EVENTI}
+        stream = threading.Thread(target=loop.run_until_complete, args=[applicazione_eventi(scope, receive, send)])
+        stream.start()
+        try:
+            while len(ricevuti) < 2:  # stato 200 e 'retry:': client iscritto
+                time.sleep(0.01)
+            with self.captureOnCommitCallbacks(execute=True):
+                software.delete()
+                self.assertEqual(len(ricevuti), 2)  # prima del commit: niente
+            while len(ricevuti) < 3:
+                time.sleep(0.01)
+        finally:
+            loop.call_soon_threadsafe(chiuso.set)
+            stream.join(5)
+            loop.close()
+
+        token = self.client.get('/api/software/changes/', {'since': 0}).json()['token']
+        self.assertEqual(ricevuti, [200, 'retry: 5000\n\n', (
+            f'id: {token}\nevent: delete\n'
+            f'data: {{"azione":"delete","ids":[{software_id}],"token":{token}}}\n\n'
+        )])
+        self.assertEqual(hub_eventi().numero_iscritti(), 0)
+        # Ripresa dall'id dell'evento: nessuna modifica persa, nessuna ripetuta
+        self.assertEqual(self.client.get('/api/software/changes/', {'since': token - 1}).json()['eliminati'], [software_id])
+        self.assertEqual(self.client.get('/api/software/changes/', {'since': token}).json()['eliminati'], [])
+
+    @override_settings(API_CATALOGO={**CATALOGO_TEST, 'EVENTI_CODA_MAX': 2})
+    def test_client_lento_scollegato(self):
+        async def scenario():
+            hub = HubEventi()
+            iscritto = hub.iscrivi()
+            for numero in range(3):
+                hub.pubblica({'azione': 'update', 'ids': [numero]})
+            await asyncio.sleep(0)
+            return hub.numero_iscritti(), iscritto.coda.get_nowait(), iscritto.coda.empty()
+
+        self.assertEqual(asyncio.run(scenario()), (0, SCOLLEGATO, True))
+
+
+# --- ESPORTAZIONE (api/esportazione.py) ---
+
+class EsportazioneTest(TestCase):
+
+    def setUp(self):
+        # Snapshot in una cartella del test, eliminata alla fine
+        self.cartella = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cartella)
+        impostazioni = override_settings(API_CATALOGO={**CATALOGO_TEST, 'ESPORTAZIONE_CARTELLA': self.cartella})
+        impostazioni.enable()
+        self.addCleanup(impostazioni.disable)
+        self.photoshop = Software.objects.create(
+            nome='Photoshop', versione='25.0', produttore='Adobe',
+            prezzo='239.88', gratuito=False, data_rilascio=date(2023, 10, 10),
+        )
+        self.gimp = Software.objects.create(
+            nome='GIMP, "free"', versione='2.10', produttore='GNOME',
+            prezzo='0.00', gratuito=True, data_rilascio=date(2024, 2, 1),
+        )
+
+    def scarica(self, parametri=None, **intestazioni):
+        risposta = self.client.get('/api/software/export/', parametri or {}, headers=intestazioni)
+        return risposta, b''.join(risposta.streaming_content)
+
+    def test_csv_e_ripresa_con_range(self):
+        risposta, corpo = self.scarica()
+        self.assertEqual(risposta.status_code, 200)
+        self.assertEqual(corpo.decode().splitlines(), [
+            'id,nome,versione,produttore,prezzo,gratuito,data_rilascio',
+            f'{self.photoshop.id},Photoshop,25.0,Adobe,239.88,false,2023-10-10',
+            f'{self.gimp.id},"GIMP, ""free""",2.10,GNOME,0.00,true,2024-02-01',
+        ])
+        etag = risposta['ETag']
+
+        ripresa, resto = self.scarica(Range='bytes=20-', **{'If-Range': etag})
+        self.assertEqual((ripresa.status_code, ripresa['Content-Range'], resto),
+                         (206, f'bytes 20-{len(corpo) - 1}/{len(corpo)}', corpo[20:]))
+
+        # Il catalogo cambia: ETag nuovo, ma chi riprende con quello vecchio
+        # riceve ancora i byte del suo snapshot
+        with self.captureOnCommitCallbacks(execute=True):
+            Software.objects.filter(id=self.gimp.id).delete()
+        self.assertNotEqual(self.scarica()[0]['ETag'], etag)
+        ripresa, resto = self.scarica(Range='bytes=20-', **{'If-Range': etag})
+        self.assertEqual((ripresa.status_code, resto), (206, corpo[20:]))
+
+        oltre = self.client.get('/api/software/export/', headers={'Range': f'bytes={len(corpo) * 2}-'})
+        self.assertEqual(oltre.status_code, 416)
+
+    def test_snapshot_scartato_se_il_catalogo_cambia(self):
+        risposta = self.client.get('/api/software/export/')
+        blocchi = iter(risposta.streaming_content)
+        next(blocchi)
+        # Scrittura a download iniziato: lo snapshot non è più della generazione dell'ETag
+        with self.captureOnCommitCallbacks(execute=True):
+            Software.objects.filter(id=self.gimp.id).delete()
+        list(blocchi)
+        self.assertEqual(os.listdir(self.cartella), [])
+
+        # Senza scritture lo snapshot resta
+        self.scarica()
+        self.assertEqual(len(os.listdir(self.cartella)), 1)
+
+    def test_catalogo_vuoto(self):
+        Software.objects.all().delete()
+        risposta, corpo = self.scarica()
+        self.assertEqual(corpo, b'id,nome,versione,produttore,prezzo,gratuito,data_rilascio\n')
+        # Lo snapshot è la sola intestazione: un Range si soddisfa
+        ripresa, resto = self.scarica(Range='bytes=0-10', **{'If-Range': risposta['ETag']})
+        self.assertEqual((ripresa.status_code, resto), (206, corpo[:11]))
+
+        risposta, corpo = self.scarica({'format': 'colonne'})
+        self.assertEqual(list(leggi_colonne(io.BytesIO(corpo))), [])
+
+    def test_colonne_compresso(self):
+        risposta, corpo = self.scarica({'format': 'colonne', 'gzip': '1'})
+        self.assertEqual(risposta['Content-Type'], 'application/gzip')
+        [blocco] = leggi_colonne(io.BytesIO(gzip.decompress(corpo)))
+        self.assertEqual(blocco['nome'], ['Photoshop', 'GIMP, "free"'])
+        self.assertEqual(blocco['prezzo'], [Decimal('239.88'), Decimal('0.00')])
+        self.assertEqual(blocco['gratuito'], [False, True])
+        self.assertEqual(blocco['data_rilascio'], [date(2023, 10, 10), date(2024, 2, 1)])
+
+
+# --- IMPORTAZIONE DI MASSA (manage.py import_software) ---
+
+class ImportazioneTest(TestCase):
+
+    def setUp(self):
+        self.cartella = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cartella)
+
+    def importa(self, nome, contenuto, *argomenti):
+        percorso = os.path.join(self.cartella, nome)
+        with open(percorso, 'w', encoding='utf-8') as file:
+            file.write(contenuto)
+        call_command('import_software', percorso, *argomenti, stdout=io.StringIO())
+        return percorso
+
+    def test_csv_con_scarti(self):
+        percorso = self.importa('catalogo.csv', (
+            'id,nome,versione,produttore,prezzo,gratuito,data_rilascio\n'
+            '1,Photoshop,25.0,Adobe,239.88,false,2023-10-10\n'
+            '2,,1.0,GNOME,gratis,true,2024-02-01\n'
+            '3,GIMP,2.10,GNOME,0.00,true,2024-02-01\n'
+        ), '--transazione', '1')
+        self.assertEqual(
+            list(Software.objects.order_by('nome').values_list('nome', 'versione_ordinabile', 'prezzo')),
+            [('GIMP', chiave_versione('2.10'), Decimal('0.00')),
+             ('Photoshop', chiave_versione('25.0'), Decimal('239.88'))],
+        )
+        with open(f'{percorso}.scarti.ndjson', encoding='utf-8') as file:
+            [scarto] = [json.loads(riga) for riga in file]
+        self.assertEqual(scarto['riga'], 3)
+        self.assertEqual(set(scarto['errori']), {'nome', 'prezzo'})
+        self.assertEqual(differenze_statistiche(), set())
+
+    def test_ndjson(self):
+        self.importa('catalogo.ndjson', (
+            '{"nome": "VS Code", "versione": "1.86", "produttore": "Microsoft",'
+            ' "prezzo": "0.00", "gratuito": true, "data_rilascio": "2024-02-01"}\n'
+            '\n'
+            '[1, 2]\n'
+        ))
+        self.assertEqual(list(Software.objects.values_list('nome', flat=True)), ['VS Code'])
+        self.assertTrue(os.path.exists(os.path.join(self.cartella, 'catalogo.ndjson.scarti.ndjson')))
+
+
+# --- PROFILO SQLITE (api/connessioni.py) ---
+
+class ProfiloSqliteTest(TestCase):
+
+    def test_pragma_su_ogni_nuova_connessione(self):
+        cartella = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cartella)
+        # Una connessione nuova su un file (il database dei test è in memoria: niente WAL)
+        esistente = connections['default']
+        nuova = esistente.__class__({**esistente.settings_dict, 'NAME': os.path.join(cartella, 'db.sqlite3')}, 'profilo')
+        self.addCleanup(nuova.close)
+        with nuova.cursor() as cursor:
+            valori = {}
+            for nome in ('journal_mode', 'synchronous', 'busy_timeout', 'temp_store'):
+                cursor.execute(f'PRAGMA {nome}')
+                valori[nome] = cursor.fetchone()[0]
+        # synchronous 1 = NORMAL, temp_store 2 = MEMORY
+        self.assertEqual(valori, {'journal_mode': 'wal', 'synchronous': 1, 'busy_timeout': 5000, 'temp_store': 2})
+
+    def test_profilo_non_valido(self):
+        with self.assertRaises(ImproperlyConfigured):
+            pragma_profilo({'journal_mode': 'WAL; DROP TABLE api_software'})
+        with self.assertRaises(ImproperlyConfigured):
+            pragma_profilo({'locking_mode': 'EXCLUSIVE'})
+
+
+# --- REPLICHE DI LETTURA (api/repliche.py) ---
+
+@override_settings(API_CATALOGO={**CATALOGO_TEST, 'REPLICHE_LETTURA': ['replica']})
+class ReplicheTest(TestCase):
+
+    def test_letture_su_replica_tranne_dopo_una_scrittura(self):
+        @lettura_da_replica
+        def view(request):
+            return router.db_for_read(Software), router.db_for_write(Software), versione_lettura()
+
+        factory = RequestFactory()
+        # Nei test la replica è un MIRROR del database in memoria: nessun file
+        self.assertEqual(view(factory.get('/')), ('default', 'default', None))
+
+        with mock.patch('api.repliche.versione_replica', return_value=42):
+            self.assertEqual(view(factory.get('/')), ('replica', 'default', 42))
+            risposta = self.client.post('/api/software/create/', {
+                'nome': 'GIMP', 'versione': '2.10', 'produttore': 'GNOME',
+                'prezzo': '0.00', 'gratuito': True, 'data_rilascio': '2024-02-01',
+            }, content_type='application/json')
+            self.assertEqual(risposta.status_code, 201)
+            richiesta = factory.get('/')
+            richiesta.COOKIES[COOKIE_SCRITTURA] = risposta.cookies[COOKIE_SCRITTURA].value
+            self.assertEqual(view(richiesta), ('default', 'default', None))
+
+    def test_replica_troppo_indietro(self):
+        @lettura_da_replica
+        def view(request):
+            return router.db_for_read(Software)
+
+        secondi = 1_000_000_000
+        with mock.patch('api.repliche.versione_replica', return_value=100 * secondi):
+            for ultima_scrittura, alias in [(50 * secondi, 'replica'), (159 * secondi, 'replica'),
+                                            (161 * secondi, 'default'), (None, 'replica')]:
+                with self.subTest(ultima_scrittura=ultima_scrittura), \
+                        mock.patch('api.repliche.modifica_primario', return_value=ultima_scrittura):
+                    self.assertEqual(view(RequestFactory().get('/')), alias)
+
+    def test_migrazioni_mai_sulle_repliche(self):
+        router_repliche = RouterLetturaScrittura()
+        self.assertIs(router_repliche.allow_migrate('replica', 'api'), False)
+        self.assertIsNone(router_repliche.allow_migrate('default', 'api'))
+        # Configurata (TEST['MIRROR']) ma fuori da REPLICHE_LETTURA: ancora una replica
+        databases = {**settings.DATABASES, 'copia': {'TEST': {'MIRROR': 'default'}}}
+        with override_settings(API_CATALOGO=CATALOGO_TEST, DATABASES=databases):
+            self.assertIs(router_repliche.allow_migrate('copia', 'api'), False)
+
+    def test_copia_coerente(self):
+        cartella = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cartella)
+        primario = sqlite3.connect(os.path.join(cartella, 'primario.sqlite3'))
+        self.addCleanup(primario.close)
+        primario.execute('PRAGMA journal_mode = WAL')
+        primario.execute('CREATE TABLE t (x INTEGER)')
+        primario.executemany('INSERT INTO t VALUES (?)', [(n,) for n in range(100)])
+        primario.commit()
+
+        destinazione = os.path.join(cartella, 'replica.sqlite3')
+        copia_sqlite(primario, destinazione)
+        replica = sqlite3.connect(f'file:{destinazione}?mode=ro&immutable=1', uri=True)
+        self.addCleanup(replica.close)
+        self.assertEqual(replica.execute('SELECT COUNT(*) FROM t').fetchone(), (100,))
+        self.assertEqual(replica.execute('PRAGMA journal_mode').fetchone(), ('delete',))
+        self.assertEqual(sorted(os.listdir(cartella)), sorted(
+            ['primario.sqlite3', 'primario.sqlite3-wal', 'primario.sqlite3-shm', 'replica.sqlite3']
+        ))
+
+
+# --- SUGGERIMENTI (api/suggerimenti.py) ---
+
+class SuggerimentiTest(TestCase):
+
+    def setUp(self):
+        self.indice = IndiceSuggerimenti()
+        self.photoshop = Software.objects.create(
+            nome='Photoshop', versione='25.0', produttore='Adobe',
+            prezzo='239.88', gratuito=False, data_rilascio=date(2023, 10, 10),
+        )
+        Software.objects.create(
+            nome='Visual Studio Code', versione='1.86', produttore='Microsoft',
+            prezzo='0.00', gratuito=True, data_rilascio=date(2024, 2, 1),
+        )
+
+    def suggerisci(self, testo):
+        return [(s['testo'], s['errori']) for s in self.indice.suggerisci(testo)]
+
+    def test_prefisso_ed_errori(self):
+        self.assertEqual(self.suggerisci('PHO'), [('Photoshop', 0)])
+        self.assertEqual(self.suggerisci('studio c'), [('Visual Studio Code', 0)])
+        self.assertEqual(self.suggerisci('fotosh'), [('Photoshop', 2)])
+        self.assertEqual(self.suggerisci('micrsoft'), [('Microsoft', 1)])
+        self.assertEqual(self.suggerisci('zzzz'), [])
+
+    def test_aggiornamento_incrementale(self):
+        self.suggerisci('pho')  # costruisce l'indice
+        self.photoshop.nome = 'Lightroom'
+        self.photoshop.save()
+        self.indice.segna_modificati([self.photoshop.id])
+        with self.assertNumQueries(1):  # rilegge solo la riga modificata
+            self.assertEqual(self.suggerisci('light'), [('Lightroom', 0)])
+        self.assertEqual(self.suggerisci('photoshop'), [])
+
+        Software.objects.filter(id=self.photoshop.id).delete()
+        self.indice.segna_modificati([self.photoshop.id])
+        self.assertEqual(self.suggerisci('light'), [])
+        self.assertEqual(self.suggerisci('adobe'), [])
+
+    def test_errore_del_database_non_perde_le_modifiche(self):
+        self.suggerisci('pho')
+        self.photoshop.nome = 'Lightroom'
+        self.photoshop.save()
+        self.indice.segna_modificati([self.photoshop.id])
+        with mock.patch.object(Software.objects, 'filter', side_effect=DatabaseError('disco pieno')):
+            with self.assertRaises(DatabaseError):
+                self.suggerisci('light')
+        # L'id è ancora in attesa: la richiesta successiva lo rilegge
+        self.assertEqual(self.suggerisci('light'), [('Lightroom', 0)])
+
+    def test_segnati_dopo_il_commit(self):
+        indice = indice_suggerimenti()  # quello aggiornato dai signals
+        indice.suggerisci('pho')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.photoshop.nome = 'Lightroom'
+            self.photoshop.save()
+            self.assertEqual(indice._in_attesa, set())
+        self.assertEqual(indice._in_attesa, {self.photoshop.id})
+
+    def test_ricostruzione_completa(self):
+        self.suggerisci('pho')
+        Software.objects.filter(id=self.photoshop.id).update(nome='Lightroom')
+        self.indice.segna_modificati(None)
+        self.assertEqual(self.suggerisci('light'), [('Lightroom', 0)])
+        self.assertEqual(self.suggerisci('photoshop'), [])
@@ -1,5 +1,6 @@
 from django.urls import path  # Funzione per definire pattern URL
 from . import views  # Importa le view dalla cartella corrente (api/)
+from . import views_async  # View async (async def) per i server ASGI
 
 # urlpatterns: lista degli URL dell'app
 # ⚠️ IMPORTANTE: Django controlla dall'ALTO verso il BASSO e si ferma al PRIMO match
@@ -26,6 +27,25 @@ urlpatterns = [
     path('software/create/', views.crea_software, name='crea_software'),
     
     
+    # --- OPERAZIONI DI MASSA (BULK) ---
+    
+    # CREATE BULK: Crea molti record con una sola richiesta
+    # POST /api/software/bulk/
+    # Body JSON: lista di oggetti (ognuno come per software/create/)
+    path('software/bulk/', views.crea_software_bulk, name='crea_software_bulk'),
+    
+    # UPDATE BULK: Modifiche parziali a molti record
+    # PATCH /api/software/bulk/patch/
+    # Body JSON: [{"id": 1, "changes": {...}}, ...]
+    #        oppure {"filtro": {"produttore": "Adobe"}, "changes": {...}}
+    path('software/bulk/patch/', views.aggiorna_software_bulk, name='aggiorna_software_bulk'),
+    
+    # DELETE BULK: Elimina molti record (IRREVERSIBILE!)
+    # DELETE /api/software/bulk/delete/
+    # Body JSON: {"ids": [1, 2, 3]} oppure {"filtro": {"produttore": "Adobe"}}
+    path('software/bulk/delete/', views.elimina_software_bulk, name='elimina_software_bulk'),
+    
+    
     # --- FILTRI SPECIALI (URL FISSI) ---
     # ⚠️ CRITICO: Questi DEVONO stare PRIMA degli URL con parametri dinamici!
     # Motivo: se 'gratuiti' venisse dopo <int:software_id>, Django proverebbe
@@ -42,6 +62,55 @@ urlpatterns = [
          name='software_per_produttore'),
     
     
+    # GET /api/software/filtra/?prezzo_max=50&ordering=prezzo&limit=20 - Filtri combinabili + cursore
+    path('software/filtra/', views.filtra_software, name='filtra_software'),
+    
+    # GET /api/software/stats/ - Numero di software e prezzi per produttore
+    path('software/stats/', views.statistiche_software, name='statistiche_software'),
+    
+    # GET /api/software/latest/ - Ultima versione di ogni software (window function)
+    path('software/latest/', views.ultime_versioni_software, name='ultime_versioni_software'),
+    
+    # GET /api/software/changes/?since=1234 - Solo le modifiche dopo il token (sincronizzazione)
+    path('software/changes/', views.modifiche_software, name='modifiche_software'),
+    
+    # GET /api/software/export/?gzip=1 - Tutto il catalogo in CSV (o ?format=colonne), con Range
+    path('software/export/', views.esporta_software, name='esporta_software'),
+    
+    # GET /api/software/search/?q=photo - Ricerca full-text su nome e produttore
+    path('software/search/', views.cerca_software, name='cerca_software'),
+    
+    # GET /api/software/suggest/?q=fotosh - Suggerimenti mentre si scrive (tollera errori)
+    path('software/suggest/', views.suggerisci_software, name='suggerisci_software'),
+    
+    
+    # GET /api/software/cache/ - Statistiche della cache delle risposte (hit/miss)
+    path('software/cache/', views.statistiche_cache, name='statistiche_cache'),
+    
+    
+    # --- VIEW ASYNC (SERVER ASGI) ---
+    # Stesse risposte delle view sopra, ma scritte come coroutine (api/views_async.py).
+    # Sotto ASGI pww/asgi.py le serve con middleware solo async (api/asgi.py).
+    
+    # GET /api/async/software/
+    path('async/software/', views_async.lista_software_async, name='lista_software_async'),
+    
+    # GET /api/async/software/gratuiti/
+    path('async/software/gratuiti/', 
+         views_async.software_gratuiti_async, 
+         name='software_gratuiti_async'),
+    
+    # GET /api/async/software/produttore/Adobe/
+    path('async/software/produttore/<str:produttore>/', 
+         views_async.software_per_produttore_async, 
+         name='software_per_produttore_async'),
+    
+    # GET /api/async/software/5/
+    path('async/software/<int:software_id>/', 
+         views_async.dettaglio_software_async, 
+         name='dettaglio_software_async'),
+    
+    
     # --- URL DINAMICI (CON PARAMETRI) ---
     # ⚠️ REGOLA: Questi vanno ALLA FINE, dal più specifico al più generico
     # Motivo: <int:software_id> cattura QUALSIASI numero, quindi è molto "generico"
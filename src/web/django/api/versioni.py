@@ -0,0 +1,74 @@
+import re
+
+
+# --- VERSIONI ORDINABILI ---
+#
+# 'versione' è testo libero ("2.5.3-beta", "v1.86", "25.0"): ordinata dal
+# database come TESTO dà risultati sbagliati:
+#
+#   '10.0' < '9.1'          (il carattere '1' viene prima di '9')
+#   '2.0' < '2.0-beta'      (la beta è uscita PRIMA della versione finale)
+#
+# chiave_versione() la trasforma in una chiave che, confrontata come testo
+# (ORDER BY, MAX, indici), rispetta la precedenza delle versioni (semver):
+#
+#   '2.5.3-beta.2' → '00000002.00000005.00000003.00000000!01beta.000000002'
+#   '2.5.3'        → '00000002.00000005.00000003.00000000!1'
+#
+#   - numeri con zeri davanti (larghezza fissa): '00000010' > '00000009'
+#   - almeno 4 componenti: '2.5' vale come '2.5.0.0'
+#   - '!' dopo i numeri: viene prima di '.', quindi 1.0.0.0 < 1.0.0.0.1
+#   - poi '0' = pre-release, '1' = versione finale: 2.0-beta < 2.0
+#   - identificatori della pre-release: i numeri ('0' + cifre) vengono prima
+#     delle parole ('1' + lettere), a parità di inizio vince il più lungo
+#     (alpha < alpha.1 < beta < rc.1 < rc.2 < rc.10)
+#
+# Differenze (volute) da semver: maiuscole e minuscole non contano, 'v'
+# iniziale e metadati di build ('+20240101') sono ignorati, 'rc10' vale come
+# 'rc.10' e '1.0b2' come '1.0-b.2'. Un testo senza numeri ('beta') vale come
+# pre-release di 0.0.0.0: finisce prima di tutte le versioni numerate.
+#
+# ⚠️ La chiave va salvata in Software.versione_ordinabile a OGNI scrittura
+# di 'versione': ci pensano Software.save() e SoftwareQuerySet (api/models.py).
+# Se cambi questa funzione, le chiavi salvate vanno ricalcolate con una
+# migrazione NUOVA (la 0007 ne ha una copia congelata, da non toccare).
+
+CIFRE = 8              # cifre per componente: numeri più grandi valgono 99999999
+COMPONENTI = 4         # componenti numerici minimi (2.5 → 2.5.0.0)
+LUNGHEZZA_MASSIMA = 160  # = max_length di Software.versione_ordinabile
+
+_NUMERI = re.compile(r'v?([0-9]+(?:\.[0-9]+)*)')
+_IDENTIFICATORI = re.compile(r'[0-9]+|[^\W\d_]+')
+
+
+def _numero(cifre):
+    """'007' → '00000007', oltre CIFRE cifre → '99999999'."""
+    cifre = cifre.lstrip('0') or '0'
+    return '9' * CIFRE if len(cifre) > CIFRE else cifre.zfill(CIFRE)
+
+
+def chiave_versione(versione):
+    """
+    Versione (testo libero) → chiave ordinabile come testo.
+
+    Esempi:
+        chiave_versione('10.0') > chiave_versione('9.1')          → True
+        chiave_versione('2.0-rc.1') < chiave_versione('2.0')      → True
+        chiave_versione('V2.0+build.5') == chiave_versione('2')   → True
+    """
+    testo = versione.strip().casefold().split('+', 1)[0]  # build: non conta
+    trovati = _NUMERI.match(testo)
+    numeri = trovati.group(1).split('.') if trovati else []
+    resto = testo[trovati.end():] if trovati else testo
+
+    numeri += ['0'] * (COMPONENTI - len(numeri))
+    chiave = '.'.join(_numero(n) for n in numeri)
+
+    identificatori = _IDENTIFICATORI.findall(resto)
+    if not identificatori:
+        return (chiave + '!1')[:LUNGHEZZA_MASSIMA]
+    pre_release = '.'.join(
+        '0' + _numero(i) if i.isdigit() else '1' + i
+        for i in identificatori
+    )
+    return (chiave + '!0' + pre_release)[:LUNGHEZZA_MASSIMA]
@@ -1,11 +1,38 @@
 # --- IMPORTAZIONI ---
 from rest_framework.decorators import api_view  # Trasforma funzioni in API endpoints
+from rest_framework.decorators import renderer_classes  # Formati di risposta accettati
 from rest_framework.response import Response    # Risposta API (auto-converte in JSON)
 from rest_framework import status              # Codici HTTP (200, 404, 201, ecc.)
 from rest_framework import serializers         # Per convertire Model ↔ JSON
+from django.db import connections, router, transaction  # Transazioni (tutto o niente)
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+from rest_framework.utils.urls import replace_query_param
 from datetime import datetime
+from functools import partial
 
-from .models import Software  # Modello database
+from .budget import budget_query
+from .esportazione import RENDERER_ESPORTAZIONE, risposta_esportazione
+from .conf import impostazione
+from .filtri import FILTRI, gratuito_uguale, leggi_filtri, produttore_uguale
+from .faccette import faccette_risposta, leggi_faccette
+from .cache import (
+    CacheLRU, cache_catalogo, cache_dettagli, cache_faccette, cache_risposte, etag_catalogo,
+    generazione_catalogo, leggi_dettaglio, salva_dettaglio,
+)
+from .models import Software, SoftwareEliminato  # Modelli database
+from .modifiche import feed_disponibile, leggi_since, unisci_modifiche
+from .paginazione import COLONNE_ORDINAMENTO, leggi_limit, pagina_keyset, usa_paginazione
+from .repliche import lettura_da_replica
+from .ricerca import cerca_nel_catalogo, parole
+from .scritture import aggiorna_riga, elimina_riga, elimina_righe, returning_disponibile
+from .suggerimenti import indice_suggerimenti
+from .signals import aggiornamento_veloce_possibile, cancellazione_veloce_possibile, catalogo_modificato
+from .statistiche import FILTRI_STATISTICHE, righe_statistiche, statistiche_catalogo
+from .serializzazione import PianoSerializzazione, leggi_campi, usa_serializzatore_veloce
+from .streaming import (
+    RENDERER_CATALOGO, modalita_streaming, prima_riga, righe_queryset, risposta_streaming,
+)
 
 
 # --- SERIALIZER ---
@@ -16,19 +43,76 @@ class SoftwareSerializer(serializers.ModelSerializer):
     
     ModelSerializer: genera automaticamente i campi dal modello,
     risparmiando codice ripetitivo.
+    
+    SoftwareSerializer(obj, fields=['id', 'nome']): serializza solo quei campi
+    (sparse fieldset, usato da ?fields= / ?exclude=).
     """
     
+    def __init__(self, *args, **kwargs):
+        # ⚠️ 'fields' va tolto da kwargs PRIMA di super(): DRF non lo conosce
+        campi = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if campi is not None:
+            for nome in set(self.fields) - set(campi):
+                self.fields.pop(nome)
+    
     class Meta:
         model = Software  # Modello da serializzare
-        fields = '__all__'  # Includi tutti i campi
+        # Tutti i campi tranne quelli interni (chiave derivata da 'versione',
+        # vedi api/versioni.py; numero di modifica, vedi api/modifiche.py):
+        # non fanno parte dell'API
+        exclude = ['versione_ordinabile', 'sequenza']
         # Alternative:
+        # fields = '__all__'                    # Tutti i campi
         # fields = ['id', 'nome', 'versione']  # Solo campi specifici
-        # exclude = ['data_creazione']          # Tutti tranne questi
+
+
+# --- SERIALIZZAZIONE IN LETTURA ---
+# Le view di lettura NON usano direttamente SoftwareSerializer ma queste funzioni:
+# - percorso veloce (default): tuple da .values_list() + piano precompilato
+# - percorso DRF (API_CATALOGO['SERIALIZZATORE_VELOCE'] = False): oggetti + serializer
+# ⚠️ L'output JSON è identico nei due casi (vedi api/serializzazione.py)
+piano_software = PianoSerializzazione(SoftwareSerializer)
+
+
+def campi_richiesti(request):
+    """Campi chiesti dal client con ?fields= / ?exclude= (None = tutti)."""
+    return leggi_campi(request, piano_software.nomi)
+
+
+def righe_software(queryset, campi=None, named=False, extra=()):
+    """
+    Queryset → "righe" adatte al percorso attivo (tuple oppure oggetti Software).
+
+    campi: solo queste colonne vengono lette dal database (SELECT id, nome ...)
+    extra: colonne in più che servono alla view ma non al JSON (es. paginazione)
+    """
+    if usa_serializzatore_veloce():
+        return piano_software.per_campi(campi).queryset(queryset, named=named, extra=extra)
+    if campi is not None:
+        # .only(): carica solo queste colonne (gli altri attributi restano "differiti")
+        return queryset.only(*campi, *extra)
+    return queryset
+
+
+def serializza_riga(riga, campi=None):
+    """Una riga (tupla o oggetto) → dizionario."""
+    if usa_serializzatore_veloce():
+        return piano_software.per_campi(campi).riga(riga)
+    return SoftwareSerializer(riga, fields=campi).data
+
+
+def serializza_righe(righe, campi=None):
+    """Più righe → lista di dizionari (equivale a SoftwareSerializer(many=True).data)."""
+    if usa_serializzatore_veloce():
+        return piano_software.per_campi(campi).serializza(righe)
+    return SoftwareSerializer(righe, many=True, fields=campi).data
 
 
 # --- ENDPOINTS DI TEST ---
 
 @api_view(['GET'])  # ⚠️ IMPORTANTE: limita ai metodi HTTP specificati
+@budget_query(0)    # Massimo di query SQL per richiesta (vedi api/budget.py)
 def hello_world(request):
     """GET /api/hello/ - Endpoint di test"""
     data = {
@@ -41,6 +125,7 @@ def hello_world(request):
 
 
 @api_view(['POST'])
+@budget_query(0)
 def hello_post(request):
     """POST /api/helloPost/ - Test endpoint POST"""
     data = {
@@ -55,54 +140,134 @@ def hello_post(request):
 # --- CRUD: READ (GET) ---
 
 @api_view(['GET'])
+@budget_query(3)                      # 1 query (+1 con ?totale=1, +1 con ?facets=)
+@renderer_classes(RENDERER_CATALOGO)  # JSON + NDJSON (application/x-ndjson)
+@lettura_da_replica                   # Letture su una replica (api/repliche.py)
+@etag_catalogo('lista_software')      # ETag + 304 Not Modified + Cache-Control
+@cache_catalogo('lista_software')     # Risposte in cache fino alla prossima scrittura
 def lista_software(request):
     """
     GET /api/software/
     Restituisce TUTTI i software nel database.
     
     Risposta: [{"id": 1, "nome": "VS Code", ...}, {...}]
+    
+    GET /api/software/?limit=50[&ordering=-data_rilascio][&totale=1]
+    Restituisce UNA PAGINA (paginazione a cursore, vedi api/paginazione.py).
+    
+    Risposta: {"next": "...?cursor=...", "prev": null, "software": [...]}
+    ⚠️ Per la pagina successiva basta seguire l'URL in "next":
+    ogni pagina costa come la prima, anche con milioni di righe.
+    
+    GET /api/software/?stream=1 (oppure header Accept: application/x-ndjson)
+    Restituisce TUTTO il catalogo in streaming (vedi api/streaming.py):
+    memoria costante anche con milioni di righe.
+    
+    GET /api/software/?fields=id,nome,versione (oppure ?exclude=prezzo)
+    Restituisce solo i campi richiesti: le altre colonne non vengono
+    nemmeno lette dal database. Si combina con tutte le modalità sopra.
+    
+    GET /api/software/?limit=20&facets=gratuito,produttore,anno
+    Aggiunge "facets": quanti software per ogni valore (vedi api/faccette.py).
+    Senza paginazione la risposta diventa {"count", "software", "facets"}.
     """
     # ORM query: SELECT * FROM software
     software_list = Software.objects.all()
     
-    # ⚠️ many=True: obbligatorio quando serializzi LISTE/QuerySet
+    # ?fields=id,nome → SELECT id, nome FROM software
+    campi = campi_richiesti(request)
+    faccette = leggi_faccette(request)
+    
+    modalita = modalita_streaming(request)
+    if modalita:
+        righe = righe_queryset(righe_software(software_list, campi))
+        # In JSON le faccette vanno in testa; senza faccette resta un array semplice
+        intestazione = faccette_risposta(software_list, faccette) or None
+        return risposta_streaming(modalita, righe, partial(serializza_riga, campi=campi), intestazione)
+    
+    if usa_paginazione(request):
+        # SELECT * FROM software WHERE id > <cursore> ORDER BY id LIMIT 51
+        # named=True: la paginazione legge i valori delle colonne per nome (riga.id)
+        # extra: le colonne di ordinamento servono al cursore anche se escluse da ?fields=
+        righe = righe_software(software_list, campi, named=True, extra=COLONNE_ORDINAMENTO)
+        pagina, meta = pagina_keyset(request, righe)
+        return Response({
+            **meta,
+            'software': serializza_righe(pagina, campi),
+            # Conteggi su TUTTO il catalogo, non sulla pagina (in cache tra una pagina e l'altra)
+            **faccette_risposta(software_list, faccette),
+        }, status=status.HTTP_200_OK)
+    
+    # ⚠️ Con il percorso DRF: SoftwareSerializer(software_list, many=True).data
+    # many=True: obbligatorio quando serializzi LISTE/QuerySet
     # Senza many=True → errore!
-    serializer = SoftwareSerializer(software_list, many=True)
+    dati = serializza_righe(righe_software(software_list, campi), campi)
     
-    # serializer.data = dizionario Python, Response → JSON automaticamente
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    if faccette:
+        return Response({
+            'count': len(dati),
+            'software': dati,
+            **faccette_risposta(software_list, faccette),
+        }, status=status.HTTP_200_OK)
+    
+    # Lista di dizionari Python, Response → JSON automaticamente
+    return Response(dati, status=status.HTTP_200_OK)
 
 
 @api_view(['GET'])
+@budget_query(1)
+@etag_catalogo('dettaglio_software')
 def dettaglio_software(request, software_id):
     """
     GET /api/software/5/
     Restituisce UN SOLO software.
     
+    GET /api/software/5/?fields=id,nome,versione → solo quei campi
+    
+    ⚠️ Le risposte stanno in una cache in memoria (vedi cache_dettagli in
+    api/cache.py), anche quelle 404: si invalidano da sole con i signals
+    quando il software viene creato, modificato o eliminato.
+    
     Args:
         software_id: catturato da <int:software_id> nell'URL
     """
-    try:
-        # .get(): restituisce 1 oggetto o solleva DoesNotExist
-        # SELECT * FROM software WHERE id = software_id LIMIT 1
-        software = Software.objects.get(id=software_id)
+    campi = campi_richiesti(request)
+    
+    dati = leggi_dettaglio(software_id)
+    if dati is CacheLRU.MANCANTE:
+        generazione = generazione_catalogo()  # letta PRIMA della query
+        try:
+            # .get(): restituisce 1 oggetto o solleva DoesNotExist
+            # SELECT * FROM software WHERE id = software_id LIMIT 1
+            # ⚠️ Tutti i campi (non solo ?fields=): il dizionario completo va in cache
+            software = righe_software(Software.objects.all()).get(id=software_id)
+            
+            # ⚠️ NO many=True per singoli oggetti: SoftwareSerializer(software).data
+            dati = serializza_riga(software)
         
-        # ⚠️ NO many=True per singoli oggetti
-        serializer = SoftwareSerializer(software)
+        except Software.DoesNotExist:
+            # ⚠️ Gestisci sempre DoesNotExist per evitare crash
+            dati = None  # In cache anche il "non esiste" (per poco tempo)
         
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        salva_dettaglio(software_id, dati, generazione)
     
-    except Software.DoesNotExist:
-        # ⚠️ Gestisci sempre DoesNotExist per evitare crash
+    if dati is None:
         return Response(
             {'errore': 'Software non trovato'}, 
             status=status.HTTP_404_NOT_FOUND
         )
+    
+    if campi is not None:
+        # Stesso ordine delle chiavi del serializer (campi è già in quell'ordine)
+        dati = {nome: dati[nome] for nome in campi}
+    
+    return Response(dati, status=status.HTTP_200_OK)
 
 
 # --- CRUD: CREATE (POST) ---
 
 @api_view(['POST'])
+@budget_query(2)  # l'INSERT (+1 con client SSE connessi: token dell'evento, api/signals.py)
 def crea_software(request):
     """
     POST /api/software/create/
@@ -134,6 +299,8 @@ def crea_software(request):
     # raise_exception=True: se fallisce → 400 automatico con errori
     if serializer.is_valid(raise_exception=True):
         # .save(): INSERT INTO software (...) VALUES (...)
+        # ⚠️ save() invia post_save → la cache delle letture si invalida da sola
+        # (vedi api/signals.py): vale per tutte le view di scrittura e per l'admin
         serializer.save()
         
         # ⚠️ 201 CREATED (non 200) per nuove risorse
@@ -146,7 +313,26 @@ def crea_software(request):
 
 # --- CRUD: UPDATE (PUT) ---
 
+def _aggiorna_in_una_query(connessione, software_id, serializer):
+    """
+    PUT / PATCH veloci: UPDATE ... RETURNING (api/scritture.py).
+    La risposta è la riga restituita dal database, token dell'evento compreso.
+    """
+    riga, token = aggiorna_riga(connessione, software_id, serializer.validated_data, list(serializer.fields))
+    if riga is None:
+        return Response(
+            {'errore': 'Software non trovato'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    # Nessun post_save (vedi api/signals.py): le cache vanno avvisate qui
+    catalogo_modificato.send(sender=Software, azione='update', ids=[software_id], token=token)
+    return Response(SoftwareSerializer(Software(**riga)).data, status=status.HTTP_200_OK)
+
+
 @api_view(['PUT'])
+# 1: UPDATE ... RETURNING. Percorso classico (receiver esterni, database senza
+# RETURNING): SELECT + UPDATE, +1 con client SSE connessi (token dell'evento)
+@budget_query(3)
 def aggiorna_software(request, software_id):
     """
     PUT /api/software/5/update/
@@ -166,6 +352,16 @@ def aggiorna_software(request, software_id):
         "data_rilascio": "2024-01-15"
     }
     """
+    connessione = connections[router.db_for_write(Software)]
+    if aggiornamento_veloce_possibile() and returning_disponibile(connessione):
+        # UNA query, senza leggere prima la riga vecchia:
+        # UPDATE api_software SET ... WHERE id = software_id RETURNING ...
+        # ⚠️ Il body si valida PRIMA di sapere se l'id esiste: id inesistente
+        # con body non valido → 400 (non 404)
+        serializer = SoftwareSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return _aggiorna_in_una_query(connessione, software_id, serializer)
+    
     try:
         software = Software.objects.get(id=software_id)
         
@@ -192,6 +388,7 @@ def aggiorna_software(request, software_id):
 # --- CRUD: UPDATE (PATCH) ---
 
 @api_view(['PATCH'])
+@budget_query(3)  # come PUT: 1 con UPDATE ... RETURNING, fino a 3 nel percorso classico
 def aggiorna_parziale_software(request, software_id):
     """
     PATCH /api/software/5/patch/
@@ -205,6 +402,15 @@ def aggiorna_parziale_software(request, software_id):
     ⚠️ partial=True è CRITICO per PATCH!
     Senza di esso → errore se mancano campi obbligatori
     """
+    connessione = connections[router.db_for_write(Software)]
+    if aggiornamento_veloce_possibile() and returning_disponibile(connessione):
+        serializer = SoftwareSerializer(data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        # Body vuoto ({}): niente da scrivere, solo da leggere → percorso classico
+        if serializer.validated_data:
+            # I campi non inviati li restituisce RETURNING: sono quelli salvati
+            return _aggiorna_in_una_query(connessione, software_id, serializer)
+    
     try:
         software = Software.objects.get(id=software_id)
         
@@ -232,6 +438,7 @@ def aggiorna_parziale_software(request, software_id):
 # --- CRUD: DELETE ---
 
 @api_view(['DELETE'])
+@budget_query(3)  # come PUT: 1 con DELETE ... RETURNING, fino a 3 nel percorso classico
 def elimina_software(request, software_id):
     """
     DELETE /api/software/5/delete/
@@ -243,6 +450,23 @@ def elimina_software(request, software_id):
     - 200 OK con messaggio di conferma
     - 204 NO CONTENT (nessun body, solo status code)
     """
+    connessione = connections[router.db_for_write(Software)]
+    if cancellazione_veloce_possibile() and returning_disponibile(connessione):
+        # UNA query: DELETE ... RETURNING nome (api/scritture.py).
+        # Nessuna riga → l'id non esiste
+        riga, token = elimina_riga(connessione, software_id, ['nome'])
+        if riga is None:
+            return Response(
+                {'errore': 'Software non trovato'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        # Nessun post_delete (vedi api/signals.py): le cache vanno avvisate qui
+        catalogo_modificato.send(sender=Software, azione='delete', ids=[software_id], token=token)
+        return Response(
+            {'messaggio': f'Software "{riga["nome"]}" eliminato con successo'},
+            status=status.HTTP_200_OK
+        )
+    
     try:
         software = Software.objects.get(id=software_id)
         
@@ -266,30 +490,391 @@ def elimina_software(request, software_id):
         )
 
 
+# --- OPERAZIONI DI MASSA (BULK) ---
+# Una richiesta HTTP = MOLTE righe: meno round trip e query raggruppate.
+# ⚠️ bulk_create(), update() e delete() su queryset NON inviano post_save /
+# post_delete: alla fine si invia a mano catalogo_modificato (api/signals.py),
+# altrimenti le cache continuerebbero a servire i dati vecchi.
+
+def _body_lista(request, massimo):
+    """
+    Controlla che il body sia una lista JSON non vuota di al massimo 'massimo' elementi.
+    Restituisce (lista, None) oppure (None, Response di errore 400).
+    """
+    elementi = request.data
+    if not isinstance(elementi, list) or not elementi:
+        return None, Response(
+            {'errore': 'Il body deve essere una lista JSON non vuota'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if len(elementi) > massimo:
+        return None, Response(
+            {'errore': f'Al massimo {massimo} elementi per richiesta (ricevuti {len(elementi)})'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return elementi, None
+
+
+@api_view(['POST'])
+def crea_software_bulk(request):
+    """
+    POST /api/software/bulk/
+    Crea MOLTI software con una sola richiesta.
+    
+    Body JSON: lista di oggetti, ognuno come per POST /api/software/create/
+    [
+        {"nome": "Photoshop", "versione": "25.0", "produttore": "Adobe", ...},
+        {"nome": "VS Code", "versione": "1.86", "produttore": "Microsoft", ...}
+    ]
+    
+    Query string:
+        ?parziale=1  inserisce comunque gli elementi validi (default: tutto o niente)
+    
+    Risposta 201 (tutti creati):
+    {"creati": 2, "errori": 0, "risultati": [{"indice": 0, "id": 7}, {"indice": 1, "id": 8}]}
+    
+    Risposta 400 (qualche elemento non valido, NIENTE creato):
+    {"creati": 0, "errori": 1, "risultati": [{"indice": 0, "id": null},
+                                             {"indice": 1, "errori": {"prezzo": [...]}}]}
+    
+    Risposta 207 (con ?parziale=1: creati solo quelli validi)
+    
+    ⚠️ Tutti gli elementi vengono VALIDATI prima di inserire qualunque cosa;
+    poi gli INSERT partono a blocchi di BULK_BATCH_SIZE righe (bulk_create)
+    dentro UNA transazione: 10.000 righe = poche decine di query invece di 10.000.
+    (Django riduce il blocco se il database ha un limite di parametri per
+    query: SQLite 999 → 142 righe da 7 colonne per INSERT)
+    """
+    elementi, errore = _body_lista(request, impostazione('BULK_MAX_ELEMENTI'))
+    if errore:
+        return errore
+    
+    # UN solo serializer per tutti gli elementi: crearne uno per elemento
+    # costerebbe più della validazione stessa (DRF ricostruisce i campi ogni volta)
+    validatore = SoftwareSerializer()
+    
+    risultati = []
+    da_creare = []  # (indice nella lista, oggetto Software non ancora salvato)
+    for indice, elemento in enumerate(elementi):
+        try:
+            dati_validi = validatore.run_validation(elemento)
+        except serializers.ValidationError as exc:
+            risultati.append({'indice': indice, 'errori': exc.detail})
+            continue
+        oggetto = Software(**dati_validi)
+        risultati.append({'indice': indice, 'id': None})  # id assegnato dopo l'INSERT
+        da_creare.append((indice, oggetto))
+    
+    numero_errori = len(elementi) - len(da_creare)
+    parziale = request.query_params.get('parziale') in ('1', 'true')
+    
+    if numero_errori and (not parziale or not da_creare):
+        return Response(
+            {'creati': 0, 'errori': numero_errori, 'risultati': risultati},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    # INSERT INTO software (...) VALUES (...), (...), ... a blocchi
+    # ⚠️ transaction.atomic(): se un blocco fallisce, nessuna riga resta inserita
+    with transaction.atomic():
+        Software.objects.bulk_create(
+            [oggetto for _, oggetto in da_creare],
+            batch_size=impostazione('BULK_BATCH_SIZE'),
+        )
+    
+    # bulk_create() assegna gli id agli oggetti (SQLite 3.35+, PostgreSQL, ...)
+    ids = []
+    for indice, oggetto in da_creare:
+        risultati[indice]['id'] = oggetto.pk
+        ids.append(oggetto.pk)
+    
+    catalogo_modificato.send(sender=Software, azione='create', ids=ids)
+    
+    return Response(
+        {'creati': len(da_creare), 'errori': numero_errori, 'risultati': risultati},
+        status=status.HTTP_207_MULTI_STATUS if numero_errori else status.HTTP_201_CREATED
+    )
+
+
+# Id per singola query "... WHERE id IN (...)": resta lontano dai limiti di
+# parametri per query dei database (SQLite vecchi: 999)
+_BLOCCO_ID = 500
+
+
+def _a_blocchi(elementi, dimensione):
+    """[1, 2, 3, 4, 5] a blocchi di 2 → [1, 2], [3, 4], [5]"""
+    for inizio in range(0, len(elementi), dimensione):
+        yield elementi[inizio:inizio + dimensione]
+
+
+def _valida_modifiche(validatore, modifiche):
+    """
+    Valida le modifiche di un PATCH di massa con un serializer partial=True.
+    Restituisce i dati validati oppure solleva ValidationError.
+    
+    ⚠️ Un campo sconosciuto (o di sola lettura, come 'id') è un ERRORE:
+    DRF di suo lo ignorerebbe in silenzio e il client penserebbe di averlo modificato.
+    """
+    if not isinstance(modifiche, dict) or not modifiche:
+        raise serializers.ValidationError({'changes': ['Deve essere un oggetto JSON non vuoto.']})
+    modificabili = {nome for nome, campo in validatore.fields.items() if not campo.read_only}
+    sconosciuti = [nome for nome in modifiche if nome not in modificabili]
+    if sconosciuti:
+        raise serializers.ValidationError({'changes': [
+            f'Campi non modificabili: {", ".join(sconosciuti)}.'
+        ]})
+    return validatore.run_validation(modifiche)
+
+
+@api_view(['PATCH'])
+def aggiorna_software_bulk(request):
+    """
+    PATCH /api/software/bulk/patch/
+    Aggiornamento PARZIALE di MOLTI software con una sola richiesta.
+    
+    Forma 1 - lista di modifiche per id:
+    [
+        {"id": 1, "changes": {"prezzo": "19.99"}},
+        {"id": 2, "changes": {"prezzo": "29.99"}},
+        {"id": 3, "changes": {"versione": "2.0", "gratuito": true}}
+    ]
+    → gli elementi vengono raggruppati per INSIEME di campi modificati
+      ({prezzo}: id 1 e 2, {versione, gratuito}: id 3) e ogni gruppo diventa
+      un bulk_update(): UPDATE ... SET prezzo = CASE id WHEN 1 THEN ... END
+      WHERE id IN (1, 2)
+    
+    Query string (solo forma 1):
+        ?parziale=1  applica comunque le modifiche valide (default: tutto o niente)
+    
+    Risposta 200:
+    {"aggiornati": 3, "errori": 0, "risultati": [{"indice": 0, "id": 1, "aggiornato": true}, ...]}
+    Risposta 400 / 207: come POST /api/software/bulk/ (id inesistenti = errori)
+    
+    Forma 2 - modifica con filtro (UNA sola query UPDATE):
+    {"filtro": {"produttore": "Adobe"}, "changes": {"gratuito": true, "prezzo": "0.00"}}
+    → UPDATE api_software SET gratuito = 1, prezzo = '0.00'
+      WHERE LOWER(produttore) = LOWER('Adobe')
+    Filtri ammessi: vedi api/filtri.py (almeno uno è obbligatorio)
+    
+    Risposta 200: {"aggiornati": 42}
+    
+    ⚠️ Nessun SELECT delle righe complete e nessun save() per elemento:
+    a differenza di PATCH /api/software/5/patch/ vengono scritte solo le
+    colonne modificate.
+    """
+    validatore = SoftwareSerializer(partial=True)  # partial: i campi assenti non sono obbligatori
+    
+    if isinstance(request.data, dict):
+        try:
+            filtro = leggi_filtri(request.data.get('filtro'), obbligatori=True)
+            modifiche = _valida_modifiche(validatore, request.data.get('changes'))
+        except serializers.ValidationError as exc:
+            return Response(exc.detail, status=status.HTTP_400_BAD_REQUEST)
+        
+        # .update(): UNA query UPDATE ... WHERE, nessun oggetto caricato in memoria
+        aggiornati = Software.objects.filter(filtro).update(**modifiche)
+        if aggiornati:
+            # Quali id sono cambiati non si sa (servirebbe un'altra query): ids=None
+            catalogo_modificato.send(sender=Software, azione='update', ids=None)
+        return Response({'aggiornati': aggiornati}, status=status.HTTP_200_OK)
+    
+    elementi, errore = _body_lista(request, impostazione('BULK_MAX_ELEMENTI'))
+    if errore:
+        return errore
+    
+    risultati = []
+    validi = {}  # id → (indice, modifiche validate)
+    for indice, elemento in enumerate(elementi):
+        software_id = elemento.get('id') if isinstance(elemento, dict) else None
+        try:
+            if not isinstance(software_id, int) or isinstance(software_id, bool):
+                raise serializers.ValidationError({'id': ['Serve un id intero.']})
+            if software_id in validi:
+                # Due modifiche allo stesso id nella stessa richiesta: quale vince?
+                raise serializers.ValidationError({'id': ['Id duplicato nella richiesta.']})
+            modifiche = _valida_modifiche(validatore, elemento.get('changes'))
+        except serializers.ValidationError as exc:
+            risultati.append({'indice': indice, 'id': software_id, 'errori': exc.detail})
+            continue
+        risultati.append({'indice': indice, 'id': software_id, 'aggiornato': False})
+        validi[software_id] = (indice, modifiche)
+    
+    # Id inesistenti: UNA query che legge solo gli id (dall'indice della primary key)
+    esistenti = set()
+    for blocco in _a_blocchi(list(validi), _BLOCCO_ID):
+        esistenti.update(Software.objects.filter(id__in=blocco).values_list('id', flat=True))
+    for software_id in [i for i in validi if i not in esistenti]:
+        indice, _ = validi.pop(software_id)
+        risultati[indice]['errori'] = {'id': ['Software non trovato.']}
+        del risultati[indice]['aggiornato']
+    
+    numero_errori = len(elementi) - len(validi)
+    parziale = request.query_params.get('parziale') in ('1', 'true')
+    
+    if numero_errori and (not parziale or not validi):
+        return Response(
+            {'aggiornati': 0, 'errori': numero_errori, 'risultati': risultati},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    # Raggruppa per insieme di campi modificati: un bulk_update() per gruppo
+    gruppi = {}
+    for software_id, (_, modifiche) in validi.items():
+        # Software(id=..., ...) SENZA leggere la riga: bulk_update scrive solo i campi indicati
+        gruppi.setdefault(frozenset(modifiche), []).append(Software(id=software_id, **modifiche))
+    
+    with transaction.atomic():
+        for campi, oggetti in gruppi.items():
+            Software.objects.bulk_update(
+                oggetti, sorted(campi), batch_size=impostazione('BULK_BATCH_SIZE')
+            )
+    
+    for indice, _ in validi.values():
+        risultati[indice]['aggiornato'] = True
+    
+    catalogo_modificato.send(sender=Software, azione='update', ids=list(validi))
+    
+    return Response(
+        {'aggiornati': len(validi), 'errori': numero_errori, 'risultati': risultati},
+        status=status.HTTP_207_MULTI_STATUS if numero_errori else status.HTTP_200_OK
+    )
+
+
+def _elimina(ids, veloce):
+    """
+    DELETE delle righe con questi id (al massimo _BLOCCO_ID). Restituisce il
+    numero di righe eliminate.
+    
+    - veloce=True (vedi cancellazione_veloce_possibile()): DELETE FROM api_software
+      WHERE id IN (...) diretta, nessun oggetto caricato (api/scritture.py).
+      ⚠️ Il chiamante deve poi inviare catalogo_modificato.
+    - veloce=False (qualcun altro ascolta pre_delete / post_delete): queryset.delete()
+      classico, che carica gli oggetti e invia i signal (anche il nostro).
+    """
+    if veloce:
+        return elimina_righe(connections[router.db_for_write(Software)], ids)
+    _, per_modello = Software.objects.filter(id__in=ids).delete()
+    return per_modello.get(Software._meta.label, 0)
+
+
+@api_view(['DELETE'])
+def elimina_software_bulk(request):
+    """
+    DELETE /api/software/bulk/delete/
+    Elimina MOLTI software con una sola richiesta, SENZA caricarli come oggetti.
+    
+    Body JSON, una delle due forme:
+        {"ids": [1, 2, 3]}
+        {"filtro": {"produttore": "Adobe", "gratuito": false}}
+    Filtri ammessi: gli stessi di PATCH /api/software/bulk/patch/ (api/filtri.py)
+    
+    Risposta 200: {"eliminati": 3}
+    (gli id inesistenti vengono semplicemente ignorati)
+    
+    SQL:
+        ids    → DELETE FROM api_software WHERE id IN (...)  a blocchi di 500 id
+        filtro → SELECT id FROM api_software WHERE LOWER(produttore) = LOWER('Adobe') AND ...
+                 (solo gli id, dall'indice), poi come sopra
+    
+    ⚠️ IRREVERSIBILE, e con un filtro può eliminare migliaia di righe:
+    almeno un filtro è obbligatorio (niente "cancella tutto" per sbaglio).
+    """
+    dati = request.data
+    if not isinstance(dati, dict) or ('ids' in dati) == ('filtro' in dati):
+        return Response(
+            {'errore': 'Il body deve contenere "ids" oppure "filtro" (uno solo dei due)'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    veloce = cancellazione_veloce_possibile()
+    
+    if 'filtro' in dati:
+        try:
+            filtro = leggi_filtri(dati['filtro'], obbligatori=True)
+        except serializers.ValidationError as exc:
+            return Response(exc.detail, status=status.HTTP_400_BAD_REQUEST)
+        
+        ids = Software.objects.filter(filtro).values_list('id', flat=True)
+    else:
+        ids = dati['ids']
+        massimo = impostazione('BULK_MAX_ELEMENTI')
+        if (not isinstance(ids, list) or not ids
+                or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids)):
+            return Response(
+                {'ids': ['Deve essere una lista non vuota di id interi.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(ids) > massimo:
+            return Response(
+                {'errore': f'Al massimo {massimo} id per richiesta (ricevuti {len(ids)})'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+    
+    eliminati = 0
+    # Tutti i blocchi in UNA transazione: o spariscono tutti o nessuno
+    # (con il filtro, anche la lettura degli id)
+    with transaction.atomic():
+        ids_eliminati = sorted(set(ids))
+        for blocco in _a_blocchi(ids_eliminati, _BLOCCO_ID):
+            eliminati += _elimina(blocco, veloce)
+    
+    if eliminati and veloce:
+        # Percorso veloce: nessun post_delete è partito, le cache vanno avvisate qui
+        catalogo_modificato.send(sender=Software, azione='delete', ids=ids_eliminati)
+    
+    return Response({'eliminati': eliminati}, status=status.HTTP_200_OK)
+
+
 # --- QUERY AVANZATE: FILTRI ---
 
 @api_view(['GET'])
+@budget_query(2)  # +1 con ?facets=
+@renderer_classes(RENDERER_CATALOGO)
+@lettura_da_replica
+@etag_catalogo('software_gratuiti')
+@cache_catalogo('software_gratuiti')
 def software_gratuiti(request):
     """
     GET /api/software/gratuiti/
     Restituisce solo software gratuiti.
     
     Esempio di filtering con Django ORM.
+    Supporta lo streaming come lista_software (?stream=1 o NDJSON)
+    e le faccette (?facets=produttore,anno).
     """
     # .filter(): filtra risultati (può restituire 0+ oggetti)
     # SQL: SELECT * FROM software WHERE gratuito = TRUE
-    software_list = Software.objects.filter(gratuito=True)
+    # ⚠️ gratuito_uguale(True) e non gratuito=True: solo così SQLite usa l'indice
+    # (vedi api/filtri.py)
+    software_list = Software.objects.filter(gratuito_uguale(True))
+    campi = campi_richiesti(request)
+    faccette = leggi_faccette(request)
     
-    serializer = SoftwareSerializer(software_list, many=True)
+    modalita = modalita_streaming(request)
+    if modalita:
+        # ⚠️ In streaming "count" arriva in fondo alla risposta
+        righe = righe_queryset(righe_software(software_list, campi))
+        return risposta_streaming(
+            modalita, righe, partial(serializza_riga, campi=campi),
+            faccette_risposta(software_list, faccette),
+        )
+    
+    dati = serializza_righe(righe_software(software_list, campi), campi)
     
     # Risposta con metadati aggiuntivi
     return Response({
-        'count': len(serializer.data),  # Numero risultati
-        'software': serializer.data
+        'count': len(dati),  # Numero risultati
+        'software': dati,
+        **faccette_risposta(software_list, faccette),
     }, status=status.HTTP_200_OK)
 
 
 @api_view(['GET'])
+@budget_query(2)  # +1 con ?facets=
+@renderer_classes(RENDERER_CATALOGO)
+@lettura_da_replica
+@etag_catalogo('software_per_produttore')
+@cache_catalogo('software_per_produttore')
 def software_per_produttore(request, produttore):
     """
     GET /api/software/produttore/Adobe/
@@ -307,24 +892,387 @@ def software_per_produttore(request, produttore):
     - __gt / __gte: maggiore / maggiore-uguale
     - __lt / __lte: minore / minore-uguale
     - __in: in lista → produttore__in=['Adobe', 'Microsoft']
+    
+    ⚠️ Qui però NON si usa __iexact: su SQLite diventa "produttore LIKE 'Adobe'",
+    che non può usare indici → lettura dell'intera tabella. produttore_uguale()
+    (api/filtri.py) dà lo stesso risultato usando l'indice su LOWER(produttore).
+    
+    Supporta lo streaming come lista_software (?stream=1 o NDJSON)
+    e le faccette (?facets=gratuito,anno).
     """
     # SQL: SELECT * FROM software WHERE LOWER(produttore) = LOWER('Adobe')
-    software_list = Software.objects.filter(produttore__iexact=produttore)
+    software_list = Software.objects.filter(produttore_uguale(produttore))
+    campi = campi_richiesti(request)
+    faccette = leggi_faccette(request)
     
-    # ⚠️ .exists(): più efficiente di len() o .count() per check booleani
-    # Ferma la query appena trova 1 match
-    if not software_list.exists():
+    modalita = modalita_streaming(request)
+    if modalita:
+        # Legge subito la prima riga: se non esiste → 404 (come senza streaming)
+        prima, righe = prima_riga(righe_queryset(righe_software(software_list, campi)))
+        if prima is None:
+            return Response(
+                {'messaggio': f'Nessun software trovato per il produttore "{produttore}"'}, 
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return risposta_streaming(
+            modalita, righe, partial(serializza_riga, campi=campi),
+            {'produttore': produttore, **faccette_risposta(software_list, faccette)},
+        )
+    
+    # ⚠️ UNA sola query: le righe servono comunque, e bastano sia per il 404
+    # (lista vuota) sia per "count" (len). .exists() + .count() + la lista
+    # sarebbero 3 round trip con lo stesso WHERE.
+    # (.exists() conviene solo quando le righe NON servono: si ferma al primo match)
+    dati = serializza_righe(righe_software(software_list, campi), campi)
+    
+    if not dati:
         return Response(
             {'messaggio': f'Nessun software trovato per il produttore "{produttore}"'}, 
             status=status.HTTP_404_NOT_FOUND
         )
     
-    serializer = SoftwareSerializer(software_list, many=True)
-    
     return Response({
         'produttore': produttore,
-        'count': software_list.count(),  # Conta risultati (query COUNT(*))
-        'software': serializer.data
+        'count': len(dati),  # Niente query COUNT(*): le righe sono già in memoria
+        'software': dati,
+        **faccette_risposta(software_list, faccette),
+    }, status=status.HTTP_200_OK)
+
+
+# Parametri di GET /api/software/filtra/ che NON sono filtri
+_PARAMETRI_FILTRA = ('limit', 'cursor', 'ordering', 'totale', 'fields', 'exclude', 'facets', 'format')
+
+
+@api_view(['GET'])
+@budget_query(3)  # la pagina (+1 con ?totale=1, +1 con ?facets=)
+@lettura_da_replica
+@etag_catalogo('filtra_software')
+@cache_catalogo('filtra_software')
+def filtra_software(request):
+    """
+    GET /api/software/filtra/?rilascio_da=2026-01-01&ordering=prezzo&limit=50
+    Filtri combinabili + ordinamento + paginazione a cursore:
+    "i 50 più economici usciti quest'anno" in UNA query sugli indici.
+    
+    Filtri (tutti facoltativi, in AND, vedi api/filtri.py):
+        prezzo_min / prezzo_max     prezzo >= / <=
+        rilascio_da / rilascio_a    data_rilascio >= / <= (YYYY-MM-DD)
+        gratuito=true|false
+        produttore=Adobe            (maiuscole/minuscole non contano)
+        produttore__in=Adobe,GNOME
+    
+    Ordinamento: ?ordering=prezzo | -prezzo | data_rilascio | -data_rilascio | id | -id
+    ⚠️ Solo colonne con un indice (ORDINAMENTI in api/paginazione.py): un
+    ordinamento senza indice = ordinare TUTTE le righe filtrate a ogni pagina.
+    
+    Risposta: {"next": "...?cursor=...", "prev": null, "software": [...]}
+    (+ "count_stimato" con ?totale=1 e "facets" con ?facets=, come GET /api/software/)
+    ⚠️ Un nome di filtro sbagliato (es. prezo_min) è un errore 400, non un
+    filtro ignorato in silenzio.
+    """
+    condizione = leggi_filtri({
+        nome: valore for nome, valore in request.query_params.items() if nome not in _PARAMETRI_FILTRA
+    })
+    software_list = Software.objects.filter(condizione)
+    campi = campi_richiesti(request)
+    faccette = leggi_faccette(request)
+    
+    # SELECT ... WHERE data_rilascio >= '2026-01-01' ORDER BY prezzo, id LIMIT 51
+    righe = righe_software(software_list, campi, named=True, extra=COLONNE_ORDINAMENTO)
+    pagina, meta = pagina_keyset(request, righe)
+    
+    return Response({
+        **meta,
+        'software': serializza_righe(pagina, campi),
+        **faccette_risposta(software_list, faccette),
+    }, status=status.HTTP_200_OK)
+
+
+# --- STATISTICHE (TABELLA RIASSUNTIVA) ---
+
+@api_view(['GET'])
+@budget_query(1)
+@lettura_da_replica
+@etag_catalogo('statistiche_software')
+@cache_catalogo('statistiche_software')
+def statistiche_software(request):
+    """
+    GET /api/software/stats/[?gratuito=false][&produttore=Adobe]
+    Numero di software e prezzi (totale, medio, minimo, massimo) per
+    produttore, più il totale del catalogo.
+    
+    Risposta:
+    {"count": 2,
+     "totale": {"numero": 3, "gratuiti": 1, "prezzo_totale": "249.87", "prezzo_medio": "83.29", ...},
+     "produttori": [{"produttore": "Adobe", "numero": 2, "gratuiti": 0, ...}, ...]}
+    count = numero di produttori
+    
+    Filtri facoltativi con lo stesso vocabolario delle operazioni di massa
+    (api/filtri.py): ?gratuito=true|false, ?produttore=Adobe, ?produttore__in=Adobe,GNOME.
+    
+    ⚠️ Legge la tabella riassuntiva api_statisticaproduttore (una riga per
+    produttore, aggiornata dai trigger: api/statistiche.py), non api_software:
+    stesso costo con 100 o 10 milioni di software.
+    """
+    # Solo i parametri che sono filtri (?format=json & co. restano a DRF)
+    condizione = leggi_filtri({
+        nome: valore for nome, valore in request.query_params.items() if nome in FILTRI
+    }, ammessi=FILTRI_STATISTICHE)
+    statistiche = statistiche_catalogo(righe_statistiche(condizione))
+    
+    return Response({
+        'count': len(statistiche['produttori']),
+        **statistiche,
+    }, status=status.HTTP_200_OK)
+
+
+# --- ULTIMA VERSIONE PER NOME (WINDOW FUNCTION) ---
+
+@api_view(['GET'])
+@budget_query(1)
+@lettura_da_replica
+@etag_catalogo('ultime_versioni_software')
+@cache_catalogo('ultime_versioni_software')
+def ultime_versioni_software(request):
+    """
+    GET /api/software/latest/[?limit=50][&dopo=Photoshop][&produttore=Adobe][&fields=id,nome,versione]
+    L'ultima versione di ogni software (un elemento per nome), in ordine di nome.
+    
+    Risposta:
+    {"next": "...?dopo=VS+Code", "count": 50,
+     "software": [{"id": 7, "nome": "Photoshop", "versione": "25.1", ...}, ...]}
+    
+    "Ultima" secondo versione_ordinabile (api/versioni.py): 10.0 dopo 9.1,
+    2.0 dopo 2.0-rc.1. A parità di versione vince la riga inserita per ultima.
+    Filtri facoltativi: quelli di api/filtri.py (es. ?gratuito=true), applicati
+    PRIMA di scegliere l'ultima versione.
+    
+    ⚠️ UNA query con una window function, niente righe caricate in Python:
+        SELECT * FROM (
+            SELECT ..., ROW_NUMBER() OVER (
+                PARTITION BY nome ORDER BY versione_ordinabile DESC, id DESC
+            ) AS posizione
+            FROM api_software WHERE nome > 'Photoshop'
+        ) WHERE posizione = 1 ORDER BY nome LIMIT 51
+    L'indice (nome, -versione_ordinabile, -id) fornisce le righe già nell'ordine
+    della window: SQLite si ferma dopo 'limit' nomi invece di ordinare il catalogo
+    (per questo, su SQLite, niente ORDER BY nome esterno: vedi sotto).
+    """
+    limit = leggi_limit(request)
+    dopo = request.query_params.get('dopo')
+    # Solo i parametri che sono filtri (?format=json & co. restano a DRF)
+    condizione = leggi_filtri({
+        nome: valore for nome, valore in request.query_params.items() if nome in FILTRI
+    })
+    if dopo is not None:
+        # Paginazione keyset sul nome: ogni nome è una partizione intera,
+        # filtrare PRIMA della window non cambia l'ultima versione
+        condizione &= Q(nome__gt=dopo)
+    
+    ultime = Software.objects.filter(condizione).annotate(posizione=Window(
+        RowNumber(),
+        partition_by=[F('nome')],
+        order_by=[F('versione_ordinabile').desc(), F('id').desc()],
+    )).filter(posizione=1).order_by()
+    # ⚠️ Su SQLite le righe escono dalla window GIÀ in ordine di nome (l'ordine
+    # dell'indice): un ORDER BY nome esterno costringerebbe a calcolare la
+    # window su TUTTO il catalogo prima del LIMIT (~450 ms invece di ~2 ms
+    # con 200.000 righe). Gli altri database non lo garantiscono.
+    if connections[router.db_for_read(Software)].vendor != 'sqlite':
+        ultime = ultime.order_by('nome')
+    campi = campi_richiesti(request)
+    
+    # extra=('nome',): serve per "next" anche con ?fields= senza nome
+    righe = list(righe_software(ultime, campi, named=True, extra=('nome',))[:limit + 1])
+    url = request.build_absolute_uri()
+    prossima = None
+    if len(righe) > limit:
+        righe = righe[:limit]
+        prossima = replace_query_param(url, 'dopo', righe[-1].nome)
+    
+    return Response({
+        'next': prossima,
+        'count': len(righe),
+        'software': serializza_righe(righe, campi),
+    }, status=status.HTTP_200_OK)
+
+
+# --- FEED DELLE MODIFICHE (SINCRONIZZAZIONE INCREMENTALE) ---
+
+@api_view(['GET'])
+@budget_query(2)  # righe modificate + lapidi
+@lettura_da_replica
+@etag_catalogo('modifiche_software')
+@cache_catalogo('modifiche_software')
+def modifiche_software(request):
+    """
+    GET /api/software/changes/?since=<token>[&limit=500][&fields=id,nome,versione]
+    Solo i software creati, modificati o eliminati DOPO il token.
+    
+    Risposta:
+    {"since": 1200, "token": 1234, "next": null,
+     "software": [{"id": 7, "nome": "GIMP", ...}, ...],   ← stato ATTUALE delle righe
+     "eliminati": [3, 12]}                                ← id da togliere
+    
+    Uso tipico di un mirror:
+        1. prima volta: ?since=0 (tutto il catalogo, a pagine)
+        2. applica "software" ed "eliminati" alla copia locale
+        3. se "next" non è null: seguilo (altre modifiche già disponibili)
+        4. salva "token": alla prossima sincronizzazione ?since=<token>
+    
+    ⚠️ Ogni riga compare UNA volta, con il suo stato attuale, anche se è stata
+    modificata 10 volte dopo il token: il costo dipende da QUANTE righe sono
+    cambiate, non dal numero di modifiche né dalla dimensione del catalogo.
+    Solo SQLite (vedi api/modifiche.py): altrove 501 Not Implemented.
+    """
+    if not feed_disponibile(connections[router.db_for_read(Software)]):
+        return Response(
+            {'errore': 'Feed delle modifiche non disponibile con questo database'},
+            status=status.HTTP_501_NOT_IMPLEMENTED
+        )
+    since = leggi_since(request)
+    limit = leggi_limit(request)
+    campi = campi_richiesti(request)
+    
+    # Due seek sugli indici di sequenza, limit + 1 righe ciascuno: le prime
+    # 'limit' modifiche stanno per forza tra queste
+    modificati = righe_software(
+        Software.objects.filter(sequenza__gt=since).order_by('sequenza'),
+        campi, named=True, extra=('sequenza',),
+    )[:limit + 1]
+    eliminati = SoftwareEliminato.objects.filter(sequenza__gt=since).order_by('sequenza').values_list(
+        'software_id', 'sequenza'
+    )[:limit + 1]
+    modificati, eliminati, ultima, altre = unisci_modifiche(modificati, eliminati, limit)
+    
+    token = since if ultima is None else ultima
+    return Response({
+        'since': since,
+        'token': token,
+        'next': replace_query_param(request.build_absolute_uri(), 'since', token) if altre else None,
+        'software': serializza_righe(modificati, campi),
+        'eliminati': eliminati,
+    }, status=status.HTTP_200_OK)
+
+
+
+# --- ESPORTAZIONE DEL CATALOGO (CSV / A COLONNE) ---
+
+@api_view(['GET'])
+@budget_query(1)                          # 0 di solito; 1 se uno snapshot va creato per un Range
+@renderer_classes(RENDERER_ESPORTAZIONE)  # CSV (default) + formato a colonne
+def esporta_software(request):
+    """
+    GET /api/software/export/[?format=csv|colonne][&gzip=1]
+    TUTTO il catalogo come file da scaricare (vedi api/esportazione.py).
+    
+    Risposta: catalogo.csv (text/csv), catalogo.colonne (binario a colonne)
+    oppure catalogo.csv.gz / catalogo.colonne.gz (application/gzip)
+    
+    id,nome,versione,produttore,prezzo,gratuito,data_rilascio
+    1,Photoshop,25.0,Adobe,239.88,false,2023-10-10
+    
+    ⚠️ Memoria costante qualunque sia la dimensione della tabella, e i
+    download interrotti si riprendono con Range + If-Range (206 Partial
+    Content): stessa generazione del catalogo = stessi byte, letti da disco.
+    """
+    gzip = request.query_params.get('gzip') in ('1', 'true')
+    return risposta_esportazione(request, request.accepted_renderer.format, gzip)
+
+
+# --- RICERCA FULL-TEXT ---
+
+@api_view(['GET'])
+@budget_query(1)
+@lettura_da_replica
+@etag_catalogo('cerca_software')
+@cache_catalogo('cerca_software')
+def cerca_software(request):
+    """
+    GET /api/software/search/?q=photo adob[&limit=20][&fields=id,nome]
+    Ricerca testuale su nome e produttore, dal risultato più pertinente.
+    
+    - ogni parola è un PREFISSO: "photo" trova "Photoshop"
+    - tutte le parole devono comparire (AND): "photo adob" → Photoshop di Adobe
+    - maiuscole e accenti non contano: "unix" trova "Ünix"
+    - ordinamento per pertinenza (bm25): una parola nel nome pesa più che nel produttore
+    
+    Risposta: {"q": "photo adob", "count": 1, "software": [{...}]}
+    count = risultati restituiti (al massimo ?limit=, default e massimo
+    come per la paginazione)
+    
+    ⚠️ Indice FTS5 di SQLite (api/ricerca.py): millisecondi anche con milioni
+    di righe, a differenza di search_fields dell'admin (LIKE '%x%' su tutta la tabella).
+    """
+    testo = request.query_params.get('q', '')
+    if not parole(testo):
+        return Response(
+            {'q': ['Serve almeno una parola da cercare.']},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    piano = piano_software.per_campi(campi_richiesti(request))
+    righe = cerca_nel_catalogo(testo, piano.campi, leggi_limit(request))
+    
+    return Response({
+        'q': testo,
+        'count': len(righe),
+        'software': piano.serializza(righe),
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@budget_query(1)  # 0 di solito; 1 quando l'indice va costruito o aggiornato
+def suggerisci_software(request):
+    """
+    GET /api/software/suggest/?q=fotosh[&limit=10]
+    Suggerimenti mentre l'utente scrive: nomi e produttori che INIZIANO con
+    il testo digitato (anche una parola interna: "studio" → "Visual Studio"),
+    tollerando 1-2 errori di battitura.
+    
+    Risposta:
+    {"q": "fotosh", "suggerimenti": [
+        {"testo": "Photoshop", "tipo": "nome", "count": 3, "errori": 2}
+    ]}
+    count = software con quel nome/produttore, errori = lettere sbagliate
+    
+    ⚠️ Nessuna query al database: risponde un indice in memoria
+    (api/suggerimenti.py), aggiornato dai signals a ogni scrittura.
+    """
+    testo = request.query_params.get('q', '')
+    try:
+        limit = int(request.query_params.get('limit', 10))
+    except ValueError:
+        return Response({'limit': ['Deve essere un numero intero.']}, status=status.HTTP_400_BAD_REQUEST)
+    limit = max(1, min(limit, 50))
+    
+    return Response({
+        'q': testo,
+        'suggerimenti': indice_suggerimenti().suggerisci(testo, limit),
+    }, status=status.HTTP_200_OK)
+
+
+# --- CACHE: STATISTICHE ---
+
+@api_view(['GET'])
+@budget_query(0)  # solo memoria
+def statistiche_cache(request):
+    """
+    GET /api/software/cache/
+    Contatori delle cache in memoria (vedi api/cache.py):
+    - risposte: liste e filtri
+    - dettagli: singoli software (GET /api/software/<id>/)
+    - faccette: conteggi di ?facets= (api/faccette.py)
+    
+    Risposta: {"risposte": {"voci": 12, "hit": 340, "miss": 25, "evizioni": 0, "hit_ratio": 0.9315, ...},
+               "dettagli": {...}}
+    ⚠️ I contatori sono PER PROCESSO: con più worker ognuno ha i suoi.
+    Molte "evizioni" con hit_ratio basso → aumentare *_MAX_VOCI in API_CATALOGO.
+    """
+    return Response({
+        'risposte': cache_risposte().statistiche(),
+        'dettagli': cache_dettagli().statistiche(),
+        'faccette': cache_faccette().statistiche(),
     }, status=status.HTTP_200_OK)
 
 
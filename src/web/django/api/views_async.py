@@ -0,0 +1,144 @@
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
+
+from .budget import budget_query
+from .cache import CacheLRU, leggi_dettaglio
+from .conf import impostazione
+from .filtri import gratuito_uguale, produttore_uguale
+from .models import Software
+from .repliche import lettura_da_replica
+from .serializzazione import leggi_campi
+from .views import piano_software
+
+
+# --- VIEW ASYNC DEL CATALOGO ---
+#
+# Stessi dati (stessi byte JSON) delle view di lettura in api/views.py, ma
+# scritte come coroutine ("async def") con l'ORM async di Django:
+#   .aget()          invece di .get()
+#   async for riga   invece di for riga
+#
+# Sotto un server ASGI (uvicorn, daphne, ...) una view sincrona viene eseguita
+# in un thread (sync_to_async): il numero di richieste contemporanee dipende
+# dal pool di thread. Una coroutine resta nel loop di asyncio.
+#
+# Raggiunte tramite /api/async/... e l'handler di api/asgi.py, che usa solo
+# middleware async. ⚠️ DRF (@api_view) non supporta view async: qui si usano
+# view Django "pure" e il JSON lo produce JSONRenderer, come farebbe Response.
+#
+# ⚠️ Niente streaming, paginazione a cursore e cache delle risposte: per quelli
+# restano gli endpoint sincroni /api/software/...
+#
+# ⚠️ Django 5.0: i driver dei database sono ancora sincroni, quindi l'ORM async
+# esegue la query in un thread dedicato (sync_to_async interno). Il guadagno
+# sta in tutto il resto della richiesta (middleware, view, serializzazione).
+
+_renderer = JSONRenderer()
+
+
+def _json(dati, codice=status.HTTP_200_OK):
+    """Come Response(dati, status=codice) di DRF, ma per una view Django async."""
+    return HttpResponse(_renderer.render(dati), content_type='application/json', status=codice)
+
+
+async def _serializza(queryset, campi):
+    """Queryset → lista di dizionari, leggendo le righe con "async for"."""
+    piano = piano_software.per_campi(campi)
+    return piano.serializza([riga async for riga in piano.queryset(queryset)])
+
+
+@require_GET
+@budget_query(1)
+@lettura_da_replica
+async def lista_software_async(request):
+    """
+    GET /api/async/software/
+    Come GET /api/software/ (supporta ?fields= / ?exclude=).
+    """
+    try:
+        campi = leggi_campi(request, piano_software.nomi)
+    except ValidationError as exc:
+        return _json(exc.detail, status.HTTP_400_BAD_REQUEST)
+
+    return _json(await _serializza(Software.objects.all(), campi))
+
+
+@require_GET
+@budget_query(1)
+async def dettaglio_software_async(request, software_id):
+    """
+    GET /api/async/software/5/
+    Come GET /api/software/5/ (supporta ?fields= / ?exclude=).
+
+    Legge la cache dei dettagli di api/cache.py (solo memoria, nessuna attesa)
+    ma non la riempie: salvare richiede la generazione del catalogo, che sta
+    nella cache di Django (con Redis sarebbe una chiamata di rete sincrona).
+    Per lo stesso motivo con PROCESSI > 1, dove leggere una voce richiede la
+    generazione (api/cache.py), la cache non si usa.
+    """
+    try:
+        campi = leggi_campi(request, piano_software.nomi)
+    except ValidationError as exc:
+        return _json(exc.detail, status.HTTP_400_BAD_REQUEST)
+
+    dati = leggi_dettaglio(software_id) if impostazione('PROCESSI') == 1 else CacheLRU.MANCANTE
+    if dati is CacheLRU.MANCANTE:
+        piano = piano_software.per_campi(campi)
+        try:
+            # SELECT ... FROM software WHERE id = software_id LIMIT 21
+            riga = await piano.queryset(Software.objects.all()).aget(id=software_id)
+        except Software.DoesNotExist:
+            dati = None
+        else:
+            return _json(piano.riga(riga))
+
+    if dati is None:
+        return _json({'errore': 'Software non trovato'}, status.HTTP_404_NOT_FOUND)
+    if campi is not None:
+        dati = {nome: dati[nome] for nome in campi}
+    return _json(dati)
+
+
+@require_GET
+@budget_query(1)
+@lettura_da_replica
+async def software_gratuiti_async(request):
+    """
+    GET /api/async/software/gratuiti/
+    Come GET /api/software/gratuiti/ → {"count": ..., "software": [...]}
+    """
+    try:
+        campi = leggi_campi(request, piano_software.nomi)
+    except ValidationError as exc:
+        return _json(exc.detail, status.HTTP_400_BAD_REQUEST)
+
+    dati = await _serializza(Software.objects.filter(gratuito_uguale(True)), campi)
+    return _json({'count': len(dati), 'software': dati})
+
+
+@require_GET
+@budget_query(1)
+@lettura_da_replica
+async def software_per_produttore_async(request, produttore):
+    """
+    GET /api/async/software/produttore/Adobe/
+    Come GET /api/software/produttore/Adobe/ → {"produttore": ..., "count": ..., "software": [...]}
+
+    ⚠️ UNA sola query: le righe lette bastano sia per il 404 (lista vuota)
+    sia per "count" (len). Una .acount() in più rifarebbe lo stesso filtro.
+    """
+    try:
+        campi = leggi_campi(request, piano_software.nomi)
+    except ValidationError as exc:
+        return _json(exc.detail, status.HTTP_400_BAD_REQUEST)
+
+    dati = await _serializza(Software.objects.filter(produttore_uguale(produttore)), campi)
+    if not dati:
+        return _json(
+            {'messaggio': f'Nessun software trovato per il produttore "{produttore}"'},
+            status.HTTP_404_NOT_FOUND
+        )
+    return _json({'produttore': produttore, 'count': len(dati), 'software': dati})
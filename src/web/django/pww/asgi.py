@@ -13,4 +13,19 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'pww.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# ⚠️ Import DOPO get_asgi_application(): serve Django già configurato
+from api.asgi import PERCORSO_EVENTI, PREFISSO_ASYNC, ASGIHandlerCatalogo, applicazione_eventi  # noqa: E402
+
+catalogo_application = ASGIHandlerCatalogo()
+
+
+async def application(scope, receive, send):
+    # Stream SSE degli eventi: app ASGI senza Django, niente thread per client
+    if scope['type'] == 'http' and scope['path'] == PERCORSO_EVENTI:
+        return await applicazione_eventi(scope, receive, send)
+    # /api/async/... → view async senza middleware sincroni (api/asgi.py)
+    if scope['type'] == 'http' and scope['path'].startswith(PREFISSO_ASYNC):
+        return await catalogo_application(scope, receive, send)
+    return await django_application(scope, receive, send)
@@ -49,6 +49,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.FinestraScritture',
 ]
 
 ROOT_URLCONF = 'pww.urls'
@@ -79,9 +80,28 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    },
 }
 
+# Replica di sola lettura per le GET del catalogo (api/repliche.py): copia di
+# db.sqlite3 fatta da "python manage.py replica_sqlite". SPENTA di default:
+# True SOLO con "python manage.py replica_sqlite --intervallo 5" sempre in
+# esecuzione. Finché il file non esiste si legge da 'default'.
+# ⚠️ Alias aggiunto solo se attiva: senza il file, makemigrations / check
+# avviserebbero "unable to open database file"
+REPLICHE_ATTIVE = False
+
+if REPLICHE_ATTIVE:
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': (BASE_DIR / 'replica.sqlite3').as_uri() + '?mode=ro&immutable=1',
+        'OPTIONS': {'uri': True},
+        'CONN_MAX_AGE': 0,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['api.repliche.RouterLetturaScrittura']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -130,3 +150,46 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [],
     'DEFAULT_PERMISSION_CLASSES': [],
 }
+
+
+# Impostazioni dell'app api (elenco completo e valori di default in api/conf.py)
+API_CATALOGO = {
+    'PAGINAZIONE_LIMIT_DEFAULT': 50,
+    'PAGINAZIONE_LIMIT_MAX': 500,
+    'STREAMING_CHUNK': 2000,
+    'SERIALIZZATORE_VELOCE': True,
+    # Processi del server: con più di 1 (gunicorn --workers 4 → 4) serve una
+    # cache di Django condivisa (Redis, Memcached, ...) in CACHES, vedi api/cache.py
+    'PROCESSI': 1,
+    'CACHE_RISPOSTE_MAX_VOCI': 256,
+    'CACHE_DETTAGLI_MAX_VOCI': 10000,
+    'CACHE_DETTAGLI_TTL_NEGATIVO': 30,
+    'CACHE_FACCETTE_MAX_VOCI': 256,
+    'FACCETTE_PRODUTTORI_MAX': 10,
+    'BULK_BATCH_SIZE': 1000,
+    'BULK_MAX_ELEMENTI': 10000,
+    # True se altre app collegano receiver a pre_save / post_save / pre_delete /
+    # post_delete di Software: PUT / PATCH / DELETE tornano a save() e delete()
+    # (vedi api/signals.py)
+    'SEGNALI_ESTERNI': False,
+    'ASYNC_MIDDLEWARE': ['api.middleware.IntestazioniSicurezza'],
+    'EVENTI_CODA_MAX': 100,
+    'EVENTI_HEARTBEAT': 15,
+    'EVENTI_ISCRITTI_MAX': 10000,
+    'ESPORTAZIONE_CARTELLA': None,
+    'ESPORTAZIONE_SNAPSHOT_MAX': 2,
+    'SQLITE_PRAGMA': {
+        'busy_timeout': 5000,
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 268435456,
+        'cache_size': -65536,
+        'temp_store': 'MEMORY',
+    },
+    # Repliche: si attivano con REPLICHE_ATTIVE (vedi DATABASES)
+    'REPLICHE_LETTURA': ['replica'] if REPLICHE_ATTIVE else [],
+    'REPLICHE_FINESTRA': 10,
+    'REPLICHE_RITARDO_MAX': 60,
+    'BUDGET_QUERY': 'avviso' if DEBUG else None,
+    'CACHE_CONTROL': {'public': True, 'max_age': 5, 'stale_while_revalidate': 30},
+}